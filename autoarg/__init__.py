@@ -1,4 +1,4 @@
-from . import arguments, constraints
+from . import arguments, constraints, loaders
 from .arguments import *
 
 __version__ = "0.0.10"
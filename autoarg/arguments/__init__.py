@@ -1,3 +1,11 @@
 from .argument import *
+from .batch import *
+from .binary import *
+from .cache import *
+from .expressions import *
 from .filters import *
+from .incremental import *
 from .operators import *
+from .pipeline import *
+from .profiling import *
+from .views import *
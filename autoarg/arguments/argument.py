@@ -1,3 +1,4 @@
+from time import perf_counter
 from typing import *
 
 from ..constraints import *
@@ -15,6 +16,14 @@ class Argument:
         Name of the Argument.
     constraints : List[Constraint]
         List of `Constraint`.
+    order : str
+        Evaluation order of the constraints: `"manifest"` evaluates them as
+        listed, `"cost"` by increasing static `Constraint.cost` and
+        `"adaptive"` starts from the cost order and periodically reorders
+        them by the measured time per rejection (see `stats`). Only `pure`
+        constraints are reordered, and type `guard`s are evaluated first.
+    adapt_every : int
+        Number of calls between two reorderings of an adaptive argument.
 
     Attributes
     ----------
@@ -22,41 +31,292 @@ class Argument:
         Whether the argument is required (not `None`)
     default : Any
         Default value of the argument
+    decoder : Optional[Decoder]
+        First constraint which can decode the value (e.g. `ValidJson`)
+    order : str
+        Evaluation order of the constraints
     """
 
-    def __init__(self, name: str, constraints: List[Constraint] = []) -> None:
+    _orders = ("manifest", "cost", "adaptive")
+    # seconds per unit of static cost, to weigh it against measured times
+    _cost_unit = 1e-7
+
+    __slots__ = (
+        "name",
+        "constraints",
+        "required",
+        "default",
+        "decoder",
+        "order",
+        "adapt_every",
+        "_calls",
+        "_passes",
+        "_seconds",
+        "_total_calls",
+        "_order",
+        "_checks",
+        "_sync_checks",
+        "_async_checks",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        constraints: List[Constraint] = [],
+        order: str = "manifest",
+        adapt_every: int = 1000,
+    ) -> None:
         self.name = name
-        self.required = Required() in constraints
+        self.required = any(isinstance(c, Required) for c in constraints)
         self.default = None
+        self.decoder = None
         for c in constraints:
             assert isinstance(c, Constraint)
             if not self.required and isinstance(c, Default):
                 self.default = c.value
+            if self.decoder is None and isinstance(c, Decoder):
+                self.decoder = c
 
         self.constraints = constraints
 
+        assert order in self._orders, f"`order` must be in {self._orders}."
+        self.order = order
+        self.adapt_every = adapt_every
+        n = len(constraints)
+        # runtime statistics, only collected by adaptive arguments
+        self._calls = self._passes = self._seconds = None
+        if order == "adaptive":
+            self._calls = [0] * n
+            self._passes = [0] * n
+            self._seconds = [0.0] * n
+        self._total_calls = 0
+        if order == "manifest":
+            self._set_order(range(n))
+        else:
+            self._set_order(self._plan(lambda i: constraints[i].cost))
+
+    def _set_order(self, indices: Sequence[int]) -> None:
+        self._order = indices
+        # the manifest list is shared when the order is unchanged, to keep
+        # the resident arguments small
+        if list(indices) == list(range(len(self.constraints))):
+            checks = self.constraints
+        else:
+            checks = [self.constraints[i] for i in indices]
+        self._checks = checks
+        self._async_checks = tuple(c for c in checks if isinstance(c, AsyncConstraint))
+        if self._async_checks:
+            self._sync_checks = [c for c in checks if not isinstance(c, AsyncConstraint)]
+        else:
+            self._sync_checks = self._checks
+
+    def _plan(self, rank: Callable[[int], float]) -> List[int]:
+        """
+        Evaluation order of the constraints (as indices) by increasing `rank`.
+
+        Constraints which are not `pure` stay in place and split the
+        constraints into segments reordered independently; `guard`s are
+        evaluated first in their segment, in manifest order.
+        """
+        order = []
+        segment = []
+
+        def flush():
+            order.extend(i for i in segment if self.constraints[i].guard)
+            rest = [i for i in segment if not self.constraints[i].guard]
+            order.extend(sorted(rest, key=rank))
+            segment.clear()
+
+        for i, c in enumerate(self.constraints):
+            if c.pure:
+                segment.append(i)
+            else:
+                flush()
+                order.append(i)
+        flush()
+        return order
+
+    def _rank(self, i: int) -> float:
+        # expected seconds spent per rejection; the static cost acts as one
+        # prior call and the pass rate is Laplace smoothed
+        calls = self._calls[i]
+        seconds = self._seconds[i] + self.constraints[i].cost * self._cost_unit
+        failure = (calls - self._passes[i] + 1) / (calls + 2)
+        return seconds / (calls + 1) / failure
+
     def __call__(self, x: Any) -> bool:
+        if self.order == "adaptive":
+            return self._call_adaptive(x)
+
+        return all(c(x) for c in self._checks)
+
+    def _call_adaptive(self, x: Any) -> bool:
+        ok = True
+        for i, c in zip(self._order, self._checks):
+            start = perf_counter()
+            ok = c(x)
+            self._seconds[i] += perf_counter() - start
+            self._calls[i] += 1
+            if not ok:
+                break
+            self._passes[i] += 1
+
+        self._total_calls += 1
+        if self._total_calls % self.adapt_every == 0:
+            self._set_order(self._plan(self._rank))
+        return bool(ok)
+
+    def decode(self, x: Any) -> Tuple[bool, Any]:
+        """
+        Validate the value and return the payload decoded by `decoder` while
+        checking it, so the value is parsed only once.
+
+        Returns
+        -------
+        Tuple[bool, Any]
+            Whether the value is valid and its decoded payload (`x` itself if
+            the argument has no `decoder`).
+        """
+        return self._decode(x, self._checks)
 
-        return all(c(x) for c in self.constraints)
+    def _decode(self, x: Any, checks: List[Constraint]) -> Tuple[bool, Any]:
+        payload = x
+        for c in checks:
+            if c is self.decoder:
+                ok, payload = c.decode(x)
+            else:
+                ok = c(x)
+            if not ok:
+                return False, None
+        return True, payload
+
+    @property
+    def is_async(self) -> bool:
+        """Whether the argument has `AsyncConstraint`s."""
+        return bool(self._async_checks)
+
+    async def adecode(
+        self,
+        x: Any,
+        semaphore: Optional[Any] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[bool, Any]:
+        """
+        Asynchronous `decode`: the synchronous constraints run first, inline,
+        then the `AsyncConstraint`s are awaited concurrently.
+
+        Parameters
+        ----------
+        x : Any
+            Value to validate.
+        semaphore : Optional[asyncio.Semaphore]
+            Bounds the number of asynchronous checks running at once.
+        timeout : Optional[float]
+            Seconds after which an asynchronous check without its own
+            `timeout` fails.
+
+        Returns
+        -------
+        Tuple[bool, Any]
+            Whether the value is valid and its decoded payload.
+        """
+        import asyncio
+
+        ok, payload = self._decode(x, self._sync_checks)
+        if not ok or not self._async_checks:
+            return ok, payload
+
+        results = await asyncio.gather(
+            *(_aassert(c, x, semaphore, timeout) for c in self._async_checks)
+        )
+        if not all(results):
+            return False, None
+        return True, payload
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Runtime statistics of the constraints, in manifest order. Only
+        collected when `order` is `"adaptive"`.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            For every constraint: its static `cost`, its `position` in the
+            evaluation order, the number of `calls` and `passes` and the total
+            `seconds` spent evaluating it.
+        """
+        position = {i: p for p, i in enumerate(self._order)}
+        n = len(self.constraints)
+        calls = self._calls or [0] * n
+        passes = self._passes or [0] * n
+        seconds = self._seconds or [0.0] * n
+        return [
+            {
+                "constraint": c,
+                "cost": c.cost,
+                "position": position[i],
+                "calls": calls[i],
+                "passes": passes[i],
+                "seconds": seconds[i],
+            }
+            for i, c in enumerate(self.constraints)
+        ]
+
+    def compile(self) -> Callable[[Any], bool]:
+        """Return a specialized function equivalent to calling the argument."""
+        return compile_constraints(self._checks)
 
     def __repr__(self) -> str:
         return f"Argument(name={self.name}, constraints={self.constraints})"
 
+    def __reduce__(self) -> Tuple[type, Tuple[str, List[Constraint], str, int]]:
+        # the evaluation order and the statistics are rebuilt
+        return self.__class__, (
+            self.name,
+            self.constraints,
+            self.order,
+            self.adapt_every,
+        )
+
     def __eq__(self, other: "Argument"):
-        return self.__dict__ == other.__dict__
+        # the evaluation order and the statistics do not change the checks
+        return isinstance(other, Argument) and (
+            self.name,
+            self.constraints,
+            self.required,
+            self.default,
+        ) == (other.name, other.constraints, other.required, other.default)
+
+
+async def _aassert(
+    c: AsyncConstraint, x: Any, semaphore: Optional[Any], timeout: Optional[float]
+) -> bool:
+    import asyncio
+
+    if c.timeout is not None:
+        timeout = c.timeout
+    # a timed out check fails; the timeout does not include waiting for the
+    # semaphore
+    try:
+        if semaphore is None:
+            return await asyncio.wait_for(c.aassertion(x), timeout)
+        async with semaphore:
+            return await asyncio.wait_for(c.aassertion(x), timeout)
+    except asyncio.TimeoutError:
+        return False
 
 
 def get_arguments_from_dict(
-    d: Dict[str, List[Union[str, Constraint]]]
+    d: Dict[str, List[Union[str, Constraint]]], order: str = "manifest"
 ) -> Dict[str, Argument]:
     def _str_to_py_obj(x):
         if isinstance(x, str):
-            return eval(x)
+            return parse_constraint(x)
         return x
 
     out = {}
     for name, constraints in d.items():
         constraints = [_str_to_py_obj(c) for c in constraints]
-        out[name] = Argument(name=name, constraints=constraints)
+        out[name] = Argument(name=name, constraints=constraints, order=order)
 
     return out
@@ -0,0 +1,181 @@
+from typing import *
+
+from .argument import Argument
+
+__all__ = ["BatchResult"]
+
+
+class BatchResult:
+    """
+    Result of validating a batch of records.
+
+    Parameters
+    ----------
+    mask : numpy.ndarray
+        Boolean mask of the valid rows.
+    reasons : List[List[str]]
+        Failure messages of every row; empty for valid rows.
+    values : Dict[str, numpy.ndarray]
+        Validated columns, with the defaults filled in.
+
+    Attributes
+    ----------
+    mask : numpy.ndarray
+        Boolean mask of the valid rows.
+    reasons : List[List[str]]
+        Failure messages of every row; empty for valid rows.
+    values : Dict[str, numpy.ndarray]
+        Validated columns, with the defaults filled in.
+    """
+
+    def __init__(
+        self, mask: Any, reasons: List[List[str]], values: Dict[str, Any]
+    ) -> None:
+        self.mask = mask
+        self.reasons = reasons
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.mask)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(valid={int(self.mask.sum())}, "
+            f"invalid={len(self) - int(self.mask.sum())})"
+        )
+
+
+def _to_column(values: Sequence[Any]) -> Any:
+    """Build a column with a native dtype if all values share one python type,
+    otherwise with the `object` dtype to preserve the types of the values."""
+    import numpy as np
+
+    types = set(map(type, values))
+    if len(types) == 1 and types <= {bool, int, float, str}:
+        try:
+            return np.array(values)
+        except OverflowError:
+            pass
+
+    column = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        column[i] = value
+    return column
+
+
+def _as_column(values: Any) -> Any:
+    import numpy as np
+
+    if isinstance(values, np.ndarray):
+        return values
+    return _to_column(list(values))
+
+
+def _validate(
+    args: Dict[str, Argument],
+    columns: Dict[str, Any],
+    missing: Dict[str, Any],
+    n: int,
+) -> BatchResult:
+    """Validate equal-length columns; `missing` maps names to the masks of
+    the rows which did not provide the value (and hold the default instead)."""
+    import numpy as np
+
+    mask = np.ones(n, dtype=bool)
+    reasons = [[] for _ in range(n)]
+    values = {}
+    for name, arg in args.items():
+        if name not in columns:
+            if arg.required:
+                mask[:] = False
+                for r in reasons:
+                    r.append(f"Argument `{name}` is required but not provided.")
+            # one default per row, also for sequence defaults
+            values[name] = _to_column([arg.default] * n)
+            continue
+
+        column = columns[name]
+        absent = missing.get(name)
+        for c in arg.constraints:
+            try:
+                ok = c.batch_assertion(column)
+            except Exception:
+                ok = np.zeros(n, dtype=bool)
+            if absent is not None:
+                ok |= absent
+            if not ok.all():
+                mask &= ok
+                for i in np.flatnonzero(~ok):
+                    reasons[i].append(
+                        f"Value {name} = {column[i]} is not compatible with {c}."
+                    )
+
+        if absent is not None and arg.required:
+            mask &= ~absent
+            for i in np.flatnonzero(absent):
+                reasons[i].append(f"Argument `{name}` is required but not provided.")
+        values[name] = column
+
+    return BatchResult(mask, reasons, values)
+
+
+def validate_columns(args: Dict[str, Argument], columns: Dict[str, Any]) -> BatchResult:
+    """
+    Validate columns of values against a dictionary of `Argument`s.
+
+    Parameters
+    ----------
+    args : Dict[str, Argument]
+        Arguments of a `Validator`.
+    columns : Dict[str, numpy.ndarray]
+        Map from argument names to columns of equal length. Sequences are
+        converted to arrays.
+
+    Returns
+    -------
+    BatchResult
+        Mask of the valid rows, failure reasons and the validated columns.
+    """
+    columns = {name: _as_column(values) for name, values in columns.items()}
+    lengths = {len(column) for column in columns.values()}
+    assert len(lengths) <= 1, "All columns must have the same length."
+    n = lengths.pop() if lengths else 0
+
+    return _validate(args, columns, {}, n)
+
+
+def validate_records(
+    args: Dict[str, Argument], records: Iterable[Dict[str, Any]]
+) -> BatchResult:
+    """
+    Validate records (dictionaries of values) against a dictionary of
+    `Argument`s. Records are transposed into columns; values missing from a
+    record are handled like missing keyword arguments of `Validator`.
+
+    Parameters
+    ----------
+    args : Dict[str, Argument]
+        Arguments of a `Validator`.
+    records : Iterable[Dict[str, Any]]
+        Records to validate.
+
+    Returns
+    -------
+    BatchResult
+        Mask of the valid rows, failure reasons and the validated columns.
+    """
+    import numpy as np
+
+    records = list(records)
+    n = len(records)
+    columns = {}
+    missing = {}
+    for name, arg in args.items():
+        absent = np.fromiter((name not in r for r in records), dtype=bool, count=n)
+        if absent.all():
+            continue
+        columns[name] = _to_column([r.get(name, arg.default) for r in records])
+        if absent.any():
+            missing[name] = absent
+
+    return _validate(args, columns, missing, n)
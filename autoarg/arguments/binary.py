@@ -0,0 +1,508 @@
+"""
+Binary manifests of `Validator`s, `Converter`s and `Filter`s, readable in
+place through `mmap`.
+
+All the integers are little-endian. A manifest is made of:
+
+- a header `<4sHBBIIIIIIIII`: the magic `b"AARG"`, the format version, the
+  kind of operator (0: `Validator`, 1: `Converter`, 2: `Filter`), flags
+  (bit 0: `CompiledValidator` or `BitsetFilter`), the number of entries,
+  the number of strings, two kind-specific string ids (`payloads` and
+  `order` of a validator, `mode` of a filter) and the offsets of the
+  sections below;
+- the string table: `n_strings + 1` u32 offsets into the UTF-8 blob which
+  follows; names, templates and constraint sources are interned, so every
+  distinct string is stored once;
+- the entries, in manifest order: u32 name id, u32 start and u32 end of the
+  code of the entry, relative to the code section;
+- the index: u32 entry numbers sorted by name, for binary searches;
+- the float section (8-byte aligned): f64 interval bounds of the `InRange`
+  constraints, lower bounds then upper bounds of each union, shared by the
+  constraints of the same ranges;
+- the code section. A validator entry is a sequence of constraint opcodes:
+  `1` (u32 class name id) calls a constraint class without arguments; `2`
+  (u32 number of ranges, their u32 string ids, u32 index of the bounds in
+  the float section, u32 number of merged intervals, then the lower and
+  upper closedness bytes of the intervals) is an `InRange` built from its
+  flat bounds; `3` (u32 source id) is any constraint, parsed by
+  `parse_constraint`. A converter entry is a type byte (0: `str`, 1: python
+  literal) and the u32 id of the template; a filter entry is a keep byte.
+
+Nothing is decoded when a manifest is loaded: the arguments of a validator
+are decoded on first access, and a file is mapped in memory so the worker
+processes loading it share its pages.
+"""
+
+import os
+import struct
+import sys
+from array import array
+from typing import *
+
+from ..constraints import *
+from .argument import Argument
+from .views import LazyMapping
+
+__all__ = ["BinaryManifest", "BinaryArguments"]
+
+MAGIC = b"AARG"
+VERSION = 1
+
+KIND_VALIDATOR, KIND_CONVERTER, KIND_FILTER = 0, 1, 2
+FLAG_SPECIALIZED = 1
+
+OP_CALL, OP_RANGE, OP_SOURCE = 1, 2, 3
+TEMPLATE_STR, TEMPLATE_LITERAL = 0, 1
+
+_HEADER = struct.Struct("<4sHBBIIIIIIIII")
+_ENTRY = struct.Struct("<III")
+_U32 = struct.Struct("<I")
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.strings = []
+        self.string_ids = {}
+        self.floats = array("d")
+        self.float_blocks = {}
+        self.code = bytearray()
+        # code of the constraints by identity: parsed constraints are shared
+        self.encoded = {}
+
+    def intern(self, s: str) -> int:
+        i = self.string_ids.get(s)
+        if i is None:
+            i = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def constraint(self, c: Constraint) -> None:
+        code = self.encoded.get(id(c))
+        if code is None:
+            code = self.encoded[id(c)] = self._encode(c)
+        self.code += code
+
+    def _encode(self, c: Constraint) -> bytes:
+        cls = type(c)
+        if cls is InRange:
+            key = (c._lowers.tobytes(), c._uppers.tobytes())
+            index = self.float_blocks.get(key)
+            if index is None:
+                index = self.float_blocks[key] = len(self.floats)
+                self.floats.extend(c._lowers)
+                self.floats.extend(c._uppers)
+            ids = [self.intern(r) for r in c.ranges]
+            return (
+                struct.pack(
+                    f"<BI{len(ids)}III", OP_RANGE, len(ids), *ids, index, len(c._lowers)
+                )
+                + bytes(c._lower_closed)
+                + bytes(c._upper_closed)
+            )
+
+        name = cls.__name__
+        source = c.to_string()
+        if source == f"{name}()" and constraint_registry.get(name) is cls:
+            return struct.pack("<BI", OP_CALL, self.intern(name))
+        return struct.pack("<BI", OP_SOURCE, self.intern(source))
+
+
+def dump(op: Any) -> bytes:
+    """
+    Serialize an operator into a binary manifest.
+
+    Parameters
+    ----------
+    op : Union[Validator, Converter, Filter]
+        The operator. The arguments of a validator must share their `order`.
+
+    Returns
+    -------
+    bytes
+        The binary manifest.
+    """
+    from .filters import BitsetFilter, Filter
+    from .operators import CompiledValidator, Converter, Validator
+
+    w = _Writer()
+    entries = []
+
+    def entry(name: str, start: int) -> None:
+        entries.append((w.intern(name), start, len(w.code)))
+
+    if isinstance(op, Validator):
+        kind, flags = KIND_VALIDATOR, isinstance(op, CompiledValidator)
+        orders = {arg.order for arg in op.args.values()}
+        assert len(orders) <= 1, "All the arguments must have the same `order`."
+        order = orders.pop() if orders else "manifest"
+        meta = (w.intern(op.payloads), w.intern(order))
+        for name, arg in op.args.items():
+            start = len(w.code)
+            for c in arg.constraints:
+                w.constraint(c)
+            entry(name, start)
+    elif isinstance(op, Converter):
+        kind, flags, meta = KIND_CONVERTER, False, (0, 0)
+        for name, template in op.args.items():
+            start = len(w.code)
+            if isinstance(template, str):
+                w.code += struct.pack("<BI", TEMPLATE_STR, w.intern(template))
+            else:
+                literal = w.intern(repr(template))
+                w.code += struct.pack("<BI", TEMPLATE_LITERAL, literal)
+            entry(name, start)
+    elif isinstance(op, Filter):
+        kind, flags = KIND_FILTER, isinstance(op, BitsetFilter)
+        meta = (w.intern(op.mode.value), 0)
+        for name, keep in op.args.items():
+            start = len(w.code)
+            w.code.append(bool(keep))
+            entry(name, start)
+    else:
+        raise TypeError(
+            f"Cannot write a `{type(op).__name__}` as a binary manifest."
+        )
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for s in w.strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    names = [w.strings[name] for name, _, _ in entries]
+    index = array("I", sorted(range(len(entries)), key=names.__getitem__))
+    floats = w.floats
+    if sys.byteorder == "big":
+        for a in (offsets, index, floats):
+            a.byteswap()
+
+    def pad(n: int, align: int) -> int:
+        return -n % align
+
+    strings_offset = _HEADER.size
+    entries_offset = strings_offset + len(offsets) * 4 + len(blob)
+    entries_offset += pad(entries_offset, 4)
+    index_offset = entries_offset + len(entries) * _ENTRY.size
+    floats_offset = index_offset + len(index) * 4
+    floats_offset += pad(floats_offset, 8)
+    code_offset = floats_offset + len(floats) * 8
+
+    out = bytearray(
+        _HEADER.pack(
+            MAGIC,
+            VERSION,
+            kind,
+            int(flags),
+            len(entries),
+            len(w.strings),
+            *meta,
+            strings_offset,
+            entries_offset,
+            index_offset,
+            floats_offset,
+            code_offset,
+        )
+    )
+    out += offsets.tobytes() + blob
+    out += bytes(entries_offset - len(out))
+    for e in entries:
+        out += _ENTRY.pack(*e)
+    out += index.tobytes()
+    out += bytes(floats_offset - len(out))
+    out += floats.tobytes()
+    out += w.code
+    return bytes(out)
+
+
+class BinaryManifest:
+    """
+    Read-only access to a binary manifest in a buffer, e.g. a memory mapped
+    file. Strings and constraints are decoded on first access and memoized.
+
+    Parameters
+    ----------
+    buffer : Union[bytes, mmap.mmap]
+        The binary manifest.
+
+    Attributes
+    ----------
+    kind : int
+        Kind of the operator.
+    flags : int
+        Flags of the operator.
+    n_entries : int
+        Number of arguments, outputs or filter specs.
+    """
+
+    __slots__ = (
+        "buffer",
+        "kind",
+        "flags",
+        "n_entries",
+        "_meta",
+        "_strings_offset",
+        "_blob_offset",
+        "_entries_offset",
+        "_index_offset",
+        "_floats_offset",
+        "_code_offset",
+        "_strings",
+        "_constraints",
+    )
+
+    def __init__(self, buffer: Any) -> None:
+        assert len(buffer) >= _HEADER.size, "Truncated binary manifest."
+        (
+            magic,
+            version,
+            self.kind,
+            self.flags,
+            self.n_entries,
+            n_strings,
+            *self._meta,
+            self._strings_offset,
+            self._entries_offset,
+            self._index_offset,
+            self._floats_offset,
+            self._code_offset,
+        ) = _HEADER.unpack_from(buffer)
+        assert magic == MAGIC, "Not a binary manifest."
+        assert version == VERSION, f"Unsupported binary manifest version {version}."
+        self.buffer = buffer
+        self._blob_offset = self._strings_offset + (n_strings + 1) * 4
+        self._strings = {}
+        self._constraints = {}
+
+    @classmethod
+    def open(cls, path: Union[str, os.PathLike]) -> "BinaryManifest":
+        """Map the file at `path` in memory, read-only."""
+        import mmap
+
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def string(self, i: int) -> str:
+        s = self._strings.get(i)
+        if s is None:
+            offset = self._strings_offset + 4 * i
+            start, end = struct.unpack_from("<II", self.buffer, offset)
+            blob = self._blob_offset
+            s = str(self.buffer[blob + start : blob + end], "utf-8")
+            self._strings[i] = s
+        return s
+
+    def meta(self, i: int) -> str:
+        return self.string(self._meta[i])
+
+    def _entry(self, i: int) -> Tuple[int, int, int]:
+        return _ENTRY.unpack_from(self.buffer, self._entries_offset + _ENTRY.size * i)
+
+    def name(self, i: int) -> str:
+        """Name of the entry `i`."""
+        return self.string(self._entry(i)[0])
+
+    def find(self, name: str) -> Optional[int]:
+        """Entry of `name`, by binary search over the index."""
+        low, high = 0, self.n_entries
+        while low < high:
+            mid = (low + high) // 2
+            (i,) = _U32.unpack_from(self.buffer, self._index_offset + 4 * mid)
+            other = self.name(i)
+            if other == name:
+                return i
+            if other < name:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def _code(self, i: int) -> Tuple[int, int]:
+        # absolute start and end of the code of the entry `i`
+        _, start, end = self._entry(i)
+        return self._code_offset + start, self._code_offset + end
+
+    def constraints(self, i: int) -> List[Constraint]:
+        """Constraints of the validator entry `i`."""
+        buffer = self.buffer
+        pos, end = self._code(i)
+        out = []
+        while pos < end:
+            start = pos
+            op, value = struct.unpack_from("<BI", buffer, pos)
+            pos += 5
+            if op == OP_RANGE:
+                pos += 4 * value
+                n = _U32.unpack_from(buffer, pos + 4)[0]
+                pos += 8 + 2 * n
+            # equal codes decode to one shared constraint
+            key = bytes(buffer[start:pos])
+            c = self._constraints.get(key)
+            if c is None:
+                c = self._constraints[key] = self._constraint(key)
+            out.append(c)
+        return out
+
+    def _constraint(self, code: bytes) -> Constraint:
+        op, value = struct.unpack_from("<BI", code)
+        if op == OP_CALL:
+            return constraint_registry[self.string(value)]()
+        if op == OP_SOURCE:
+            return parse_constraint(self.string(value))
+        assert op == OP_RANGE, f"Unknown opcode {op}."
+
+        pos = 5 + 4 * value
+        ranges = tuple(
+            self.string(r) for r in struct.unpack_from(f"<{value}I", code, 5)
+        )
+        index, n = struct.unpack_from("<II", code, pos)
+        pos += 8
+        start = self._floats_offset + 8 * index
+        bounds = array("d", self.buffer[start : start + 16 * n])
+        if sys.byteorder == "big":
+            bounds.byteswap()
+        return InRange._from_flat(
+            ranges,
+            bounds[:n],
+            code[pos : pos + n],
+            bounds[n:],
+            code[pos + n : pos + 2 * n],
+        )
+
+    def template(self, i: int) -> Any:
+        """Template of the converter entry `i`."""
+        pos, _ = self._code(i)
+        kind, value = struct.unpack_from("<BI", self.buffer, pos)
+        if kind == TEMPLATE_LITERAL:
+            import ast
+
+            return ast.literal_eval(self.string(value))
+        return self.string(value)
+
+    def keep(self, i: int) -> bool:
+        """Spec of the filter entry `i`."""
+        pos, _ = self._code(i)
+        return bool(self.buffer[pos])
+
+
+class BinaryArguments(LazyMapping):
+    """
+    Arguments of a validator loaded from a `BinaryManifest`, decoded on
+    first access. Once all the arguments are decoded, the mapping is backed
+    by a `dict`.
+
+    Parameters
+    ----------
+    manifest : BinaryManifest
+        Manifest of a validator.
+    order : str
+        Evaluation order of the arguments, see `Argument`.
+    """
+
+    __slots__ = ("_manifest", "_order", "_decoded", "_remaining", "_dict")
+
+    def __init__(self, manifest: BinaryManifest, order: str = "manifest") -> None:
+        self._manifest = manifest
+        self._order = order
+        self._decoded = [None] * manifest.n_entries
+        self._remaining = manifest.n_entries
+        self._dict = None if manifest.n_entries else {}
+
+    def _argument(self, i: int) -> Argument:
+        arg = self._decoded[i]
+        if arg is None:
+            m = self._manifest
+            arg = Argument(m.name(i), m.constraints(i), order=self._order)
+            self._decoded[i] = arg
+            self._remaining -= 1
+            if not self._remaining:
+                self._dict = {a.name: a for a in self._decoded}
+        return arg
+
+    def _complete(self) -> Dict[str, Argument]:
+        if self._dict is None:
+            for i in range(self._manifest.n_entries):
+                self._argument(i)
+        return self._dict
+
+    def __getitem__(self, name: str) -> Argument:
+        if self._dict is not None:
+            return self._dict[name]
+        i = self._manifest.find(name)
+        if i is None:
+            raise KeyError(name)
+        return self._argument(i)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._dict is not None:
+            return iter(self._dict)
+        return map(self._manifest.name, range(self._manifest.n_entries))
+
+    def __len__(self) -> int:
+        return self._manifest.n_entries
+
+    def __contains__(self, name: Any) -> bool:
+        if self._dict is not None:
+            return name in self._dict
+        return isinstance(name, str) and self._manifest.find(name) is not None
+
+    def items(self) -> ItemsView[str, Argument]:
+        # iterating all the items decodes all the arguments anyway
+        return self._complete().items()
+
+    def values(self) -> ValuesView[Argument]:
+        return self._complete().values()
+
+    def materialize(self) -> Dict[str, Argument]:
+        return dict(self._complete())
+
+
+def load(source: Union[bytes, str, os.PathLike, BinaryManifest], cls: type) -> Any:
+    """
+    Build the operator of a binary manifest.
+
+    Parameters
+    ----------
+    source : Union[bytes, str, os.PathLike, BinaryManifest]
+        The manifest, or the path of a file mapped in memory.
+    cls : type
+        Class whose `from_binary` was called; the manifest must hold an
+        instance of it.
+
+    Returns
+    -------
+    Operator
+        The operator.
+    """
+    from .filters import BitsetFilter, Filter
+    from .operators import CompiledValidator, Converter, Validator
+
+    if isinstance(source, BinaryManifest):
+        m = source
+    elif isinstance(source, (str, os.PathLike)):
+        m = BinaryManifest.open(source)
+    else:
+        m = BinaryManifest(source)
+
+    specialized = bool(m.flags & FLAG_SPECIALIZED)
+    n = m.n_entries
+    if m.kind == KIND_VALIDATOR:
+        target = CompiledValidator if specialized else Validator
+    elif m.kind == KIND_CONVERTER:
+        target = Converter
+    elif m.kind == KIND_FILTER:
+        target = BitsetFilter if specialized else Filter
+    else:
+        raise ValueError(f"Unknown kind of binary manifest {m.kind}.")
+    if cls is CompiledValidator and issubclass(cls, target):
+        target = cls
+    elif m.kind == KIND_FILTER and issubclass(cls, Filter) and cls is not Filter:
+        # e.g. `WhiteList.from_binary`, rebuilt from the specs
+        target = cls
+    assert issubclass(target, cls), (
+        f"The binary manifest holds a `{target.__name__}`, not a `{cls.__name__}`."
+    )
+
+    if m.kind == KIND_VALIDATOR:
+        return target(BinaryArguments(m, m.meta(1)), m.meta(0))
+    if m.kind == KIND_CONVERTER:
+        return target({m.name(i): m.template(i) for i in range(n)})
+    return target._from_specs({m.name(i): m.keep(i) for i in range(n)}, m.meta(0))
@@ -0,0 +1,157 @@
+import os
+import sys
+from typing import *
+
+__all__ = ["ManifestCache"]
+
+
+def _default_directory() -> str:
+    if "AUTOARG_CACHE_DIR" in os.environ:
+        return os.environ["AUTOARG_CACHE_DIR"]
+    root = os.environ.get("XDG_CACHE_HOME", os.path.join("~", ".cache"))
+    return os.path.join(os.path.expanduser(root), "autoarg")
+
+
+def _trusted(st: os.stat_result) -> bool:
+    """Whether a cache directory or file is owned by the current user and not
+    writable by anyone else, so that nobody else could have planted a pickle
+    in it."""
+    if not hasattr(os, "getuid"):
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+class ManifestCache:
+    """
+    Persistent on-disk cache of operators built from manifests.
+
+    Entries are pickled operators keyed by the SHA-256 of the manifest, the
+    operator class, the autoarg version and the python version, so a change
+    of any of them misses the cache. Files are written atomically; entries
+    which cannot be read are discarded and rebuilt.
+
+    Unpickling runs code, so entries are only loaded from a directory and
+    files owned by the current user and not writable by group or others;
+    the directory is created with mode `0o700`.
+
+    Parameters
+    ----------
+    directory : Optional[str]
+        Cache directory; defaults to `$AUTOARG_CACHE_DIR` or
+        `~/.cache/autoarg`.
+
+    Attributes
+    ----------
+    directory : str
+        Cache directory.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory if directory is not None else _default_directory()
+
+    def key(self, cls: type, manifest: str) -> str:
+        import hashlib
+
+        from .. import __version__
+
+        h = hashlib.sha256()
+        for part in (
+            __version__,
+            "%d.%d" % sys.version_info[:2],
+            f"{cls.__module__}.{cls.__qualname__}",
+            manifest,
+        ):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, cls: type, manifest: str, build: Callable[[], Any]) -> Any:
+        """
+        Return the cached operator of `manifest`, building and storing it on a
+        miss.
+
+        Parameters
+        ----------
+        cls : type
+            Operator class.
+        manifest : str
+            Text of the manifest.
+        build : Callable[[], Any]
+            Builds the operator from the manifest.
+
+        Returns
+        -------
+        Any
+            Operator of class `cls`.
+        """
+        key = self.key(cls, manifest)
+        path = self.path(key)
+
+        op = self._read(path, key, cls)
+        if op is None:
+            op = build()
+            self._write(path, key, op)
+        return op
+
+    def _read(self, path: str, key: str, cls: type) -> Optional[Any]:
+        import pickle
+
+        try:
+            if not _trusted(os.stat(self.directory)):
+                return None
+            with open(path, "rb") as f:
+                if not _trusted(os.fstat(f.fileno())):
+                    return None
+                stored_key, op = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # truncated or stale entry
+            self._remove(path)
+            return None
+
+        if stored_key != key or not isinstance(op, cls):
+            self._remove(path)
+            return None
+        return op
+
+    def _write(self, path: str, key: str, op: Any) -> None:
+        import pickle
+        import tempfile
+
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump((key, op), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except BaseException:
+                self._remove(tmp)
+                raise
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # caching is best effort
+            pass
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                self._remove(os.path.join(self.directory, name))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.directory!r})"
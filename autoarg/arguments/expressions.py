@@ -0,0 +1,398 @@
+from enum import Enum
+from functools import lru_cache
+from typing import *
+
+__all__ = ["Expression", "ExpressionKind"]
+
+
+class ExpressionKind(Enum):
+    CONSTANT = "constant"  # no placeholder: evaluated without any input
+    PASSTHROUGH = "passthrough"  # a single placeholder: returns the input value
+    EXPRESSION = "expression"  # python expression over the input values
+    LITERAL = "literal"  # not python: text substitution, `eval`ed if possible
+
+    def __repr__(self) -> str:
+        return self.value
+
+
+# prefix of the references to the outputs of a converter, e.g. `${out.steps}`
+_OUTPUT = "out."
+
+
+def _mangle(name: str) -> str:
+    if name.startswith(_OUTPUT):
+        return f"__o_{name[len(_OUTPUT) :]}"
+    return f"__v_{name}"
+
+
+@lru_cache(maxsize=None)
+def _template_class() -> type:
+    """`string.Template` also accepting the output references `${out.name}`."""
+    import string
+
+    class Template(string.Template):
+        braceidpattern = r"(?a:(?-i:out\.)?[_a-z][_a-z0-9]*)"
+
+    return Template
+
+
+# builtins of expressions rewritten to `numpy` functions over columns
+_NUMPY_REDUCTIONS = {"max": "maximum", "min": "minimum"}
+_NUMPY_CASTS = {"int": "int64", "float": "float64", "bool": "bool_"}
+
+
+@lru_cache(maxsize=4096)
+def _compile_text(eqn: str) -> Any:
+    """Code of a substituted template, `None` if it is not python; the same
+    texts (e.g. paths) recur across calls."""
+    try:
+        return compile(eqn, "<autoarg>", "eval")
+    except SyntaxError:
+        return None
+
+
+class _NotVectorizable(Exception):
+    pass
+
+
+def _vectorize(source: str, params: List[str]) -> Any:
+    """
+    Compile the python expression `source` into a lambda of `params` over
+    `numpy` columns, with `numpy` as the global `_np`: `max`/`min` become
+    `np.maximum`/`np.minimum`, conditional expressions and `and`/`or` become
+    `np.where`.
+
+    Raises
+    ------
+    _NotVectorizable
+        If the expression uses other functions, attributes, subscripts, ...
+    """
+    import ast
+
+    allowed = (
+        ast.Expression,
+        ast.BinOp,
+        ast.UnaryOp,
+        ast.BoolOp,
+        ast.Compare,
+        ast.IfExp,
+        ast.Call,
+        ast.Name,
+        ast.Constant,
+        ast.Load,
+        ast.operator,
+        ast.unaryop,
+        ast.boolop,
+        ast.cmpop,
+    )
+    excluded = (ast.MatMult, ast.In, ast.NotIn, ast.Is, ast.IsNot)
+
+    def numpy(attr: str, *args: ast.expr) -> ast.Call:
+        func = ast.Attribute(ast.Name("_np", ast.Load()), attr, ast.Load())
+        return ast.Call(func, list(args), [])
+
+    class Vectorizer(ast.NodeTransformer):
+        def generic_visit(self, node: ast.AST) -> ast.AST:
+            if not isinstance(node, allowed) or isinstance(node, excluded):
+                raise _NotVectorizable(type(node).__name__)
+            return super().generic_visit(node)
+
+        def visit_Name(self, node: ast.Name) -> ast.AST:
+            if node.id not in params:
+                raise _NotVectorizable(node.id)
+            return node
+
+        def visit_Constant(self, node: ast.Constant) -> ast.AST:
+            if not isinstance(node.value, (bool, int, float, str)):
+                raise _NotVectorizable(repr(node.value))
+            return node
+
+        def visit_Call(self, node: ast.Call) -> ast.AST:
+            func = node.func
+            if not isinstance(func, ast.Name) or node.keywords:
+                raise _NotVectorizable("call")
+            args = [self.visit(arg) for arg in node.args]
+            if func.id in _NUMPY_REDUCTIONS and len(args) >= 2:
+                out = args[0]
+                for arg in args[1:]:
+                    out = numpy(_NUMPY_REDUCTIONS[func.id], out, arg)
+                return out
+            if func.id == "abs" and len(args) == 1:
+                return numpy("abs", args[0])
+            if func.id in _NUMPY_CASTS and len(args) == 1:
+                dtype = ast.Attribute(
+                    ast.Name("_np", ast.Load()), _NUMPY_CASTS[func.id], ast.Load()
+                )
+                cast = ast.Attribute(numpy("asarray", args[0]), "astype", ast.Load())
+                return ast.Call(cast, [dtype], [])
+            raise _NotVectorizable(func.id)
+
+        def visit_IfExp(self, node: ast.IfExp) -> ast.AST:
+            node = self.generic_visit(node)
+            return numpy("where", node.test, node.body, node.orelse)
+
+        def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+            # `a and b` is `b if a else a`, `a or b` is `a if a else b`
+            node = self.generic_visit(node)
+            out = node.values[-1]
+            for value in reversed(node.values[:-1]):
+                if isinstance(node.op, ast.And):
+                    out = numpy("where", value, out, value)
+                else:
+                    out = numpy("where", value, value, out)
+            return out
+
+        def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+            node = self.generic_visit(node)
+            if isinstance(node.op, ast.Not):
+                return numpy("logical_not", node.operand)
+            return node
+
+        def visit_Compare(self, node: ast.Compare) -> ast.AST:
+            # `a < b < c` is `(a < b) & (b < c)`
+            node = self.generic_visit(node)
+            operands = [node.left] + node.comparators
+            out = None
+            for op, left, right in zip(node.ops, operands, operands[1:]):
+                test = ast.Compare(left, [op], [right])
+                out = test if out is None else numpy("logical_and", out, test)
+            return out
+
+    tree = Vectorizer().visit(ast.parse(f"({source}\n)", mode="eval"))
+    lambda_ = ast.Lambda(
+        ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(p) for p in params],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        tree.body,
+    )
+    return compile(
+        ast.fix_missing_locations(ast.Expression(lambda_)), "<autoarg>", "eval"
+    )
+
+
+def _wrapped(function: Callable[..., Any], inputs: List[Any], column: Any) -> bool:
+    """
+    Whether the integer arithmetic of the vectorized `function` over `inputs`
+    wrapped around. `np.errstate` does not catch integer overflows, so the
+    result is compared with the same computation over floats.
+    """
+    import numpy as np
+
+    if column.dtype.kind not in "biuf":
+        return False
+    floats = [c.astype(np.float64) if c.dtype.kind in "iu" else c for c in inputs]
+    if all(f is c for f, c in zip(floats, inputs)):
+        return False
+    expected = function(*floats)
+    if not np.count_nonzero(column != expected):
+        return False
+    if column.dtype.kind == "b":
+        return True
+    # large values are equal up to the rounding of the floats
+    error = np.abs(column - expected)
+    return not (error <= 1e-9 * np.abs(expected)).all()
+
+
+class Expression:
+    """
+    Conversion expression compiled once from a `string.Template` string.
+
+    The template is classified at construction: templates which are valid
+    python after replacing the placeholders are compiled into a function
+    taking the typed input values directly; anything else is a literal
+    template, whose substituted text is `eval`ed if it is python (e.g.
+    `${x} ${op} ${y}`) and returned as is otherwise.
+
+    If evaluating a compiled expression raises, the expression falls back to
+    the text substitution semantics: the `str` of the inputs are substituted
+    and the resulting source is `eval`ed, returning the text if that fails too.
+    Once the compiled function raised a `TypeError` or a `NameError` for some
+    types of inputs (e.g. strings in the path template `${a}/${b}`), inputs
+    of the same types go through the text substitution directly.
+
+    A `${name}` references the input value `name`; inside a `Converter`,
+    `${out.name}` references its output `name`.
+
+    Parameters
+    ----------
+    template : str
+        Template string, e.g. `max(${epoch}, 2)`.
+
+    Attributes
+    ----------
+    template : str
+        Template string.
+    names : Tuple[str]
+        Names of the referenced values, in order of first appearance; the
+        output references keep their `out.` prefix.
+    kind : ExpressionKind
+        Classification of the template.
+    source : Optional[str]
+        Python source of the expression; `None` for literal strings.
+    """
+
+    def __init__(self, template: str) -> None:
+        Template = _template_class()
+
+        if not isinstance(template, str):
+            template = str(template)
+        self.template = template
+
+        names = []
+        chunks = []
+        last = 0
+        for match in Template.pattern.finditer(template):
+            chunks.append(template[last : match.start()])
+            last = match.end()
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                if name not in names:
+                    names.append(name)
+                chunks.append(_mangle(name))
+            elif match.group("escaped") is not None:
+                chunks.append("$")
+            else:
+                raise ValueError(f"Invalid placeholder in template `{template}`.")
+        chunks.append(template[last:])
+        self.names = tuple(names)
+
+        source = "".join(chunks)
+        params = ", ".join(_mangle(name) for name in self.names)
+        try:
+            code = compile(f"lambda {params}: ({source}\n)", "<autoarg>", "eval")
+        except SyntaxError:
+            code = None
+
+        self.source = None if code is None else source
+        if code is None:
+            self.kind = ExpressionKind.LITERAL
+        elif not names:
+            self.kind = ExpressionKind.CONSTANT
+        elif len(names) == 1 and source.strip() == _mangle(names[0]):
+            self.kind = ExpressionKind.PASSTHROUGH
+        else:
+            self.kind = ExpressionKind.EXPRESSION
+
+        self._template = Template(template)
+        self._function = None if code is None else eval(code, {})
+        # types of the inputs for which `_function` raises
+        self._fallback_types = set()
+        # function over `numpy` columns, built on first use; `None` if the
+        # expression cannot be vectorized
+        self._columns_function = ...
+
+    def __call__(self, dict_of_values: Dict[str, Any]) -> Any:
+        kind = self.kind
+        if kind is ExpressionKind.PASSTHROUGH:
+            return dict_of_values[self.names[0]]
+
+        if kind is ExpressionKind.LITERAL:
+            # the substituted text may still be python, e.g. `${x} ${op} ${y}`
+            return self._fallback(dict_of_values)
+
+        values = [dict_of_values[name] for name in self.names]
+        fallback_types = self._fallback_types
+        if fallback_types and tuple(map(type, values)) in fallback_types:
+            return self._fallback(dict_of_values)
+        try:
+            return self._function(*values)
+        except (TypeError, NameError):
+            # failing for the types of the inputs, not for their values
+            fallback_types.add(tuple(map(type, values)))
+            return self._fallback(dict_of_values)
+        except Exception:
+            return self._fallback(dict_of_values)
+
+    def _fallback(self, dict_of_values: Dict[str, Any]) -> Any:
+        eqn = self._substitute(dict_of_values)
+        code = _compile_text(eqn)
+        if code is None:
+            return eqn
+        try:
+            return eval(code, {})
+        except Exception:
+            return eqn
+
+    def evaluate_columns(self, columns: Mapping[str, Any], n: int) -> Any:
+        """
+        Evaluate the expression over columns of `n` values. Requires `numpy`.
+
+        Expressions made of arithmetic, comparisons, conditional
+        expressions, `max`, `min`, `abs` and `int`/`float`/`bool` casts are
+        evaluated once over the whole columns. Others, and vectorized
+        evaluations which raise (floating point errors and integer overflows
+        included), fall back to evaluating the expression value by value.
+
+        Parameters
+        ----------
+        columns : Mapping[str, numpy.ndarray]
+            Map from the referenced names to columns of length `n`.
+        n : int
+            Number of values.
+
+        Returns
+        -------
+        numpy.ndarray
+            Column of the outputs.
+        """
+        import numpy as np
+
+        from .batch import _to_column
+
+        kind = self.kind
+        if kind is ExpressionKind.PASSTHROUGH:
+            return columns[self.names[0]]
+
+        inputs = [columns[name] for name in self.names]
+        if kind is ExpressionKind.EXPRESSION:
+            function = self._vectorized()
+            if function is not None:
+                try:
+                    with np.errstate(all="raise"):
+                        column = np.asarray(function(*inputs))
+                        if _wrapped(function, inputs, column):
+                            raise OverflowError(self.template)
+                    if column.shape == ():
+                        column = np.broadcast_to(column, (n,)).copy()
+                    if column.shape == (n,):
+                        return column
+                except Exception:
+                    pass
+
+        if not inputs:
+            return _to_column([self({})] * n)
+        rows = zip(*(column.tolist() for column in inputs))
+        return _to_column([self(dict(zip(self.names, row))) for row in rows])
+
+    def _vectorized(self) -> Optional[Callable[..., Any]]:
+        if self._columns_function is ...:
+            import numpy as np
+
+            self._columns_function = None
+            if self.kind is ExpressionKind.EXPRESSION:
+                params = [_mangle(name) for name in self.names]
+                try:
+                    code = _vectorize(self.source, params)
+                except (_NotVectorizable, SyntaxError):
+                    pass
+                else:
+                    self._columns_function = eval(code, {"_np": np})
+        return self._columns_function
+
+    def _substitute(self, dict_of_values: Dict[str, Any]) -> str:
+        return self._template.substitute(
+            {name: str(dict_of_values[name]) for name in self.names}
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.template!r})"
+
+    def __eq__(self, other: "Expression") -> bool:
+        return isinstance(other, Expression) and self.template == other.template
+
+    def __reduce__(self) -> Tuple[type, Tuple[str]]:
+        return self.__class__, (self.template,)
@@ -1,9 +1,20 @@
+import threading
 from enum import Enum
 from typing import *
 
+from . import profiling
 from .operators import Operator
+from .views import FilteredView
 
-__all__ = ["Filter", "NormalMode", "BlackList", "WhiteList"]
+__all__ = [
+    "Filter",
+    "NormalMode",
+    "BlackList",
+    "WhiteList",
+    "KeyUniverse",
+    "BitsetFilter",
+    "default_universe",
+]
 
 
 class NormalMode(Enum):
@@ -84,22 +95,103 @@ class Filter(Operator):
         self.mode = mode
 
     def operate(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        profiler = profiling.active.get()
+        if profiler is not None:
+            return profiler.run(self, self._filter, dict_of_values)
+        return self._filter(dict_of_values)
 
+    def _filter(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+
+        # only the kept values are read from (lazy) mappings
         filtered_values = {}
-        for name, value in dict_of_values.items():
+        for name in dict_of_values:
             if name in self.args:
                 if self.args[name]:
-                    filtered_values[name] = value
+                    filtered_values[name] = dict_of_values[name]
             else:  # grey variable
                 if self.mode == NormalMode.WHITE:
                     # normal white: grey -> white
-                    filtered_values[name] = value
+                    filtered_values[name] = dict_of_values[name]
 
         return filtered_values
 
+    def view(self, dict_of_values: Dict[str, Any]) -> FilteredView:
+        """
+        Filter the values like `operate` and return a read-only view of the
+        kept keys over `dict_of_values`, without copying the values.
+
+        Parameters
+        ----------
+        dict_of_values : Dict[str, Any]
+            Values to filter.
+
+        Returns
+        -------
+        FilteredView
+            Mapping of the kept values; `materialize()` returns the output of
+            `operate`.
+        """
+        profiler = profiling.active.get()
+        if profiler is not None:
+            return profiler.run(self, self._view, dict_of_values)
+        return self._view(dict_of_values)
+
+    def _view(self, dict_of_values: Dict[str, Any]) -> FilteredView:
+        return FilteredView(dict_of_values, self.keeps)
+
+    def operate_delta(
+        self,
+        dict_of_values: Dict[str, Any],
+        output: Dict[str, Any],
+        changed: Optional[AbstractSet[str]],
+    ) -> Tuple[Dict[str, Any], Optional[AbstractSet[str]]]:
+        if changed is None:
+            return self.operate(dict_of_values), None
+
+        names = frozenset(name for name in changed if self.keeps(name))
+        out = dict(output)
+        for name in names:
+            out[name] = dict_of_values[name]
+        return out, names
+
+    def to_bitset(self, universe: Optional["KeyUniverse"] = None) -> "BitsetFilter":
+        """Convert to a `BitsetFilter` over `universe` (the default universe
+        if `None`)."""
+        return BitsetFilter(self.args, self.mode, universe=universe)
+
+    def keeps(self, name: str) -> bool:
+        """Whether the filter keeps the keyword variable `name`."""
+        if name in self.args:
+            return self.args[name]
+        return self.mode == NormalMode.WHITE
+
+    def output_names(
+        self, input_names: Optional[AbstractSet[str]]
+    ) -> Optional[FrozenSet[str]]:
+        if input_names is None:
+            return None
+        return frozenset(name for name in input_names if self.keeps(name))
+
+    def prune(
+        self, needed: Optional[AbstractSet[str]]
+    ) -> Tuple["Filter", Optional[FrozenSet[str]]]:
+        return self, None if needed is None else frozenset(needed)
+
     @classmethod
     def from_dict(cls, dict_of_init_kwargs: Dict[str, Any]) -> "Filter":
-        return cls(**dict_of_init_kwargs)
+        return cls._from_specs(**dict_of_init_kwargs)
+
+    @classmethod
+    def _from_specs(
+        cls, specs: Dict[str, bool], mode: Union[str, NormalMode] = "normal_white"
+    ) -> "Filter":
+        # the specs and mode of `to_dict` and binary manifests; subclasses
+        # with other constructors override it
+        return cls(specs, mode)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Manifest of the filter, built back by `Filter.from_dict`."""
+        return {"specs": dict(self.args), "mode": self.mode.value}
 
     def __eq__(self, other: "Filter") -> bool:
         _, self_args, other_args = self._binary_op_util(other)
@@ -162,6 +254,15 @@ class BlackList(Filter):
         mode = NormalMode.WHITE
         super().__init__(bools, mode)
 
+    @classmethod
+    def _from_specs(
+        cls, specs: Dict[str, bool], mode: Union[str, NormalMode] = "normal_white"
+    ) -> "BlackList":
+        assert NormalMode(mode) == NormalMode.WHITE and not any(
+            specs.values()
+        ), "The manifest does not hold a `BlackList`."
+        return cls(*specs)
+
 
 class WhiteList(Filter):
     """WhiteList Filter keeps all variables within the `white_list` and removes
@@ -171,3 +272,256 @@ class WhiteList(Filter):
         bools = {name: True for name in white_list}
         mode = NormalMode.BLACK
         super().__init__(bools, mode)
+
+    @classmethod
+    def _from_specs(
+        cls, specs: Dict[str, bool], mode: Union[str, NormalMode] = "normal_white"
+    ) -> "WhiteList":
+        assert NormalMode(mode) == NormalMode.BLACK and all(
+            specs.values()
+        ), "The manifest does not hold a `WhiteList`."
+        return cls(*specs)
+
+
+class KeyUniverse:
+    """
+    KeyUniverse interns names into bit positions shared by `BitsetFilter`s.
+
+    Attributes
+    ----------
+    names : List[str]
+        Interned names; the position of a name is its bit.
+    index : Dict[str, int]
+        Map from interned names to their bit.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names = []
+        self.index = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """Return the bit of `name`, interning it if new."""
+        bit = self.index.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self.index.get(name)
+                if bit is None:
+                    bit = len(self.names)
+                    self.names.append(name)
+                    self.index[name] = bit
+        return bit
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitset of `names`."""
+        bits = 0
+        for name in names:
+            bits |= 1 << self.intern(name)
+        return bits
+
+    def names_of(self, bits: int) -> List[str]:
+        """Names of the bits set in `bits`."""
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __reduce__(self) -> Union[str, Tuple[type, Tuple[Tuple[str, ...]]]]:
+        if self is default_universe:
+            # unpickled as the default universe of the loading process
+            return "default_universe"
+        return self.__class__, (tuple(self.names),)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} names)"
+
+
+default_universe = KeyUniverse()
+
+
+class BitsetFilter(Filter):
+    """
+    Filter storing its specs as bitsets over a `KeyUniverse`.
+
+    `&`, `|` and `~` between filters of the same universe are bitwise
+    operations, and `operate` projects onto keep/drop sets computed once.
+
+    Parameters
+    ----------
+    specs : Dict[str, bool]
+        Dictionary of `bool` variables indicating whether the filter keeps
+        (`True`) or removes (`False`) the keyword variable.
+    mode : Union[str, NormalMode]
+        The mode of filter is the default treatment of unspecified grey variables.
+    universe : Optional[KeyUniverse]
+        Universe interning the names; `default_universe` if `None`.
+
+    Attributes
+    ----------
+    specified : int
+        Bitset of the specified variables.
+    kept : int
+        Bitset of the specified variables which are kept.
+    mode : NormalMode
+        The mode of filter is the default treatment of unspecified grey variables.
+    universe : KeyUniverse
+        Universe interning the names.
+    """
+
+    def __init__(
+        self,
+        specs: Dict[str, bool],
+        mode: Union[str, NormalMode] = "normal_white",
+        universe: Optional[KeyUniverse] = None,
+    ) -> None:
+        universe = default_universe if universe is None else universe
+        self._init_bits(
+            universe.mask(specs),
+            universe.mask(name for name, keep in specs.items() if keep),
+            mode,
+            universe,
+        )
+
+    def _init_bits(
+        self,
+        specified: int,
+        kept: int,
+        mode: Union[str, NormalMode],
+        universe: KeyUniverse,
+    ) -> None:
+        if isinstance(mode, str):
+            mode = NormalMode(mode)
+        self.specified = specified
+        self.kept = kept
+        self.mode = mode
+        self.universe = universe
+        self._projection = None
+
+    @classmethod
+    def from_bits(
+        cls,
+        specified: int,
+        kept: int,
+        mode: Union[str, NormalMode],
+        universe: KeyUniverse,
+    ) -> "BitsetFilter":
+        f = cls.__new__(cls)
+        f._init_bits(specified, kept & specified, mode, universe)
+        return f
+
+    def __reduce__(self) -> Tuple[Any, tuple]:
+        if self.universe is default_universe:
+            # the bits of the default universe differ between processes
+            return self.__class__, (self.args, self.mode.value)
+        return self.from_bits, (self.specified, self.kept, self.mode, self.universe)
+
+    @property
+    def args(self) -> Dict[str, bool]:
+        kept = set(self.universe.names_of(self.kept))
+        return {name: name in kept for name in self.universe.names_of(self.specified)}
+
+    def __len__(self) -> int:
+        return bin(self.specified).count("1")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.args}, {self.mode!r})"
+
+    def _keep_or_drop(self) -> FrozenSet[str]:
+        # normal white filters drop the specified names which are not kept,
+        # normal black filters keep the kept names
+        if self._projection is None:
+            if self.mode == NormalMode.WHITE:
+                bits = self.specified & ~self.kept
+            else:
+                bits = self.kept
+            self._projection = frozenset(self.universe.names_of(bits))
+        return self._projection
+
+    def _filter(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        names = self._keep_or_drop()
+        if self.mode == NormalMode.WHITE:
+            return {k: dict_of_values[k] for k in dict_of_values if k not in names}
+        return {k: dict_of_values[k] for k in dict_of_values if k in names}
+
+    def _view(self, dict_of_values: Dict[str, Any]) -> FilteredView:
+        # membership in the projection instead of bit operations per key
+        names = self._keep_or_drop()
+        if self.mode == NormalMode.WHITE:
+            return FilteredView(dict_of_values, lambda name: name not in names)
+        return FilteredView(dict_of_values, names.__contains__)
+
+    def keeps(self, name: str) -> bool:
+        bit = self.universe.index.get(name)
+        if bit is None or not (self.specified >> bit) & 1:
+            return self.mode == NormalMode.WHITE
+        return bool((self.kept >> bit) & 1)
+
+    def to_bitset(self, universe: Optional[KeyUniverse] = None) -> "BitsetFilter":
+        if universe is None or universe is self.universe:
+            return self
+        return super().to_bitset(universe)
+
+    def _effective(self, specified: int) -> int:
+        # kept bits over `specified`, grey variables follow the mode
+        if self.mode == NormalMode.WHITE:
+            return (self.kept | ~self.specified) & specified
+        return self.kept & specified
+
+    def _same_universe(self, other: Filter) -> Optional["BitsetFilter"]:
+        assert isinstance(other, Filter), "Other must be a `Filter`"
+        if isinstance(other, BitsetFilter) and other.universe is self.universe:
+            return other
+        if not isinstance(other, BitsetFilter):
+            return other.to_bitset(self.universe)
+        return None
+
+    def __eq__(self, other: "Filter") -> bool:
+        if not isinstance(other, Filter):
+            return False
+        other_bits = self._same_universe(other)
+        if other_bits is None:
+            return super().__eq__(other)
+        specified = self.specified | other_bits.specified
+        return (
+            self._effective(specified) == other_bits._effective(specified)
+            and self.mode == other_bits.mode
+        )
+
+    def __and__(self, other: "Filter") -> "Filter":
+        other_bits = self._same_universe(other)
+        if other_bits is None:
+            return super().__and__(other)
+        specified = self.specified | other_bits.specified
+        kept = self._effective(specified) & other_bits._effective(specified)
+        if self.mode == NormalMode.WHITE and other_bits.mode == NormalMode.WHITE:
+            mode = NormalMode.WHITE
+        else:
+            mode = NormalMode.BLACK
+        return BitsetFilter.from_bits(specified, kept, mode, self.universe)
+
+    def __or__(self, other: "Filter") -> "Filter":
+        other_bits = self._same_universe(other)
+        if other_bits is None:
+            return super().__or__(other)
+        specified = self.specified | other_bits.specified
+        kept = self._effective(specified) | other_bits._effective(specified)
+        if self.mode == NormalMode.WHITE or other_bits.mode == NormalMode.WHITE:
+            mode = NormalMode.WHITE
+        else:
+            mode = NormalMode.BLACK
+        return BitsetFilter.from_bits(specified, kept, mode, self.universe)
+
+    def __invert__(self) -> "BitsetFilter":
+        return BitsetFilter.from_bits(
+            self.specified,
+            ~self.kept,
+            NormalMode.opposite_mode(self.mode),
+            self.universe,
+        )
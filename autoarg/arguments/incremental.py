@@ -0,0 +1,93 @@
+from typing import *
+
+from .operators import Operator
+from .pipeline import FusedStage, Pipeline
+
+__all__ = ["Incremental"]
+
+
+class Incremental:
+    """
+    Output of an operator on a base dictionary of values, updated by deltas
+    of the values without redoing the work of the unchanged ones.
+
+    A `Validator` only checks the changed arguments and a `Converter` only
+    evaluates the expressions referencing a changed value. The stages of a
+    `Pipeline` (and of a `FusedStage`) pass on the names of the values they
+    changed to the next stage. Other operators run on all the values.
+
+    Parameters
+    ----------
+    operator : Operator
+        Operator, e.g. a `Validator`, a `Converter` or a `Pipeline`.
+    dict_of_values : Dict[str, Any]
+        Base input values.
+
+    Attributes
+    ----------
+    operator : Operator
+        The operator.
+    values : Dict[str, Any]
+        Current input values.
+    output : Dict[str, Any]
+        Output of the operator on `values`.
+    """
+
+    def __init__(self, operator: Operator, dict_of_values: Dict[str, Any]) -> None:
+        self.operator = operator
+        self.stages = []
+        for op in operator.args if isinstance(operator, Pipeline) else [operator]:
+            if isinstance(op, FusedStage):
+                self.stages.extend(op.args)
+            else:
+                self.stages.append(op)
+
+        self.values = dict(dict_of_values)
+        self._outputs = []
+        values = self.values
+        for op in self.stages:
+            values = op.operate(values)
+            self._outputs.append(values)
+
+    @property
+    def output(self) -> Dict[str, Any]:
+        return self._outputs[-1] if self._outputs else self.values
+
+    def _propagate(self, delta: Dict[str, Any]) -> List[Dict[str, Any]]:
+        values = {**self.values, **delta}
+        changed = frozenset(delta)
+        outputs = []
+        for op, output in zip(self.stages, self._outputs):
+            values, changed = op.operate_delta(values, output, changed)
+            outputs.append(values)
+        return outputs
+
+    def evaluate(self, delta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Output of the operator on the current values updated with `delta`,
+        leaving the state unchanged, e.g. for the points of a sweep around a
+        base configuration.
+
+        Parameters
+        ----------
+        delta : Dict[str, Any]
+            New values of some of the keys.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Output of the operator.
+        """
+        outputs = self._propagate(delta)
+        return outputs[-1] if outputs else {**self.values, **delta}
+
+    def update(self, delta: Dict[str, Any]) -> Dict[str, Any]:
+        """Like `evaluate`, and make the updated values the current ones. The
+        state is unchanged if the operator raises."""
+        outputs = self._propagate(delta)
+        self.values = {**self.values, **delta}
+        self._outputs = outputs
+        return self.output
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.operator!r})"
@@ -1,12 +1,22 @@
-import string
+import os
 from typing import *
 
-import yaml
-
 from ..constraints import *
+from . import profiling
 from .argument import *
+from .batch import BatchResult, _as_column, validate_columns, validate_records
+from .cache import ManifestCache
+from .expressions import _OUTPUT, Expression
+from .sampling import grid_records, sample_records
+from .views import LazyMapping, ValidatedView
 
-__all__ = ["Validator", "Converter"]
+__all__ = [
+    "Validator",
+    "CompiledValidator",
+    "Converter",
+    "ValidatedValues",
+    "ConvertedValues",
+]
 
 
 class Operator:
@@ -43,31 +53,413 @@ class Operator:
     def __len__(self) -> int:
         return len(self.args)
 
+    def __rshift__(self, other: "Operator") -> "Operator":
+        from .pipeline import Pipeline
+
+        return Pipeline([self, other])
+
+    def output_names(
+        self, input_names: Optional[AbstractSet[str]]
+    ) -> Optional[FrozenSet[str]]:
+        """
+        Names of the output given the names of the input.
+
+        Parameters
+        ----------
+        input_names : Optional[AbstractSet[str]]
+            Names of the input values; `None` if unknown.
+
+        Returns
+        -------
+        Optional[FrozenSet[str]]
+            Names of the output values; `None` if they cannot be determined.
+        """
+        return None
+
+    def prune(
+        self, needed: Optional[AbstractSet[str]]
+    ) -> Tuple["Operator", Optional[FrozenSet[str]]]:
+        """
+        Specialize the operator to produce only the `needed` output values.
+
+        Parameters
+        ----------
+        needed : Optional[AbstractSet[str]]
+            Names of the output values used downstream; `None` if all are.
+
+        Returns
+        -------
+        Tuple[Operator, Optional[FrozenSet[str]]]
+            The pruned operator and the names of the input values it reads;
+            `None` if it may read any of them.
+        """
+        return self, None
+
+    def operate_delta(
+        self,
+        dict_of_values: Dict[str, Any],
+        output: Dict[str, Any],
+        changed: Optional[AbstractSet[str]],
+    ) -> Tuple[Dict[str, Any], Optional[AbstractSet[str]]]:
+        """
+        Output of `operate` after some input values changed, reusing the
+        previous output. The generic version operates on all the values.
+
+        Parameters
+        ----------
+        dict_of_values : Dict[str, Any]
+            New input values.
+        output : Dict[str, Any]
+            Output of `operate` on the previous input values.
+        changed : Optional[AbstractSet[str]]
+            Names of the input values which changed; `None` if unknown.
+
+        Returns
+        -------
+        Tuple[Dict[str, Any], Optional[AbstractSet[str]]]
+            The new output and the names of the output values which may have
+            changed (`None` if unknown).
+        """
+        return self.operate(dict_of_values), None
+
+    def incremental(self, dict_of_values: Dict[str, Any]) -> "Incremental":
+        """State of the operator on `dict_of_values`, updated by deltas of
+        the values; see `Incremental`."""
+        from .incremental import Incremental
+
+        return Incremental(self, dict_of_values)
+
+    def map_parallel(
+        self,
+        records: Iterable[Dict[str, Any]],
+        workers: Optional[int] = None,
+        chunksize: int = 256,
+    ) -> Iterator["RecordResult"]:
+        """
+        Lazily run the operator over the records in a pool of `workers`
+        processes. The operator is shipped to every worker once and the
+        records in chunks of `chunksize`; a record whose operation raises is
+        reported with its exception, like `Pipeline.stream`.
+
+        Yields
+        ------
+        RecordResult
+            Result of every record, in input order.
+        """
+        from .parallel import map_parallel
+
+        return map_parallel(self, records, workers, chunksize)
+
     @classmethod
     def from_dict(cls, dict_of_x: Dict[str, List[Constraint]]) -> "Operator":
         raise NotImplementedError("Class Method `from_dict` must be implemented.")
 
     @classmethod
-    def from_yaml(cls, yaml_string: str) -> "Operator":
-        init = yaml.safe_load(yaml_string)
-        return cls.from_dict(init)
+    def from_yaml(
+        cls,
+        yaml_string: str,
+        cache: Union[None, bool, str, ManifestCache] = None,
+        backend: str = "auto",
+        **kwargs: Any,
+    ) -> "Operator":
+        """
+        Build the operator from a YAML manifest.
+
+        Parameters
+        ----------
+        yaml_string : str
+            Text of the manifest.
+        cache : Union[None, bool, str, ManifestCache]
+            Opt-in on-disk cache of the built operator: `True` for the default
+            `ManifestCache`, a directory, or a `ManifestCache`.
+        backend : str
+            YAML parser: `"auto"` for libyaml if PyYAML is built with it,
+            `"c"` or `"python"` (see `autoarg.loaders.yaml_loader`).
+        **kwargs : Any
+            Options passed to `from_dict`.
+
+        Returns
+        -------
+        Operator
+            The operator.
+        """
+        from ..loaders import load_yaml
+
+        def build():
+            return cls.from_dict(load_yaml(yaml_string, backend), **kwargs)
+
+        if cache is None or cache is False:
+            return build()
+        if cache is True:
+            cache = ManifestCache()
+        elif isinstance(cache, str):
+            cache = ManifestCache(cache)
+        if kwargs:
+            # options change the built operator
+            yaml_string = f"{yaml_string}\0{sorted(kwargs.items())!r}"
+        return cache.load(cls, yaml_string, build)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Union[str, os.PathLike],
+        format: Optional[str] = None,
+        backend: str = "auto",
+        **kwargs: Any,
+    ) -> "Operator":
+        """
+        Build the operator from a manifest file, read incrementally by the
+        YAML parser instead of as a whole string.
+
+        Parameters
+        ----------
+        path : Union[str, os.PathLike]
+            Path of the manifest.
+        format : Optional[str]
+            `"yaml"`, `"json"` or a format registered with
+            `autoarg.loaders.register_loader`; guessed from the suffix of
+            `path` if `None`, YAML for unknown suffixes.
+        backend : str
+            YAML parser, see `from_yaml`.
+        **kwargs : Any
+            Options passed to `from_dict`.
+
+        Returns
+        -------
+        Operator
+            The operator.
+        """
+        from ..loaders import load_file
+
+        return cls.from_dict(load_file(path, format, backend), **kwargs)
+
+    @classmethod
+    def from_stream(
+        cls,
+        stream: Union[str, bytes, IO],
+        format: str = "yaml",
+        backend: str = "auto",
+        **kwargs: Any,
+    ) -> "Operator":
+        """
+        Build the operator from a manifest read from a file object, e.g. a
+        pipe or a socket, see `from_file`.
+
+        Parameters
+        ----------
+        stream : Union[str, bytes, IO]
+            File object of the manifest, or its text.
+        format : str
+            Format of the manifest, see `from_file`.
+        backend : str
+            YAML parser, see `from_yaml`.
+        **kwargs : Any
+            Options passed to `from_dict`.
+
+        Returns
+        -------
+        Operator
+            The operator.
+        """
+        from ..loaders import load_stream
+
+        return cls.from_dict(load_stream(stream, format, backend), **kwargs)
 
     def to_dict(self) -> Dict[str, Any]:
         return self.__dict__
 
-    def to_yaml(self, **kwargs: Any) -> str:
+    def to_binary(self, path: Union[None, str, os.PathLike] = None) -> bytes:
+        """
+        Serialize the operator into a binary manifest (see
+        `autoarg.arguments.binary` for the format), for `Validator`s,
+        `Converter`s and `Filter`s.
+
+        Parameters
+        ----------
+        path : Union[None, str, os.PathLike]
+            File to write the manifest to, if any.
+
+        Returns
+        -------
+        bytes
+            The binary manifest.
+        """
+        from .binary import dump
+
+        data = dump(self)
+        if path is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+        return data
+
+    @classmethod
+    def from_binary(
+        cls, source: Union[bytes, str, os.PathLike, "BinaryManifest"]
+    ) -> "Operator":
+        """
+        Load an operator from a binary manifest written by `to_binary`.
+
+        A path is mapped in memory, so the processes loading the same file
+        share its pages. The arguments of a `Validator` are decoded on first
+        access; a `CompiledValidator` decodes them all when compiling.
+
+        Parameters
+        ----------
+        source : Union[bytes, str, os.PathLike, BinaryManifest]
+            The manifest, or the path of its file.
+
+        Returns
+        -------
+        Operator
+            The operator.
+        """
+        from .binary import load
+
+        return load(source, cls)
+
+    def to_yaml(self, backend: str = "auto", **kwargs: Any) -> str:
+        from ..loaders import dump_yaml
+
         d = self.to_dict()
-        return yaml.safe_dump(d, **kwargs)
+        return dump_yaml(d, backend=backend, **kwargs)
+
+
+class ValidatedValues(dict):
+    """
+    Output of a `Validator` attaching the decoded payloads.
+
+    Attributes
+    ----------
+    payloads : Dict[str, Any]
+        Payloads decoded while validating, e.g. the parsed `ValidJson`
+        arguments.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.payloads = {}
+
+
+class ConvertedValues(LazyMapping):
+    """
+    Output of `Converter.view`: every expression is evaluated on first
+    access, after the outputs it references, and memoized.
+
+    The input values are read when the expressions are evaluated. All the
+    referenced inputs are checked to exist when the mapping is created.
+
+    Parameters
+    ----------
+    converter : Converter
+        The converter.
+    dict_of_values : Dict[str, Any]
+        Input values.
+    """
+
+    __slots__ = ("_converter", "_values", "_cache")
+
+    def __init__(self, converter: "Converter", dict_of_values: Dict[str, Any]) -> None:
+        if not converter._inputs <= dict_of_values.keys():
+            for name in converter._inputs:
+                if name not in dict_of_values:
+                    raise KeyError(name)
+        self._converter = converter
+        self._values = dict_of_values
+        self._cache = {}
+
+    def __getitem__(self, name: str) -> Any:
+        cache = self._cache
+        if name in cache:
+            return cache[name]
+
+        converter = self._converter
+        if name in converter._independent:
+            # fast path: the expression only reads inputs
+            value = cache[name] = converter.expressions[name](self._values)
+            return value
+        if name not in converter.expressions:
+            raise KeyError(name)
+        values = self._values
+        for out in converter._evaluation_order(name, cache):
+            cache[out] = converter.expressions[out](
+                converter._scope(out, values, cache)
+            )
+        return cache[name]
+
+    def __iter__(self) -> Iterator[str]:
+        # the keys are known without evaluating the outputs
+        return iter(self._converter.expressions)
+
+    def __len__(self) -> int:
+        return len(self._converter.expressions)
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._converter.expressions
+
+    def items(self) -> ItemsView:
+        return self.materialize().items()
+
+    def values(self) -> ValuesView:
+        return self.materialize().values()
+
+    def materialize(self) -> Dict[str, Any]:
+        """Evaluate all the outputs into a `dict`."""
+        cache = self._cache
+        values = self._values
+        converter = self._converter
+        independent = converter._independent
+        for name, expression in converter.expressions.items():
+            if name in cache:
+                continue
+            if name in independent:
+                cache[name] = expression(values)
+            else:
+                self[name]
+        return {name: cache[name] for name in converter.expressions}
 
 
 class Validator(Operator):
-    """Validator validates a dictionary of values using a dictionary of
-    `Argument`s."""
+    """
+    Validator validates a dictionary of values using a dictionary of
+    `Argument`s.
+
+    Parameters
+    ----------
+    dict_of_args : Dict[str, Argument]
+        Dictionary of `Argument`s.
+    payloads : str
+        What to do with the payloads decoded by `Decoder` constraints (e.g.
+        `ValidJson`, `ValidYaml`) while validating:
+        `"ignore"` discards them, `"attach"` returns a `ValidatedValues` with
+        the payloads in its `payloads` attribute and `"replace"` outputs the
+        payloads instead of the serialized values.
+
+    Attributes
+    ----------
+    args : Dict[str, Argument]
+        Dictionary of `Argument`s.
+    payloads : str
+        Treatment of the decoded payloads.
+    """
 
-    def __init__(self, dict_of_args: Dict[str, Argument]) -> None:
+    _payload_modes = ("ignore", "attach", "replace")
+
+    def __init__(
+        self, dict_of_args: Dict[str, Argument], payloads: str = "ignore"
+    ) -> None:
         super().__init__(dict_of_args)
+        assert (
+            payloads in self._payload_modes
+        ), f"`payloads` must be in {self._payload_modes}."
+        self.payloads = payloads
 
     def operate(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        profiler = profiling.active.get()
+        if profiler is not None:
+            return profiler.run(self, self._operate_profiled, dict_of_values)
+        if self.payloads != "ignore":
+            return self._operate_decoding(dict_of_values)
+
         valid_args = {}
         for name, arg in self.args.items():
             if name in dict_of_values:
@@ -83,34 +475,646 @@ class Validator(Operator):
 
         return valid_args
 
+    def _operate_decoding(
+        self,
+        dict_of_values: Dict[str, Any],
+        decode: Optional[Callable[[str, Argument, Any], Tuple[bool, Any]]] = None,
+    ) -> Dict[str, Any]:
+        mode = self.payloads
+        valid_args = ValidatedValues() if mode == "attach" else {}
+        for name, arg in self.args.items():
+            if name in dict_of_values:
+                value = dict_of_values[name]
+                if decode is None:
+                    ok, payload = arg.decode(value)
+                else:
+                    ok, payload = decode(name, arg, value)
+                assert ok, f"Value {name} = {value} is not compatible with {str(arg)}."
+                if mode == "replace":
+                    valid_args[name] = payload
+                else:
+                    valid_args[name] = value
+                    if mode == "attach" and arg.decoder is not None:
+                        valid_args.payloads[name] = payload
+            else:
+                assert (
+                    not arg.required
+                ), f"Argument `{name}` is required but not provided."
+                valid_args[name] = arg.default
+
+        return valid_args
+
+    def _operate_profiled(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        profiler = profiling.active.get()
+        return self._operate_decoding(
+            dict_of_values, lambda name, arg, value: profiler.decode(arg, value)
+        )
+
+    def operate_delta(
+        self,
+        dict_of_values: Dict[str, Any],
+        output: Dict[str, Any],
+        changed: Optional[AbstractSet[str]],
+    ) -> Tuple[Dict[str, Any], Optional[AbstractSet[str]]]:
+        # only the changed arguments are validated
+        if changed is None:
+            return self.operate(dict_of_values), None
+
+        mode = self.payloads
+        if mode == "attach":
+            out = ValidatedValues(output)
+            out.payloads = dict(output.payloads)
+        else:
+            out = dict(output)
+        names = [name for name in changed if name in self.args]
+        for name in names:
+            arg = self.args[name]
+            value = dict_of_values[name]
+            if mode == "ignore":
+                ok, payload = arg(value), value
+            else:
+                ok, payload = arg.decode(value)
+            assert ok, f"Value {name} = {value} is not compatible with {str(arg)}."
+            if mode == "replace":
+                out[name] = payload
+            else:
+                out[name] = value
+                if mode == "attach" and arg.decoder is not None:
+                    out.payloads[name] = payload
+
+        return out, frozenset(names)
+
+    async def aoperate(
+        self,
+        dict_of_values: Dict[str, Any],
+        concurrency: int = 16,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous `operate`. The `AsyncConstraint`s of all the arguments
+        are awaited concurrently, after the synchronous constraints of their
+        argument passed; arguments without asynchronous constraints are
+        validated inline, without going through the event loop.
+
+        Parameters
+        ----------
+        dict_of_values : Dict[str, Any]
+            Values to validate.
+        concurrency : int
+            Maximum number of asynchronous checks running at once.
+        timeout : Optional[float]
+            Seconds after which an asynchronous check fails, unless the
+            constraint has its own `timeout`.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The validated values, like `operate`.
+        """
+        pending = [
+            name
+            for name, arg in self.args.items()
+            if arg.is_async and name in dict_of_values
+        ]
+        if not pending:
+            return self.operate(dict_of_values)
+
+        import asyncio
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(
+            *(
+                self.args[name].adecode(dict_of_values[name], semaphore, timeout)
+                for name in pending
+            )
+        )
+        decoded = dict(zip(pending, results))
+
+        def decode(name, arg, value):
+            if name in decoded:
+                return decoded[name]
+            return arg.decode(value)
+
+        return self._operate_decoding(dict_of_values, decode)
+
+    async def acall(self, *args, **kwargs) -> Dict[str, Any]:
+        assert not args, "Only keyword arguments allowed for validation."
+        return await self.aoperate(kwargs)
+
     @classmethod
-    def from_dict(cls, dict_of_constraints: Dict[str, List[Constraint]]) -> "Validator":
-        args = get_arguments_from_dict(dict_of_constraints)
-        return cls(args)
+    def from_dict(
+        cls,
+        dict_of_constraints: Dict[str, List[Constraint]],
+        order: str = "manifest",
+        **kwargs: Any,
+    ) -> "Validator":
+        args = get_arguments_from_dict(dict_of_constraints, order=order)
+        return cls(args, **kwargs)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Manifest of the validator: the constraints of every argument as
+        strings, built back by `from_dict`."""
+        return {
+            name: [c.to_string() for c in arg.constraints]
+            for name, arg in self.args.items()
+        }
+
+    def view(self, dict_of_values: Dict[str, Any]) -> ValidatedView:
+        """
+        Validate the values like `operate` and return a read-only view of the
+        output over `dict_of_values`, without copying the values.
+
+        Parameters
+        ----------
+        dict_of_values : Dict[str, Any]
+            Values to validate.
+
+        Returns
+        -------
+        ValidatedView
+            Mapping of the validated values and the defaults of the missing
+            ones; `materialize()` returns the output of `operate`.
+        """
+        assert (
+            self.payloads == "ignore"
+        ), "Views do not carry payloads; use `operate` for the payloads."
+        profiler = profiling.active.get()
+        if profiler is not None:
+            return profiler.run(self, self._view, dict_of_values)
+        return self._view(dict_of_values)
+
+    def _view(self, dict_of_values: Dict[str, Any]) -> ValidatedView:
+        return ValidatedView(dict_of_values, self.args, self.check(dict_of_values))
+
+    def check(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate the values like `operate` without building the output.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Defaults of the arguments missing from `dict_of_values`.
+        """
+        defaults = {}
+        for name, arg in self.args.items():
+            if name in dict_of_values:
+                assert arg(
+                    dict_of_values[name]
+                ), f"Value {name} = {dict_of_values[name]} is not compatible with {str(arg)}."
+            else:
+                assert (
+                    not arg.required
+                ), f"Argument `{name}` is required but not provided."
+                defaults[name] = arg.default
+
+        return defaults
+
+    def compile(self) -> "CompiledValidator":
+        return CompiledValidator(self.args, self.payloads)
+
+    def output_names(
+        self, input_names: Optional[AbstractSet[str]]
+    ) -> Optional[FrozenSet[str]]:
+        return frozenset(self.args)
+
+    def prune(
+        self, needed: Optional[AbstractSet[str]]
+    ) -> Tuple["Validator", Optional[FrozenSet[str]]]:
+        op = self
+        if needed is not None:
+            args = {name: arg for name, arg in self.args.items() if name in needed}
+            if len(args) < len(self.args):
+                op = self.__class__(args, self.payloads)
+        return op, frozenset(op.args)
+
+    def map_parallel(
+        self,
+        records: Iterable[Dict[str, Any]],
+        workers: Optional[int] = None,
+        chunksize: int = 256,
+    ) -> Iterator["RecordResult"]:
+        # the workers run the compiled checks
+        return Operator.map_parallel(self.compile(), records, workers, chunksize)
+
+    def validate_batch(self, records: Iterable[Dict[str, Any]]) -> BatchResult:
+        """
+        Validate a batch of records at once with vectorized constraints.
+        Requires `numpy`.
+
+        Parameters
+        ----------
+        records : Iterable[Dict[str, Any]]
+            Dictionaries of values, as passed to `operate`.
+
+        Returns
+        -------
+        BatchResult
+            Mask of the valid records, per-record failure reasons and the
+            validated columns with the defaults filled in.
+        """
+        return validate_records(self.args, records)
+
+    def validate_columns(self, columns: Dict[str, Any]) -> BatchResult:
+        """
+        Validate columns of values at once with vectorized constraints.
+        Requires `numpy`.
+
+        Parameters
+        ----------
+        columns : Dict[str, numpy.ndarray]
+            Map from argument names to equal-length columns of values.
+
+        Returns
+        -------
+        BatchResult
+            Mask of the valid rows, per-row failure reasons and the validated
+            columns with the defaults filled in.
+        """
+        return validate_columns(self.args, columns)
+
+    def grid(
+        self, dict_of_values: Dict[str, Sequence[Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the Cartesian product of the given values of some arguments,
+        e.g. `validator.grid({"lr": [1e-3, 1e-2], "depth": [2, 4, 8]})`.
+
+        Every value is validated once, so the configurations are valid by
+        construction; the other arguments take their default.
+
+        Parameters
+        ----------
+        dict_of_values : Dict[str, Sequence[Any]]
+            Map from argument names to their values in the grid.
+
+        Yields
+        ------
+        Dict[str, Any]
+            Validated configurations, like the outputs of `operate`.
+        """
+        return grid_records(self.args, dict_of_values)
+
+    def sample(
+        self,
+        n: Optional[int] = None,
+        seed: Optional[int] = None,
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        choices: Optional[Dict[str, Sequence[Any]]] = None,
+        chunk_size: int = 4096,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream random configurations drawn from the constraints, valid by
+        construction. Requires `numpy`.
+
+        Numeric arguments are drawn uniformly from their `InRange` unions
+        (as integers with `IsInteger`), booleans from `IsBool`; the other
+        arguments take their `choices` or their default.
+
+        Parameters
+        ----------
+        n : Optional[int]
+            Number of configurations; unlimited if `None`.
+        seed : Optional[int]
+            Seed of the random generator.
+        bounds : Optional[Dict[str, Tuple[float, float]]]
+            Closed bounds intersected with the ranges of numeric arguments;
+            required for unbounded ranges, e.g. `Positive`.
+        choices : Optional[Dict[str, Sequence[Any]]]
+            Values drawn uniformly for some arguments.
+        chunk_size : int
+            Number of configurations drawn at once with vectorized sampling.
+
+        Yields
+        ------
+        Dict[str, Any]
+            Validated configurations, like the outputs of `operate`.
+        """
+        return sample_records(self.args, n, seed, bounds, choices, chunk_size)
+
+
+class CompiledValidator(Validator):
+    """
+    Validator with every `Argument` compiled into one specialized check.
+
+    Parameters
+    ----------
+    dict_of_args : Dict[str, Argument]
+        Dictionary of `Argument`s.
+    payloads : str
+        Treatment of the decoded payloads, see `Validator`. Arguments with a
+        `Decoder` constraint are checked by their `Argument` unless
+        `payloads` is `"ignore"`.
+
+    Attributes
+    ----------
+    checks : List[Tuple[str, Argument, Callable[[Any], bool]]]
+        Name, argument and compiled check function of every argument.
+    """
+
+    def __init__(
+        self, dict_of_args: Dict[str, Argument], payloads: str = "ignore"
+    ) -> None:
+        super().__init__(dict_of_args, payloads)
+        self.checks = [(name, arg, arg.compile()) for name, arg in self.args.items()]
+
+    def operate(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        profiler = profiling.active.get()
+        if profiler is not None:
+            return profiler.run(self, self._operate_profiled, dict_of_values)
+        if self.payloads != "ignore":
+            return self._operate_decoding(dict_of_values)
+
+        valid_args = {}
+        for name, arg, check in self.checks:
+            if name in dict_of_values:
+                value = dict_of_values[name]
+                assert check(
+                    value
+                ), f"Value {name} = {value} is not compatible with {str(arg)}."
+                valid_args[name] = value
+            else:
+                assert (
+                    not arg.required
+                ), f"Argument `{name}` is required but not provided."
+                valid_args[name] = arg.default
+
+        return valid_args
+
+    def check(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        defaults = {}
+        for name, arg, check in self.checks:
+            if name in dict_of_values:
+                value = dict_of_values[name]
+                assert check(
+                    value
+                ), f"Value {name} = {value} is not compatible with {str(arg)}."
+            else:
+                assert (
+                    not arg.required
+                ), f"Argument `{name}` is required but not provided."
+                defaults[name] = arg.default
+
+        return defaults
+
+    def compile(self) -> "CompiledValidator":
+        return self
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[str, Argument], str]]:
+        # the generated check functions are rebuilt on unpickling
+        return self.__class__, (self.args, self.payloads)
 
 
 class Converter(Operator):
-    """Converter converts a dictionary of argument values to another dictionary
-    of argument values."""
+    """
+    Converter converts a dictionary of argument values to another dictionary
+    of argument values.
+
+    Expressions reference input values, `${name}`, and may reference other
+    outputs, `${out.name}`. The references between outputs form a DAG: cycles
+    are rejected with a ValueError when the converter is built.
+
+    `operate` evaluates the outputs in dependency order; `view` returns a lazy
+    `ConvertedValues` mapping, which evaluates an expression on first access
+    (after the outputs it references).
+
+    Parameters
+    ----------
+    dict_of_template_strings : Dict[str, str]
+        Map from output names to `string.Template` strings of expressions.
+
+    Attributes
+    ----------
+    args : Dict[str, str]
+        Map from output names to `string.Template` strings of expressions.
+    expressions : Dict[str, Expression]
+        Map from output names to the compiled expressions.
+    """
 
     def __init__(self, dict_of_template_strings: Dict[str, str]) -> None:
         super().__init__(dict_of_template_strings)
+        self.expressions = {
+            name: Expression(eqn) for name, eqn in dict_of_template_strings.items()
+        }
+
+        # outputs referenced by every output
+        self._deps = {}
+        inputs = set()
+        for out, e in self.expressions.items():
+            deps = []
+            for name in e.names:
+                if not name.startswith(_OUTPUT):
+                    inputs.add(name)
+                    continue
+                dep = name[len(_OUTPUT) :]
+                if dep not in self.expressions:
+                    raise ValueError(f"`{out}` references the unknown output `{dep}`.")
+                deps.append(dep)
+            self._deps[out] = deps
+        self._inputs = frozenset(inputs)
+        self._check_acyclic()
+        # expressions which only read inputs
+        self._independent = frozenset(
+            out for out in self.expressions if not self._deps[out]
+        )
+
+        # map from input names, and `out.`-prefixed output names, to the
+        # outputs whose expressions reference them
+        self._dependents = {}
+        for out, e in self.expressions.items():
+            for name in e.names:
+                self._dependents.setdefault(name, []).append(out)
+
+    def _check_acyclic(self) -> None:
+        state = {}  # 1: on the current path, 2: done
+        for root in self.expressions:
+            if root in state:
+                continue
+            path = [root]
+            stack = [(root, iter(self._deps[root]))]
+            state[root] = 1
+            while stack:
+                name, deps = stack[-1]
+                for dep in deps:
+                    if state.get(dep) == 1:
+                        cycle = path[path.index(dep) :] + [dep]
+                        raise ValueError(
+                            f"Cyclic references between outputs: {' -> '.join(cycle)}."
+                        )
+                    if dep not in state:
+                        state[dep] = 1
+                        path.append(dep)
+                        stack.append((dep, iter(self._deps[dep])))
+                        break
+                else:
+                    stack.pop()
+                    path.pop()
+                    state[name] = 2
+
+    def _evaluation_order(self, name: str, outputs: Dict[str, Any]) -> List[str]:
+        """Outputs to evaluate to get `name`, dependencies first, skipping
+        those already in `outputs`."""
+        order = []
+        seen = {name}
+        stack = [(name, iter(self._deps[name]))]
+        while stack:
+            out, deps = stack[-1]
+            for dep in deps:
+                if dep not in seen and dep not in outputs:
+                    seen.add(dep)
+                    stack.append((dep, iter(self._deps[dep])))
+                    break
+            else:
+                stack.pop()
+                order.append(out)
+        return order
+
+    def _scope(
+        self, name: str, values: Mapping[str, Any], outputs: Dict[str, Any]
+    ) -> Mapping[str, Any]:
+        """Values read by the expression of `name`: the inputs, and the
+        outputs it references under their `out.` names."""
+        deps = self._deps[name]
+        if not deps:
+            return values
+        scope = {_OUTPUT + n: outputs[n] for n in deps}
+        for n in self.expressions[name].names:
+            if n not in scope:
+                scope[n] = values[n]
+        return scope
 
     def operate(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
-        dict_of_str = {k: str(v) for k, v in dict_of_values.items()}
-        new = {}
-        for name, eqn in self.args.items():
-            template = string.Template(eqn)
-            eqn = template.substitute(dict_of_str)
-            try:
-                new[name] = eval(eqn)
-            except Exception:
-                new[name] = eqn
-
-        return new
+        profiler = profiling.active.get()
+        if profiler is not None:
+            return profiler.run(self, self._operate_profiled, dict_of_values)
+        return ConvertedValues(self, dict_of_values).materialize()
+
+    def view(self, dict_of_values: Dict[str, Any]) -> "ConvertedValues":
+        """
+        Convert the values lazily: every output is evaluated on first access
+        of the returned mapping, so reading a few outputs of a large
+        converter only evaluates those and the outputs they reference.
+
+        Parameters
+        ----------
+        dict_of_values : Dict[str, Any]
+            Values to convert.
+
+        Returns
+        -------
+        ConvertedValues
+            Mapping of the outputs; `materialize()` returns the output of
+            `operate`.
+        """
+        out = ConvertedValues(self, dict_of_values)
+        profiler = profiling.active.get()
+        if profiler is not None:
+            # the outputs are evaluated, and timed, at once
+            out._cache.update(profiler.run(self, self._operate_profiled, dict_of_values))
+        return out
+
+    def _operate_profiled(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        return profiling.active.get().convert(self, dict_of_values)
+
+    def convert_columns(self, columns: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert columns of values at once, e.g. the `values` of the
+        `BatchResult` of `Validator.validate_columns`. Requires `numpy`.
+
+        Every expression is evaluated once over the columns, rewritten to
+        `numpy` (`max` to `np.maximum`, conditional expressions to
+        `np.where`, ...); expressions which cannot be vectorized are
+        evaluated value by value.
+
+        Parameters
+        ----------
+        columns : Dict[str, numpy.ndarray]
+            Map from input names to equal-length columns of values.
+            Sequences are converted to arrays.
+
+        Returns
+        -------
+        Dict[str, numpy.ndarray]
+            Map from output names to the columns of the outputs.
+        """
+        for name in self._inputs:
+            if name not in columns:
+                raise KeyError(name)
+        columns = {name: _as_column(values) for name, values in columns.items()}
+        lengths = {len(column) for column in columns.values()}
+        assert len(lengths) <= 1, "All columns must have the same length."
+        n = lengths.pop() if lengths else 0
+
+        outputs = {}
+        for name in self.expressions:
+            if name in outputs:
+                continue
+            for out in self._evaluation_order(name, outputs):
+                outputs[out] = self.expressions[out].evaluate_columns(
+                    self._scope(out, columns, outputs), n
+                )
+        return {name: outputs[name] for name in self.expressions}
+
+    def operate_delta(
+        self,
+        dict_of_values: Dict[str, Any],
+        output: Dict[str, Any],
+        changed: Optional[AbstractSet[str]],
+    ) -> Tuple[Dict[str, Any], Optional[AbstractSet[str]]]:
+        # the outputs not depending on a changed value are reused
+        if changed is None:
+            return self.operate(dict_of_values), None
+
+        names = set()
+        frontier = list(changed)
+        while frontier:
+            for out in self._dependents.get(frontier.pop(), ()):
+                if out not in names:
+                    names.add(out)
+                    frontier.append(_OUTPUT + out)
+
+        out = ConvertedValues(self, dict_of_values)
+        for name, value in output.items():
+            if name not in names:
+                out._cache[name] = value
+        return out.materialize(), frozenset(names)
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[str, str]]]:
+        # the expressions are compiled on unpickling
+        return self.__class__, (self.args,)
+
+    @property
+    def input_names(self) -> FrozenSet[str]:
+        """Names of the input values referenced by the expressions."""
+        return self._inputs
+
+    def output_names(
+        self, input_names: Optional[AbstractSet[str]]
+    ) -> Optional[FrozenSet[str]]:
+        return frozenset(self.args)
+
+    def prune(
+        self, needed: Optional[AbstractSet[str]]
+    ) -> Tuple["Converter", Optional[FrozenSet[str]]]:
+        op = self
+        if needed is not None:
+            # keep the outputs referenced by the needed ones
+            kept = set()
+            stack = [name for name in needed if name in self.expressions]
+            while stack:
+                name = stack.pop()
+                if name not in kept:
+                    kept.add(name)
+                    stack.extend(self._deps[name])
+            args = {name: eqn for name, eqn in self.args.items() if name in kept}
+            if len(args) < len(self.args):
+                op = self.__class__(args)
+        return op, op.input_names
 
     @classmethod
     def from_dict(
         cls, dict_of_template_strings: Dict[str, List[Constraint]]
     ) -> "Converter":
         return cls(dict_of_template_strings)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.args)
@@ -0,0 +1,96 @@
+import os
+from collections import deque
+from itertools import islice
+from typing import *
+
+from .pipeline import RecordResult
+
+# operator of the worker process, unpickled once by `_init_worker`
+_operator = None
+
+
+def _init_worker(payload: bytes) -> None:
+    import pickle
+
+    global _operator
+    _operator = pickle.loads(payload)
+
+
+def _picklable(error: Exception) -> Exception:
+    import pickle
+
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return RuntimeError(f"{error.__class__.__name__}: {error}")
+    return error
+
+
+def _operate_chunk(
+    start: int, records: List[Dict[str, Any]]
+) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+    operate = _operator.operate
+    results = []
+    for i, values in enumerate(records, start):
+        try:
+            results.append((i, operate(values), None))
+        except Exception as e:
+            results.append((i, None, _picklable(e)))
+    return results
+
+
+def map_parallel(
+    op: Any,
+    records: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+) -> Iterator[RecordResult]:
+    """
+    Run `op` over the records in a pool of worker processes.
+
+    The operator is pickled once and unpickled by every worker when it
+    starts; the records are then sent in chunks of `chunksize`. At most two
+    chunks per worker are in flight, so the records are consumed lazily.
+
+    Parameters
+    ----------
+    op : Operator
+        Picklable operator.
+    records : Iterable[Dict[str, Any]]
+        Dictionaries of values.
+    workers : Optional[int]
+        Number of worker processes; the number of CPUs if `None`.
+    chunksize : int
+        Number of records sent to a worker at once.
+
+    Yields
+    ------
+    RecordResult
+        Result of every record, in input order. Exceptions which cannot be
+        pickled are reported as `RuntimeError`s.
+    """
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+
+    assert chunksize >= 1, "`chunksize` must be positive."
+    workers = workers or os.cpu_count() or 1
+    payload = pickle.dumps(op, protocol=pickle.HIGHEST_PROTOCOL)
+
+    iterator = iter(records)
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(payload,)
+    ) as executor:
+        pending = deque()
+        start = 0
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(iterator, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_operate_chunk, start, chunk))
+                start += len(chunk)
+            if not pending:
+                return
+
+            for index, value, error in pending.popleft().result():
+                yield RecordResult(index, value, error)
@@ -0,0 +1,231 @@
+from itertools import islice
+from typing import *
+
+from . import profiling
+from .filters import Filter
+from .operators import Converter, Operator, Validator
+from .views import ValidatedView
+
+__all__ = ["Pipeline", "RecordResult", "FusedStage"]
+
+
+class RecordResult(NamedTuple):
+    """
+    Outcome of one record streamed through a `Pipeline`.
+
+    Attributes
+    ----------
+    index : int
+        Position of the record in the input stream.
+    value : Optional[Dict[str, Any]]
+        Output of the pipeline; `None` if the record failed.
+    error : Optional[Exception]
+        Exception raised by the failing operator; `None` on success.
+    """
+
+    index: int
+    value: Optional[Dict[str, Any]]
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Pipeline(Operator):
+    """
+    Pipeline chains `Operator`s: the output of every operator is the input of
+    the next one.
+
+    Parameters
+    ----------
+    operators : Sequence[Operator]
+        Operators in order of application.
+
+    Attributes
+    ----------
+    args : Tuple[Operator]
+        Operators in order of application.
+    """
+
+    def __init__(self, operators: Sequence[Operator]) -> None:
+        stages = []
+        for op in operators:
+            assert isinstance(op, Operator), "Pipeline stages must be `Operator`s."
+            if isinstance(op, Pipeline):
+                stages.extend(op.args)
+            else:
+                stages.append(op)
+        super().__init__(tuple(stages))
+
+    def operate(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        for op in self.args:
+            dict_of_values = op.operate(dict_of_values)
+        return dict_of_values
+
+    def __rshift__(self, other: Operator) -> "Pipeline":
+        return Pipeline([self, other])
+
+    def output_names(
+        self, input_names: Optional[AbstractSet[str]]
+    ) -> Optional[FrozenSet[str]]:
+        for op in self.args:
+            input_names = op.output_names(input_names)
+        return input_names
+
+    def fuse(self) -> "Pipeline":
+        """
+        Analyse the chain and build an equivalent pipeline doing less work.
+
+        - Filters whose input names are known are removed; the operator
+          before them only produces the values the filter keeps.
+        - `Converter`s skip the outputs which are dropped downstream.
+        - `Validator`s only validate the arguments used downstream, e.g. the
+          inputs referenced by the expressions of a following `Converter`.
+          Values which are not used are neither validated nor required.
+        - A `Validator` followed by a `Converter` runs as one `FusedStage`.
+
+        Returns
+        -------
+        Pipeline
+            The fused pipeline.
+        """
+        known = [None]
+        for op in self.args:
+            known.append(op.output_names(known[-1]))
+
+        stages = []
+        needed = None
+        removed = []
+        for i in reversed(range(len(self.args))):
+            op = self.args[i]
+            if isinstance(op, Filter) and known[i] is not None:
+                # the upstream operator is pruned to what the filter keeps
+                kept = known[i + 1]
+                needed = kept if needed is None else kept & needed
+                removed.append(op)
+                continue
+
+            wanted = needed
+            op, needed = op.prune(needed)
+            if removed:
+                names = op.output_names(known[i])
+                if names is None or not names <= wanted:
+                    # the operator could not be pruned, keep the filters
+                    stages.extend(removed)
+                removed = []
+            stages.append(op)
+        stages.extend(removed)
+        stages.reverse()
+
+        fused = []
+        for op in stages:
+            if (
+                fused
+                and isinstance(op, Converter)
+                and isinstance(fused[-1], Validator)
+                and fused[-1].payloads == "ignore"
+                and op.input_names <= fused[-1].args.keys()
+            ):
+                op = FusedStage(fused.pop(), op)
+            fused.append(op)
+
+        return Pipeline(fused)
+
+    def stream(
+        self, records: Iterable[Dict[str, Any]], chunk_size: int = 1
+    ) -> Iterator[RecordResult]:
+        """
+        Lazily run the pipeline over a stream of records.
+
+        Records are consumed `chunk_size` at a time, so at most one chunk is
+        held in memory. Within a chunk every operator processes all records
+        before the next operator starts. A record whose operator raises is
+        reported with its exception and does not stop the stream.
+
+        Parameters
+        ----------
+        records : Iterable[Dict[str, Any]]
+            Dictionaries of values, e.g. parsed lines of a JSONL file.
+        chunk_size : int
+            Number of records processed together.
+
+        Yields
+        ------
+        RecordResult
+            Result of every record, in input order.
+        """
+        assert chunk_size >= 1, "`chunk_size` must be positive."
+
+        operators = [op.operate for op in self.args]
+        iterator = iter(records)
+        start = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+
+            errors = [None] * len(chunk)
+            for operate in operators:
+                for i, values in enumerate(chunk):
+                    if errors[i] is not None:
+                        continue
+                    try:
+                        chunk[i] = operate(values)
+                    except Exception as e:
+                        errors[i] = e
+
+            for i, (values, error) in enumerate(zip(chunk, errors)):
+                yield RecordResult(
+                    start + i, values if error is None else None, error
+                )
+            start += len(chunk)
+
+
+class FusedStage(Operator):
+    """
+    A `Validator` and a `Converter` run as one operator: the converter reads
+    a view of the validated arguments over the input values, without the
+    intermediate validated dictionary.
+
+    Parameters
+    ----------
+    validator : Validator
+        Validator of the input values.
+    converter : Converter
+        Converter reading only arguments of `validator`.
+
+    Attributes
+    ----------
+    args : Tuple[Validator, Converter]
+        The validator and the converter.
+    """
+
+    def __init__(self, validator: Validator, converter: Converter) -> None:
+        assert converter.input_names <= validator.args.keys()
+        super().__init__((validator, converter))
+        self._args = validator.args
+        self._check = validator.check
+        self._convert = converter.operate
+
+    def operate(self, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        if profiling.active.get() is not None:
+            # profile the validator and the converter separately
+            validator, converter = self.args
+            return converter.operate(validator.operate(dict_of_values))
+        # the converter only sees the validated arguments
+        return self._convert(
+            ValidatedView(dict_of_values, self._args, self._check(dict_of_values))
+        )
+
+    def output_names(
+        self, input_names: Optional[AbstractSet[str]]
+    ) -> Optional[FrozenSet[str]]:
+        return frozenset(self.args[1].args)
+
+    def prune(
+        self, needed: Optional[AbstractSet[str]]
+    ) -> Tuple["FusedStage", Optional[FrozenSet[str]]]:
+        converter, needed = self.args[1].prune(needed)
+        validator, needed = self.args[0].prune(needed)
+        return FusedStage(validator, converter), needed
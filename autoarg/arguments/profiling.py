@@ -0,0 +1,327 @@
+import sys
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+from types import FunctionType, MethodType
+from typing import *
+
+__all__ = ["Profiler", "deep_sizeof"]
+
+# profiler recording the calls of the operators in the current thread or
+# asyncio task; checked by every operator call
+active = ContextVar("autoarg_profiler", default=None)
+# tokens restoring the previous values of `active`, innermost last; kept in the
+# same context as `active`, so that every task exits its own entries
+_tokens = ContextVar("autoarg_profiler_tokens", default=())
+
+
+class _Stat:
+    """Counters and a uniform reservoir sample of the durations of one
+    measured entity."""
+
+    __slots__ = ("calls", "failures", "seconds", "samples", "_seen", "_random")
+
+    def __init__(self, random: Any) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.samples = []
+        self._seen = 0
+        self._random = random
+
+    def add(self, seconds: float, ok: bool, reservoir: int) -> None:
+        self.calls += 1
+        self.failures += not ok
+        self.seconds += seconds
+        self._seen += 1
+        if len(self.samples) < reservoir:
+            self.samples.append(seconds)
+        else:
+            j = self._random.randrange(self._seen)
+            if j < reservoir:
+                self.samples[j] = seconds
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def to_dict(self, quantiles: Sequence[float]) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "passes": self.calls - self.failures,
+            "failures": self.failures,
+            "seconds": self.seconds,
+            "quantiles": {q: self.quantile(q) for q in quantiles},
+        }
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Size in bytes of `obj` and of everything it references: containers,
+    instance attributes, and the code and closures of functions (e.g. the
+    compiled checks of a `CompiledValidator`). Classes and modules are
+    shared and not counted; shared objects are counted once.
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, type(sys))):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif isinstance(o, FunctionType):
+            # its code, defaults and closure but not its globals
+            stack.append(o.__code__)
+            stack.extend(o.__defaults__ or ())
+            stack.extend(cell.cell_contents for cell in o.__closure__ or ())
+        elif isinstance(o, MethodType):
+            stack.append(o.__self__)
+            stack.append(o.__func__)
+
+        attributes = getattr(o, "__dict__", None)
+        if isinstance(attributes, dict):
+            stack.append(attributes)
+        for klass in type(o).__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if hasattr(o, name):
+                    stack.append(getattr(o, name))
+    return size
+
+
+def _escape(label: Any) -> str:
+    return str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Profiler:
+    """
+    Context manager recording where validation, conversion and filtering
+    spend their time.
+
+    While a profiler is active, every call of an operator in the thread (or
+    asyncio task) which entered it records its time
+    and outcome; a `Validator` also records every argument and every
+    constraint (aggregated by class) and a `Converter` every expression.
+    Durations are summarized by a reservoir sample from which the quantiles
+    are computed. The first time an operator is seen its memory size is
+    measured with `deep_sizeof`.
+
+    Constraints are timed one by one, so a profiled `CompiledValidator`
+    runs the constraints of its arguments instead of the compiled checks.
+
+    Parameters
+    ----------
+    reservoir : int
+        Maximum number of durations kept per measured entity.
+    quantiles : Sequence[float]
+        Reported quantiles of the durations.
+    seed : int
+        Seed of the reservoir sampling.
+
+    Attributes
+    ----------
+    operators : Dict[str, _Stat]
+        Statistics of the operators, by class name.
+    arguments : Dict[str, _Stat]
+        Statistics of the arguments of validators, by name.
+    constraints : Dict[str, _Stat]
+        Statistics of the constraints, by class name.
+    expressions : Dict[str, _Stat]
+        Statistics of the converter expressions, by output name.
+    memory : Dict[str, int]
+        Size in bytes of every profiled operator.
+    """
+
+    def __init__(
+        self,
+        reservoir: int = 1024,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        seed: int = 0,
+    ) -> None:
+        import random
+
+        assert reservoir > 0
+        self.reservoir = reservoir
+        self.quantiles = tuple(quantiles)
+        self.operators = {}
+        self.arguments = {}
+        self.constraints = {}
+        self.expressions = {}
+        self.memory = {}
+        self._random = random.Random(seed)
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Profiler":
+        _tokens.set(_tokens.get() + (active.set(self),))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        tokens = _tokens.get()
+        _tokens.set(tokens[:-1])
+        active.reset(tokens[-1])
+
+    def _record(self, stats: Dict[str, _Stat], key: str, seconds: float, ok: bool):
+        with self._lock:
+            stat = stats.get(key)
+            if stat is None:
+                stat = stats[key] = _Stat(self._random)
+            stat.add(seconds, ok, self.reservoir)
+
+    def run(
+        self,
+        op: Any,
+        operate: Callable[[Dict[str, Any]], Dict[str, Any]],
+        dict_of_values: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Run `operate` (the unprofiled implementation of `op`) on the
+        values, recording the operator."""
+        if id(op) not in self._seen:
+            # the operator is kept alive so its id is not reused
+            label = f"{op.__class__.__name__}#{len(self._seen)}"
+            self._seen[id(op)] = op
+            self.memory[label] = deep_sizeof(op)
+
+        start = perf_counter()
+        ok = False
+        try:
+            out = operate(dict_of_values)
+            ok = True
+            return out
+        finally:
+            self._record(
+                self.operators, op.__class__.__name__, perf_counter() - start, ok
+            )
+
+    def decode(self, arg: Any, x: Any) -> Tuple[bool, Any]:
+        """Profiled equivalent of `Argument.decode`."""
+        payload = x
+        ok = True
+        start = perf_counter()
+        try:
+            for c in arg._checks:
+                t = perf_counter()
+                ok = False
+                try:
+                    if c is arg.decoder:
+                        ok, payload = c.decode(x)
+                    else:
+                        ok = c(x)
+                finally:
+                    self._record(
+                        self.constraints,
+                        c.__class__.__name__,
+                        perf_counter() - t,
+                        bool(ok),
+                    )
+                if not ok:
+                    return False, None
+            return True, payload
+        finally:
+            self._record(self.arguments, arg.name, perf_counter() - start, bool(ok))
+
+    def convert(self, converter: Any, dict_of_values: Dict[str, Any]) -> Dict[str, Any]:
+        """Profiled `Converter.operate`: all the expressions are evaluated,
+        each after the outputs it references."""
+        from .operators import ConvertedValues
+
+        ConvertedValues(converter, dict_of_values)  # checks the inputs
+        out = {}
+        for name in converter.expressions:
+            if name in out:
+                continue
+            for n in converter._evaluation_order(name, out):
+                scope = converter._scope(n, dict_of_values, out)
+                start = perf_counter()
+                ok = False
+                try:
+                    out[n] = converter.expressions[n](scope)
+                    ok = True
+                finally:
+                    self._record(self.expressions, n, perf_counter() - start, ok)
+        return {name: out[name] for name in converter.expressions}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the statistics.
+
+        Returns
+        -------
+        Dict[str, Any]
+            For `operators`, `arguments`, `constraints` and `expressions`, a
+            map from names to the number of `calls`, `passes` and `failures`,
+            the total `seconds` and the duration `quantiles`; and the
+            `memory` of the operators in bytes.
+        """
+        with self._lock:
+            out = {
+                group: {
+                    key: stat.to_dict(self.quantiles)
+                    for key, stat in getattr(self, group).items()
+                }
+                for group in ("operators", "arguments", "constraints", "expressions")
+            }
+            out["memory"] = dict(self.memory)
+        return out
+
+    def to_prometheus(self, prefix: str = "autoarg") -> str:
+        """
+        Export the statistics in the Prometheus text exposition format: a
+        summary of the durations and a counter of the failures for every
+        group, labelled by name, and a gauge of the operator sizes.
+        """
+        d = self.to_dict()
+        lines = []
+        for group, label in (
+            ("operators", "operator"),
+            ("arguments", "argument"),
+            ("constraints", "constraint"),
+            ("expressions", "expression"),
+        ):
+            metric = f"{prefix}_{label}_seconds"
+            lines.append(f"# HELP {metric} Duration of the {label} calls.")
+            lines.append(f"# TYPE {metric} summary")
+            for key, stat in d[group].items():
+                key = _escape(key)
+                for q, seconds in stat["quantiles"].items():
+                    lines.append(f'{metric}{{{label}="{key}",quantile="{q}"}} {seconds!r}')
+                lines.append(f'{metric}_sum{{{label}="{key}"}} {stat["seconds"]!r}')
+                lines.append(f'{metric}_count{{{label}="{key}"}} {stat["calls"]}')
+
+            metric = f"{prefix}_{label}_failures_total"
+            lines.append(f"# HELP {metric} Number of failed {label} calls.")
+            lines.append(f"# TYPE {metric} counter")
+            for key, stat in d[group].items():
+                lines.append(f'{metric}{{{label}="{_escape(key)}"}} {stat["failures"]}')
+
+        metric = f"{prefix}_operator_bytes"
+        lines.append(f"# HELP {metric} Memory size of the operators.")
+        lines.append(f"# TYPE {metric} gauge")
+        for key, size in d["memory"].items():
+            lines.append(f'{metric}{{operator="{_escape(key)}"}} {size}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            for group in (
+                self.operators,
+                self.arguments,
+                self.constraints,
+                self.expressions,
+                self.memory,
+            ):
+                group.clear()
+            self._seen.clear()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self.operators)} operators)"
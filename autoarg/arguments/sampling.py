@@ -0,0 +1,268 @@
+import math
+from itertools import product
+from typing import *
+
+from ..constraints import *
+from .argument import Argument
+
+# `numpy` is imported on first use by `sample_records`
+
+# constraints a sampled value satisfies by construction
+_SAMPLED_TYPES = (IsInteger, IsFloat, IsReal, IsBool)
+
+Interval = Tuple[float, bool, float, bool]
+
+
+def _intersect(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    """Intersection of two unions of disjoint sorted intervals."""
+    out = []
+    for lower_a, lower_closed_a, upper_a, upper_closed_a in a:
+        for lower_b, lower_closed_b, upper_b, upper_closed_b in b:
+            if lower_a > lower_b or (lower_a == lower_b and not lower_closed_a):
+                lower, lower_closed = lower_a, lower_closed_a
+            else:
+                lower, lower_closed = lower_b, lower_closed_b
+            if upper_a < upper_b or (upper_a == upper_b and not upper_closed_a):
+                upper, upper_closed = upper_a, upper_closed_a
+            else:
+                upper, upper_closed = upper_b, upper_closed_b
+            out.append((lower, lower_closed, upper, upper_closed))
+    # `_merge` drops the empty intersections
+    return InRange._merge(out)
+
+
+def _integer_intervals(intervals: List[Interval]) -> List[Tuple[int, int]]:
+    """Inclusive ranges of the integers in the intervals."""
+    out = []
+    for lower, lower_closed, upper, upper_closed in intervals:
+        low = math.ceil(lower)
+        if low == lower and not lower_closed:
+            low += 1
+        high = math.floor(upper)
+        if high == upper and not upper_closed:
+            high -= 1
+        if low <= high:
+            out.append((low, high))
+    return out
+
+
+class _Domain:
+    """
+    Values of an argument drawn by `sample_records`: one of `choices`, an
+    integer or a float of the union of `intervals`, or the `default`.
+    """
+
+    __slots__ = ("name", "kind", "choices", "intervals", "default")
+
+    def __init__(
+        self,
+        name: str,
+        arg: Argument,
+        bounds: Optional[Tuple[float, float]] = None,
+        choices: Optional[Sequence[Any]] = None,
+    ) -> None:
+        self.name = name
+        self.choices = None
+        self.intervals = None
+        self.default = arg.default
+
+        if choices is not None:
+            self.kind = "choice"
+            self.choices = _checked(name, arg, choices)
+            return
+
+        ranges = [c for c in arg.constraints if isinstance(c, InRange)]
+        other = [
+            c
+            for c in arg.constraints
+            if not isinstance(c, (InRange, Required, Default) + _SAMPLED_TYPES)
+        ]
+        if other:
+            self.kind = "default"
+        elif any(isinstance(c, IsBool) for c in arg.constraints):
+            self.kind = "choice"
+            self.choices = [False, True]
+        elif ranges or bounds is not None:
+            if any(isinstance(c, IsInteger) for c in arg.constraints):
+                self.kind = "int"
+            else:
+                self.kind = "float"
+            intervals = [(-math.inf, False, math.inf, False)]
+            for c in ranges:
+                intervals = _intersect(intervals, c.intervals)
+            if bounds is not None:
+                low, high = bounds
+                intervals = _intersect(intervals, [(low, True, high, True)])
+            self.intervals = intervals
+        else:
+            self.kind = "default"
+
+        if self.kind == "default":
+            assert not arg.required, (
+                f"Cannot sample argument `{name}` from its constraints; "
+                "pass its `choices`."
+            )
+        elif self.kind != "choice":
+            assert all(
+                math.isfinite(lower) and math.isfinite(upper)
+                for lower, _, upper, _ in self.intervals
+            ), f"Argument `{name}` is unbounded; pass its `bounds`."
+            if self.kind == "int":
+                self.intervals = _integer_intervals(self.intervals)
+            assert self.intervals, f"Argument `{name}` admits no {self.kind}."
+
+    def draw(self, rng: Any, n: int) -> List[Any]:
+        """`n` values drawn with the `numpy.random.Generator` `rng`."""
+        import numpy as np
+
+        if self.kind == "default":
+            return [self.default] * n
+        if self.kind == "choice":
+            choices = self.choices
+            return [choices[i] for i in rng.integers(len(choices), size=n).tolist()]
+
+        if self.kind == "int":
+            lows = np.array([low for low, _ in self.intervals], dtype=np.int64)
+            highs = np.array([high for _, high in self.intervals], dtype=np.int64)
+            weights = (highs - lows + 1).astype(float)
+            i = rng.choice(len(lows), size=n, p=weights / weights.sum())
+            return rng.integers(lows[i], highs[i], endpoint=True).tolist()
+
+        lowers, lower_closed, uppers, upper_closed = (
+            np.array(column) for column in zip(*self.intervals)
+        )
+        weights = uppers - lowers
+        if weights.sum() == 0:
+            # only single points
+            weights = np.ones(len(weights))
+        i = rng.choice(len(lowers), size=n, p=weights / weights.sum())
+        x = rng.uniform(lowers[i], uppers[i])
+        # `uniform` draws from [lower, upper) up to rounding; open bounds are
+        # moved to the nearest float inside
+        x = np.where(lower_closed[i], x, np.maximum(x, np.nextafter(lowers[i], np.inf)))
+        x = np.where(
+            upper_closed[i], x, np.minimum(x, np.nextafter(uppers[i], -np.inf))
+        )
+        return x.tolist()
+
+
+def _checked(name: str, arg: Argument, values: Sequence[Any]) -> List[Any]:
+    values = list(values)
+    assert values, f"No values given for argument `{name}`."
+    for value in values:
+        assert arg(value), f"Value {name} = {value} is not compatible with {str(arg)}."
+    return values
+
+
+def grid_records(
+    args: Dict[str, Argument], dict_of_values: Dict[str, Sequence[Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Cartesian product of the given values of the arguments, as records.
+
+    Every value is validated once, so the records are valid by construction;
+    arguments without values take their default. The product is streamed, in
+    the order of `itertools.product` over the arguments of `dict_of_values`.
+
+    Parameters
+    ----------
+    args : Dict[str, Argument]
+        Arguments of a `Validator`.
+    dict_of_values : Dict[str, Sequence[Any]]
+        Map from argument names to the values of the grid.
+
+    Yields
+    ------
+    Dict[str, Any]
+        Validated records, with all the arguments.
+    """
+    for name in dict_of_values:
+        assert name in args, f"Unknown argument `{name}`."
+    axes = {
+        name: _checked(name, args[name], values)
+        for name, values in dict_of_values.items()
+    }
+    fixed = {}
+    for name, arg in args.items():
+        if name not in axes:
+            assert not arg.required, f"Argument `{name}` is required but not provided."
+            fixed[name] = arg.default
+
+    # the values are checked before the first record is requested
+    return _grid(list(args), fixed, axes)
+
+
+def _grid(
+    order: List[str], fixed: Dict[str, Any], axes: Dict[str, List[Any]]
+) -> Iterator[Dict[str, Any]]:
+    names = list(axes)
+    for point in product(*axes.values()):
+        record = {**fixed, **dict(zip(names, point))}
+        yield {name: record[name] for name in order}
+
+
+def sample_records(
+    args: Dict[str, Argument],
+    n: Optional[int] = None,
+    seed: Optional[int] = None,
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    choices: Optional[Dict[str, Sequence[Any]]] = None,
+    chunk_size: int = 4096,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Random records drawn from the constraints of the arguments, valid by
+    construction. Requires `numpy`.
+
+    Arguments with `InRange` constraints (e.g. `Positive` or unions of
+    ranges) are drawn uniformly from the intersection of their ranges: as
+    integers if they have an `IsInteger` constraint, as floats otherwise.
+    `IsBool` arguments are drawn from `True` and `False`. Other arguments
+    take their `choices` or their default.
+
+    Parameters
+    ----------
+    args : Dict[str, Argument]
+        Arguments of a `Validator`.
+    n : Optional[int]
+        Number of records; unlimited if `None`.
+    seed : Optional[int]
+        Seed of the `numpy` random generator.
+    bounds : Optional[Dict[str, Tuple[float, float]]]
+        Closed bounds of numeric arguments, intersected with their ranges;
+        required for unbounded ranges.
+    choices : Optional[Dict[str, Sequence[Any]]]
+        Values drawn uniformly for some arguments, instead of their ranges.
+    chunk_size : int
+        Number of records drawn at once, which bounds the memory used.
+
+    Yields
+    ------
+    Dict[str, Any]
+        Validated records, with all the arguments.
+    """
+    import numpy as np
+
+    assert chunk_size >= 1, "`chunk_size` must be positive."
+    bounds = bounds or {}
+    choices = choices or {}
+    for name in {**bounds, **choices}:
+        assert name in args, f"Unknown argument `{name}`."
+    domains = [
+        _Domain(name, arg, bounds.get(name), choices.get(name))
+        for name, arg in args.items()
+    ]
+    return _sample(domains, np.random.default_rng(seed), n, chunk_size)
+
+
+def _sample(
+    domains: List[_Domain], rng: Any, n: Optional[int], chunk_size: int
+) -> Iterator[Dict[str, Any]]:
+    names = [d.name for d in domains]
+    remaining = n
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        columns = [d.draw(rng, size) for d in domains]
+        for row in zip(*columns):
+            yield dict(zip(names, row))
+        if remaining is not None:
+            remaining -= size
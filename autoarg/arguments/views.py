@@ -0,0 +1,110 @@
+from typing import *
+
+__all__ = ["LazyMapping", "ValidatedView", "FilteredView"]
+
+
+class LazyMapping(Mapping):
+    """
+    Base of the read-only mappings returned by operators in place of a
+    `dict`: the values are read from the input, or computed, on access.
+    `materialize` builds the equivalent `dict`.
+    """
+
+    __slots__ = ()
+
+    def materialize(self) -> Dict[str, Any]:
+        """Copy the mapping into a `dict`."""
+        return {name: self[name] for name in self}
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[str, Any]]]:
+        # unpickled as the materialized `dict`
+        return dict, (self.materialize(),)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.materialize()!r})"
+
+
+class ValidatedView(LazyMapping):
+    """
+    Output of `Validator.view`: the arguments of the validator, reading the
+    validated values from the input mapping and overlaying the defaults of
+    the missing ones. Changes of the input are seen by the view.
+
+    Parameters
+    ----------
+    dict_of_values : Dict[str, Any]
+        Validated input values.
+    args : Dict[str, Any]
+        Arguments of the validator, the keys of the view.
+    defaults : Dict[str, Any]
+        Defaults of the arguments missing from `dict_of_values`.
+    """
+
+    __slots__ = ("_values", "_args", "_defaults")
+
+    def __init__(
+        self,
+        dict_of_values: Dict[str, Any],
+        args: Dict[str, Any],
+        defaults: Dict[str, Any],
+    ) -> None:
+        self._values = dict_of_values
+        self._args = args
+        self._defaults = defaults
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._defaults:
+            return self._defaults[name]
+        if name in self._args:
+            return self._values[name]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._args)
+
+    def __len__(self) -> int:
+        return len(self._args)
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._args
+
+
+class FilteredView(LazyMapping):
+    """
+    Output of `Filter.view`: the keys of the input mapping kept by a filter.
+    Changes of the input are seen by the view.
+
+    Parameters
+    ----------
+    dict_of_values : Dict[str, Any]
+        Input values.
+    keeps : Callable[[str], bool]
+        Whether the filter keeps a name.
+    """
+
+    __slots__ = ("_values", "_keeps")
+
+    def __init__(
+        self, dict_of_values: Dict[str, Any], keeps: Callable[[str], bool]
+    ) -> None:
+        self._values = dict_of_values
+        self._keeps = keeps
+
+    def __getitem__(self, name: str) -> Any:
+        if not self._keeps(name):
+            raise KeyError(name)
+        return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        keeps = self._keeps
+        return (name for name in self._values if keeps(name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._values and self._keeps(name)
+
+    def materialize(self) -> Dict[str, Any]:
+        values = self._values
+        return {name: values[name] for name in self}
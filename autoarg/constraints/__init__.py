@@ -1,5 +1,8 @@
 from .base import *
+from .files import *
 from .inputs import *
 from .logicals import *
+from .memo import *
+from .parser import *
 from .reals import *
 from .strings import *
@@ -1,28 +1,317 @@
 from typing import *
 
-__all__ = ["Constraint", "IsInstance"]
+__all__ = [
+    "Constraint",
+    "IsInstance",
+    "Decoder",
+    "AsyncConstraint",
+    "compile_constraints",
+    "constraint_registry",
+]
+
+# map from class names to all `Constraint` subclasses, used to resolve the
+# names of constraints in manifests
+constraint_registry: Dict[str, type] = {}
+# called whenever `constraint_registry` changes, e.g. to clear the cache of
+# the parser
+_registry_hooks: List[Callable[[], None]] = []
+
+
+def _qualified_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _register(cls: type) -> None:
+    """Register a `Constraint` class under its name. A name already taken by
+    another class raises, so that no class can take over the parsing of the
+    manifests; only the same class defined again (e.g. a reloaded module)
+    replaces it."""
+    other = constraint_registry.get(cls.__name__)
+    if other is not None and _qualified_name(other) != _qualified_name(cls):
+        raise ValueError(
+            f"Cannot register `{_qualified_name(cls)}`: the constraint name "
+            f"`{cls.__name__}` is taken by `{_qualified_name(other)}`."
+        )
+    constraint_registry[cls.__name__] = cls
+    for hook in _registry_hooks:
+        hook()
+
+
+def _state(obj: Any) -> Dict[str, Any]:
+    """Instance attributes of `obj`, from its `__dict__` and its slots."""
+    state = dict(getattr(obj, "__dict__", ()))
+    for name in _slot_names(type(obj)):
+        if hasattr(obj, name):
+            state[name] = getattr(obj, name)
+    return state
+
+
+def _slot_names(cls: type) -> List[str]:
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(s for s in slots if s not in ("__dict__", "__weakref__"))
+    return names
+
+
+def _shared_new(cls: type, *args: Any, **kwargs: Any) -> "Constraint":
+    instance = cls.__dict__["_instance"]
+    if instance is None:
+        instance = object.__new__(cls)
+        cls._instance = instance
+    return instance
+
+
+def _new(cls: type, *args: Any, **kwargs: Any) -> "Constraint":
+    return object.__new__(cls)
+
+
+def _bind(namespace: Dict[str, Any], obj: Any) -> str:
+    """Store `obj` in the code generation `namespace` and return its name."""
+    name = f"_{len(namespace)}"
+    namespace[name] = obj
+    return name
+
+
+# python type of the scalars of a numpy array, by `dtype.kind`
+_kind_to_type = {"b": bool, "i": int, "u": int, "f": float, "U": str, "S": bytes}
+
+
+def _elementwise(func: Callable[[Any], bool], column: Any) -> Any:
+    """Apply a scalar check to every element; raising counts as failing."""
+    import numpy as np
+
+    def _safe(x):
+        try:
+            return bool(func(x))
+        except Exception:
+            return False
+
+    return np.fromiter(map(_safe, column), dtype=bool, count=len(column))
 
 
 class Constraint:
+    # static cost model used by `Argument` to order its checks: the relative
+    # cost of a call, whether the check is free of side effects (only pure
+    # constraints are reordered) and whether it guards the type of the value
+    # for other checks (guards are evaluated first)
+    cost: float = 10.0
+    pure: bool = False
+    guard: bool = False
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, shared: bool = False, **kwargs: Any) -> None:
+        """
+        Register the subclass under its name, which must be unique among
+        constraints (ValueError otherwise). With `shared=True` the constraint
+        is stateless and all its instances are one shared object, e.g.
+        `class IsInteger(IsInstance, shared=True)`; its `__init__` must be
+        idempotent.
+        """
+        super().__init_subclass__(**kwargs)
+        _register(cls)
+        if shared:
+            cls._instance = None
+            cls.__new__ = staticmethod(_shared_new)
+        elif cls.__new__ is _shared_new:
+            # subclasses of shared constraints may hold state
+            cls.__new__ = staticmethod(_new)
+
     def __call__(self, x: Any) -> bool:
         return self.assertion(x)
 
     def assertion(self, x: Any) -> bool:
         raise NotImplementedError("Method `assertion` must be implemented.")
 
+    def compile_statements(self, var: str, namespace: Dict[str, Any]) -> List[str]:
+        """
+        Generate the source of the check used by `compile_constraints`.
+
+        Parameters
+        ----------
+        var : str
+            Name of the variable holding the value under test.
+        namespace : Dict[str, Any]
+            Globals of the generated function; objects referenced by the
+            generated source must be bound into it.
+
+        Returns
+        -------
+        List[str]
+            Python statements which `return False` if the value violates the
+            constraint. The generic version calls `assertion`; subclasses
+            override it to inline cheaper checks.
+        """
+        name = _bind(namespace, self.assertion)
+        return [f"if not {name}({var}):", "    return False"]
+
+    def batch_assertion(self, column: Any) -> Any:
+        """
+        Vectorized `assertion` over a column of values.
+
+        Parameters
+        ----------
+        column : numpy.ndarray
+            One dimensional array of values.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask of the values satisfying the constraint. The generic
+            version applies `assertion` elementwise; subclasses override it
+            with whole-column operations.
+        """
+        return _elementwise(self, column)
+
+    def arguments(self) -> Tuple[Any, ...]:
+        """Positional arguments of the constructor which rebuild the
+        constraint; shared (stateless) constraints take none."""
+        return ()
+
+    def to_string(self) -> str:
+        """Source of the constraint in manifests, e.g. `"InRange('[ 0 , 1 ]')"`,
+        parsed back by `parse_constraint`."""
+        from .parser import format_constraint
+
+        return format_constraint(self)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
     def __eq__(self, other) -> bool:
-        return self.__dict__ == other.__dict__
+        return _state(self) == _state(other)
 
 
 class IsInstance(Constraint):
+    cost = 1.0
+    pure = True
+    guard = True
+
+    __slots__ = ("instance_cls",)
+
     def __init__(self, instance_cls: Union[Any, Tuple[Any]]) -> None:
         self.instance_cls = instance_cls
 
     def assertion(self, x: Any) -> bool:
         return isinstance(x, self.instance_cls)
 
+    def compile_statements(self, var: str, namespace: Dict[str, Any]) -> List[str]:
+        name = _bind(namespace, self.instance_cls)
+        return [f"if not isinstance({var}, {name}):", "    return False"]
+
+    def batch_assertion(self, column: Any) -> Any:
+        import numpy as np
+
+        if column.dtype.kind not in _kind_to_type:
+            return _elementwise(self, column)
+
+        # the dtype determines the type of every element
+        ok = issubclass(_kind_to_type[column.dtype.kind], self.instance_cls)
+        return np.full(len(column), ok)
+
+    def arguments(self) -> Tuple[Any, ...]:
+        return (self.instance_cls,)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.instance_cls})"
+
+
+class Decoder(Constraint):
+    """Constraint validating serialized values, which can also return the
+    decoded payload of a valid value."""
+
+    __slots__ = ()
+
+    def decode(self, x: Any) -> Tuple[bool, Any]:
+        """
+        Validate and decode the value.
+
+        Returns
+        -------
+        Tuple[bool, Any]
+            Whether the value is valid and its decoded payload (`None` if the
+            value is invalid).
+        """
+        raise NotImplementedError("Method `decode` must be implemented.")
+
+
+class AsyncConstraint(Constraint):
+    """
+    Constraint whose check is a coroutine, e.g. I/O bound checks of the
+    filesystem or of a local service. `Validator.aoperate` awaits the checks
+    of all the arguments concurrently; the synchronous `assertion` runs the
+    coroutine in a new event loop unless overridden, and raises a
+    RuntimeError inside a running event loop, where `aoperate` must be used.
+
+    Attributes
+    ----------
+    timeout : Optional[float]
+        Seconds after which the check fails; `None` to use the timeout of
+        `Validator.aoperate`.
+    """
+
+    cost = 1000.0
+    timeout: Optional[float] = None
+
+    __slots__ = ()
+
+    async def aassertion(self, x: Any) -> bool:
+        raise NotImplementedError("Method `aassertion` must be implemented.")
+
+    def assertion(self, x: Any) -> bool:
+        import asyncio
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aassertion(x))
+        raise RuntimeError(
+            f"`{self.__class__.__name__}` cannot be checked synchronously inside "
+            "a running event loop; await `Validator.aoperate` instead."
+        )
+
+
+# recently compiled checks keyed by the identities of their constraints, which
+# the entries keep alive: parsed constraints are shared, so the arguments of
+# validators built from similar manifests share their compiled checks
+_compiled_checks: Dict[Tuple[int, ...], Tuple[Tuple[Constraint, ...], Callable]] = {}
+_max_compiled_checks = 4096
+
+
+def compile_constraints(constraints: List[Constraint]) -> Callable[[Any], bool]:
+    """
+    Compile a list of `Constraint`s into one specialized check function.
+
+    The returned function is equivalent to `all(c(x) for c in constraints)`
+    but runs the inlined statements of every constraint in a single frame.
+
+    Parameters
+    ----------
+    constraints : List[Constraint]
+        Constraints to be satisfied, in evaluation order.
+
+    Returns
+    -------
+    Callable[[Any], bool]
+        Function returning `True` if the value satisfies all constraints.
+    """
+    key = tuple(map(id, constraints))
+    entry = _compiled_checks.get(key)
+    if entry is not None:
+        return entry[1]
+
+    namespace = {}
+    lines = ["def check(x):"]
+    for c in constraints:
+        lines.extend(f"    {line}" for line in c.compile_statements("x", namespace))
+    lines.append("    return True")
+    exec("\n".join(lines), namespace)
+    check = namespace["check"]
+
+    if len(_compiled_checks) >= _max_compiled_checks:
+        _compiled_checks.pop(next(iter(_compiled_checks)), None)
+    _compiled_checks[key] = (tuple(constraints), check)
+    return check
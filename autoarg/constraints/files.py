@@ -0,0 +1,53 @@
+import os
+from typing import *
+
+from .base import AsyncConstraint
+
+__all__ = ["PathExists", "IsReadable"]
+
+
+def _is_path(x: Any) -> bool:
+    # integers would be taken for file descriptors
+    return isinstance(x, (str, bytes, os.PathLike))
+
+
+class PathExists(AsyncConstraint):
+    """
+    The path exists on the filesystem. The asynchronous check runs in the
+    default executor of the event loop.
+
+    Parameters
+    ----------
+    timeout : Optional[float]
+        Seconds after which the asynchronous check fails.
+    """
+
+    cost = 200.0
+    pure = True
+
+    __slots__ = ("timeout",)
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.timeout = timeout
+
+    def arguments(self) -> Tuple[Optional[float], ...]:
+        return () if self.timeout is None else (self.timeout,)
+
+    def assertion(self, x: Any) -> bool:
+        return _is_path(x) and os.path.exists(x)
+
+    async def aassertion(self, x: Any) -> bool:
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.assertion, x
+        )
+
+
+class IsReadable(PathExists):
+    """The path is a file readable by the current user."""
+
+    __slots__ = ()
+
+    def assertion(self, x: Any) -> bool:
+        return _is_path(x) and os.path.isfile(x) and os.access(x, os.R_OK)
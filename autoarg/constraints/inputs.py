@@ -1,9 +1,15 @@
 from typing import *
 
-from .base import Constraint
+from .base import Constraint, _elementwise
 
 
-class Required(Constraint):
+class Required(Constraint, shared=True):
+    cost = 1.0
+    pure = True
+    guard = True
+
+    __slots__ = ()
+
     def assertion(self, x: Any) -> bool:
 
         if x is None:  # required arg cannot be null
@@ -11,6 +17,16 @@ class Required(Constraint):
 
         return True
 
+    def compile_statements(self, var: str, namespace: Dict[str, Any]) -> List[str]:
+        return [f"if {var} is None:", "    return False"]
+
+    def batch_assertion(self, column: Any) -> Any:
+        import numpy as np
+
+        if column.dtype.kind == "O":
+            return _elementwise(self, column)
+        return np.ones(len(column), dtype=bool)
+
 
 class Default(Constraint):
     """Default: Pass default value to `Argument` class.
@@ -28,6 +44,11 @@ class Default(Constraint):
 
     """
 
+    cost = 0.0
+    pure = True
+
+    __slots__ = ("value",)
+
     def __init__(self, default_value: Any):
         self.value = default_value
 
@@ -36,5 +57,16 @@ class Default(Constraint):
         # no constraints
         return True
 
+    def compile_statements(self, var: str, namespace: Dict[str, Any]) -> List[str]:
+        return []
+
+    def batch_assertion(self, column: Any) -> Any:
+        import numpy as np
+
+        return np.ones(len(column), dtype=bool)
+
+    def arguments(self) -> Tuple[Any]:
+        return (self.value,)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(default_value={self.value})"
@@ -5,12 +5,16 @@ from .base import Constraint, IsInstance
 __all__ = ["IsBool", "NOT", "ANY", "ALL"]
 
 
-class IsBool(IsInstance):
+class IsBool(IsInstance, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(bool)
 
 
 class NOT(Constraint):
+    __slots__ = ("constraint",)
+
     def __init__(self, constraint: Constraint) -> None:
         assert isinstance(constraint, Constraint)
         self.constraint = constraint
@@ -18,26 +22,82 @@ class NOT(Constraint):
     def assertion(self, x: Any) -> bool:
         return not self.constraint(x)
 
+    def arguments(self) -> Tuple[Constraint]:
+        return (self.constraint,)
+
+    @property
+    def cost(self) -> float:
+        return 0.5 + self.constraint.cost
+
+    @property
+    def pure(self) -> bool:
+        return self.constraint.pure
+
+    def batch_assertion(self, column: Any) -> Any:
+        return ~self.constraint.batch_assertion(column)
+
 
 class ANY(Constraint):
+    __slots__ = ("constraints",)
+
     def __init__(self, *constraints: Constraint) -> None:
         for c in constraints:
             assert isinstance(c, Constraint)
 
         self.constraints = constraints
 
+    @property
+    def cost(self) -> float:
+        return 0.5 + sum(c.cost for c in self.constraints)
+
+    @property
+    def pure(self) -> bool:
+        return all(c.pure for c in self.constraints)
+
     def assertion(self, x: Any) -> bool:
 
         return any(c(x) for c in self.constraints)
 
+    def arguments(self) -> Tuple[Constraint, ...]:
+        return self.constraints
+
+    def batch_assertion(self, column: Any) -> Any:
+        import numpy as np
+
+        mask = np.zeros(len(column), dtype=bool)
+        for c in self.constraints:
+            mask |= c.batch_assertion(column)
+        return mask
+
 
 class ALL(Constraint):
+    __slots__ = ("constraints",)
+
     def __init__(self, *constraints: Constraint) -> None:
         for c in constraints:
             assert isinstance(c, Constraint)
 
         self.constraints = constraints
 
+    @property
+    def cost(self) -> float:
+        return 0.5 + sum(c.cost for c in self.constraints)
+
+    @property
+    def pure(self) -> bool:
+        return all(c.pure for c in self.constraints)
+
     def assertion(self, x: Any) -> bool:
 
         return all(c(x) for c in self.constraints)
+
+    def arguments(self) -> Tuple[Constraint, ...]:
+        return self.constraints
+
+    def batch_assertion(self, column: Any) -> Any:
+        import numpy as np
+
+        mask = np.ones(len(column), dtype=bool)
+        for c in self.constraints:
+            mask &= c.batch_assertion(column)
+        return mask
@@ -0,0 +1,194 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import *
+
+from .base import Constraint
+
+__all__ = ["MemoCache", "MemoizedConstraint", "enable_memo", "disable_memo"]
+
+
+class MemoCache:
+    """
+    Bounded cache of the results of pure constraints.
+
+    Entries are keyed on the constraint and the value under test and evicted
+    in least recently used order once the number of entries or the memory
+    budget is exceeded, or when they are older than `ttl`.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of cached results.
+    max_bytes : int
+        Memory budget: maximum total size of the cached values.
+    max_value_bytes : int
+        Values larger than this are never cached.
+    ttl : Optional[float]
+        Time to live of the entries in seconds; `None` for no expiry.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups answered by the cache.
+    misses : int
+        Number of lookups which evaluated the constraint.
+    evictions : int
+        Number of entries evicted or expired.
+    nbytes : int
+        Total size of the cached values.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_bytes: int = 64 * 2**20,
+        max_value_bytes: int = 2**20,
+        ttl: Optional[float] = None,
+    ) -> None:
+        assert max_entries > 0 and max_bytes > 0 and max_value_bytes > 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_value_bytes = max_value_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        # key -> (result, size, expiry)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable, x: Any, evaluate: Callable[[Any], bool]) -> bool:
+        """
+        Return the cached result of `evaluate(x)` under `key`, evaluating and
+        caching it on a miss. Unhashable and oversized values are evaluated
+        without caching.
+        """
+        try:
+            # the type tells apart equal values such as `1` and `True`
+            entry_key = (key, type(x), x)
+            hash(entry_key)
+        except TypeError:
+            self.misses += 1
+            return evaluate(x)
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                if self.ttl is None or entry[2] > time.monotonic():
+                    self._entries.move_to_end(entry_key)
+                    self.hits += 1
+                    return entry[0]
+                self._pop(entry_key)
+            self.misses += 1
+
+        result = evaluate(x)
+
+        size = sys.getsizeof(x)
+        if size > self.max_value_bytes:
+            return result
+
+        expiry = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if entry_key in self._entries:
+                self._pop(entry_key)
+            self._entries[entry_key] = (result, size, expiry)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+        return result
+
+    def _pop(self, entry_key: Hashable) -> None:
+        _, size, _ = self._entries.pop(entry_key)
+        self.nbytes -= size
+        self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "nbytes": self.nbytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.stats()})"
+
+
+class MemoizedConstraint(Constraint):
+    """
+    Base class of pure constraints whose results can be memoized.
+
+    Subclasses implement `evaluate` instead of `assertion`. Memoization is
+    opt-in: `assertion` only consults the `MemoCache` set in the class
+    attribute `memo` (for all subclasses by `enable_memo`).
+
+    Attributes
+    ----------
+    memo : Optional[MemoCache]
+        Cache of the results; `None` disables memoization.
+    """
+
+    memo: Optional[MemoCache] = None
+    pure = True
+
+    __slots__ = ()
+
+    def assertion(self, x: Any) -> bool:
+        memo = self.memo
+        if memo is None:
+            return self.evaluate(x)
+        return memo.lookup(self.memo_key(), x, self.evaluate)
+
+    def evaluate(self, x: Any) -> bool:
+        raise NotImplementedError("Method `evaluate` must be implemented.")
+
+    def memo_key(self) -> Hashable:
+        """Key identifying the check; includes the parameters if any."""
+        return self.__class__
+
+
+def enable_memo(
+    memo: Optional[MemoCache] = None, cls: type = MemoizedConstraint
+) -> MemoCache:
+    """
+    Memoize the results of the `MemoizedConstraint`s (ValidJson, ValidYaml,
+    ValidPath).
+
+    Parameters
+    ----------
+    memo : Optional[MemoCache]
+        Cache to use; a new `MemoCache` with default limits if `None`.
+    cls : type
+        Memoize only this subclass of `MemoizedConstraint` (and its
+        subclasses).
+
+    Returns
+    -------
+    MemoCache
+        The cache, e.g. to read its counters.
+    """
+    assert issubclass(cls, MemoizedConstraint)
+    if memo is None:
+        memo = MemoCache()
+    cls.memo = memo
+    return memo
+
+
+def disable_memo(cls: type = MemoizedConstraint) -> None:
+    """Stop memoizing the results of `cls` and its subclasses."""
+    assert issubclass(cls, MemoizedConstraint)
+    cls.memo = None
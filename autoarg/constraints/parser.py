@@ -0,0 +1,198 @@
+from functools import lru_cache
+from typing import *
+
+from .base import Constraint, _registry_hooks, _state, constraint_registry
+
+__all__ = ["parse_constraint", "format_constraint", "ConstraintSyntaxError"]
+
+# names of types accepted as arguments, e.g. `IsInstance((int, float))`
+_type_names = {
+    "bool": bool,
+    "bytes": bytes,
+    "dict": dict,
+    "float": float,
+    "int": int,
+    "list": list,
+    "str": str,
+    "tuple": tuple,
+}
+
+
+class ConstraintSyntaxError(ValueError):
+    pass
+
+
+@lru_cache(maxsize=4096)
+def parse_constraint(source: str) -> Constraint:
+    """
+    Parse the string representation of a constraint, e.g.
+    `"InRange('[ 0 , 1 ]')"` or `"ANY(IsInteger(), NOT(IsBool()))"`.
+
+    Unlike `eval`, only calls of registered `Constraint` classes with literal
+    arguments (numbers, strings, `None`, booleans, containers, type names and
+    nested constraints) are accepted. Parsed constraints are memoized, so
+    identical strings share one instance.
+
+    Parameters
+    ----------
+    source : str
+        String representation of the constraint.
+
+    Returns
+    -------
+    Constraint
+        The constraint.
+
+    Raises
+    ------
+    ConstraintSyntaxError
+        If the string is not a call of a registered constraint class with
+        literal arguments.
+    """
+    import ast
+
+    try:
+        node = ast.parse(source.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ConstraintSyntaxError(f"Invalid constraint `{source}`: {e.msg}.") from e
+
+    try:
+        constraint = _build(node)
+    except ConstraintSyntaxError as e:
+        raise ConstraintSyntaxError(f"Invalid constraint `{source}`: {e}") from None
+
+    if not isinstance(constraint, Constraint):
+        raise ConstraintSyntaxError(f"`{source}` is not a `Constraint`.")
+    return constraint
+
+
+# the memoized constraints are stale once a name is registered again
+_registry_hooks.append(parse_constraint.cache_clear)
+
+
+def format_constraint(constraint: Constraint) -> str:
+    """
+    String representation of a constraint parsed back by `parse_constraint`,
+    the inverse of the parser.
+
+    Parameters
+    ----------
+    constraint : Constraint
+        The constraint, rebuilt by calling its class with its `arguments()`.
+
+    Returns
+    -------
+    str
+        Source of the constraint, e.g. `"ANY(IsInteger(), NOT(IsBool()))"`.
+
+    Raises
+    ------
+    ValueError
+        If an argument cannot be written as a literal, or if the class cannot
+        be rebuilt from `arguments()`: a constraint with a state whose class
+        does not implement `arguments`, or overrides `__init__` without
+        overriding `arguments`, or whose `arguments()` do not bind to the
+        parameters of the constructor.
+    """
+    import inspect
+
+    cls = type(constraint)
+    # instances of shared classes are built without arguments
+    if "_instance" in vars(cls):
+        return f"{cls.__name__}()"
+
+    init = _owner(cls, "__init__")
+    owner = _owner(cls, "arguments")
+    if _state(constraint) and (
+        owner is Constraint or (init is not owner and issubclass(init, owner))
+    ):
+        raise ValueError(
+            f"Cannot write `{cls.__name__}` in a manifest: it has a state but "
+            "does not implement `arguments()` for its constructor."
+        )
+    args = constraint.arguments()
+    try:
+        inspect.signature(cls).bind(*args)
+    except TypeError:
+        raise ValueError(
+            f"Cannot write `{cls.__name__}` in a manifest: its `arguments()` "
+            f"{args!r} do not match its constructor."
+        ) from None
+    return f"{cls.__name__}({', '.join(_format_value(a) for a in args)})"
+
+
+def _owner(cls: type, name: str) -> type:
+    """Class of the MRO of `cls` defining the attribute `name`."""
+    return next(klass for klass in cls.__mro__ if name in vars(klass))
+
+
+_type_sources = {t: name for name, t in _type_names.items()}
+
+
+def _format_value(value: Any) -> str:
+    import ast
+
+    if isinstance(value, Constraint):
+        return format_constraint(value)
+    if isinstance(value, type):
+        if value not in _type_sources:
+            raise ValueError(f"Cannot write the type `{value}` in a constraint.")
+        return _type_sources[value]
+    if isinstance(value, tuple):
+        items = [_format_value(v) for v in value]
+        return f"({', '.join(items)}{',' if len(items) == 1 else ''})"
+    if isinstance(value, list):
+        return f"[{', '.join(_format_value(v) for v in value)}]"
+
+    source = repr(value)
+    try:
+        ast.literal_eval(source)
+    except (ValueError, SyntaxError):
+        raise ValueError(f"Cannot write `{source}` in a constraint.") from None
+    return source
+
+
+def _build(node: Any) -> Constraint:
+    import ast
+
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+        raise ConstraintSyntaxError("expected a call of a `Constraint` class.")
+
+    cls = constraint_registry.get(node.func.id)
+    if cls is None:
+        raise ConstraintSyntaxError(f"unknown constraint `{node.func.id}`.")
+
+    args = []
+    for arg in node.args:
+        if isinstance(arg, ast.Starred):
+            raise ConstraintSyntaxError("`*` arguments are not supported.")
+        args.append(_value(arg))
+
+    kwargs = {}
+    for keyword in node.keywords:
+        if keyword.arg is None:
+            raise ConstraintSyntaxError("`**` arguments are not supported.")
+        kwargs[keyword.arg] = _value(keyword.value)
+
+    return cls(*args, **kwargs)
+
+
+def _value(node: Any) -> Any:
+    import ast
+
+    if isinstance(node, ast.Call):
+        return _build(node)
+
+    if isinstance(node, ast.Name):
+        if node.id not in _type_names:
+            raise ConstraintSyntaxError(f"unknown name `{node.id}`.")
+        return _type_names[node.id]
+
+    if isinstance(node, (ast.Tuple, ast.List)):
+        values = [_value(e) for e in node.elts]
+        return tuple(values) if isinstance(node, ast.Tuple) else values
+
+    try:
+        return ast.literal_eval(node)
+    except ValueError as e:
+        raise ConstraintSyntaxError(f"{e}.") from None
@@ -1,6 +1,9 @@
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
 from typing import *
 
-from .base import Constraint, IsInstance
+from .base import Constraint, IsInstance, _bind, _elementwise
 
 __all__ = [
     "IsFloat",
@@ -14,17 +17,23 @@ __all__ = [
 ]
 
 
-class IsFloat(IsInstance):
+class IsFloat(IsInstance, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(float)
 
 
-class IsInteger(IsInstance):
+class IsInteger(IsInstance, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(int)
 
 
-class IsReal(IsInstance):
+class IsReal(IsInstance, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__((int, float))
 
@@ -47,6 +56,10 @@ class InRange(Constraint):
 
     e.g. '( 0.1 , 100 ]', '[ -1 , oo )'
 
+    The intervals are merged into disjoint sorted intervals at construction,
+    so the membership test is a binary search over the lower bounds. The
+    bounds are stored in flat arrays, shared by the `InRange`s of the same
+    ranges.
 
     Parameters
     ----------
@@ -55,12 +68,11 @@ class InRange(Constraint):
 
     Attributes
     ----------
-    ranges : List[str]
-        List of string representation of intervals
-    rules : List[Callable]
-        List of bool functions;
-        each function returns `True` if the arg is within
-        the corresponding interval
+    ranges : Tuple[str]
+        String representations of the intervals
+    intervals : List[Tuple[float, bool, float, bool]]
+        Disjoint sorted intervals covering the union of the ranges, as
+        `(lower_bound, lower_closed, upper_bound, upper_closed)`
     """
 
     _map_infs = {
@@ -72,16 +84,75 @@ class InRange(Constraint):
         "-inf": -float("inf"),
     }
 
+    cost = 2.0
+    pure = True
+
+    # intervals tested with inlined comparisons by `compile_statements`
+    _max_inlined_intervals = 4
+
+    # bounds as `array("d")` and closedness flags as `bytes`
+    __slots__ = ("ranges", "_lowers", "_lower_closed", "_uppers", "_upper_closed")
+
     def __init__(self, *ranges: str):
         assert isinstance(ranges, tuple)
         self.ranges = ranges
-        self.rules = [self._parse_eq(r) for r in self.ranges]
+        (
+            self._lowers,
+            self._lower_closed,
+            self._uppers,
+            self._upper_closed,
+        ) = _flat_intervals(ranges)
+
+    @classmethod
+    def _from_flat(
+        cls,
+        ranges: Tuple[str, ...],
+        lowers: array,
+        lower_closed: bytes,
+        uppers: array,
+        upper_closed: bytes,
+    ) -> "InRange":
+        """`InRange` of already merged intervals, e.g. read from a binary
+        manifest, without parsing the ranges."""
+        self = cls.__new__(cls)
+        self.ranges = ranges
+        self._lowers = lowers
+        self._lower_closed = lower_closed
+        self._uppers = uppers
+        self._upper_closed = upper_closed
+        return self
+
+    @property
+    def intervals(self) -> List[Tuple[float, bool, float, bool]]:
+        return [
+            (lower, bool(lower_closed), upper, bool(upper_closed))
+            for lower, lower_closed, upper, upper_closed in zip(
+                self._lowers, self._lower_closed, self._uppers, self._upper_closed
+            )
+        ]
+
+    def __getstate__(self) -> Dict[str, Tuple[str, ...]]:
+        # pickled compactly: the intervals are rebuilt from the ranges
+        return {"ranges": self.ranges}
+
+    def __setstate__(self, state: Dict[str, Tuple[str, ...]]) -> None:
+        InRange.__init__(self, *state["ranges"])
 
     def assertion(self, x: Union[int, float]) -> bool:
 
         assert isinstance(x, (int, float))
 
-        return any(r(x) for r in self.rules)
+        # the only interval which may contain x starts at or before it
+        i = bisect_right(self._lowers, x) - 1
+        if i < 0:
+            return False
+        if x == self._lowers[i]:
+            return bool(self._lower_closed[i])
+        upper = self._uppers[i]
+        return x < upper or (x == upper and bool(self._upper_closed[i]))
+
+    def arguments(self) -> Tuple[str, ...]:
+        return self.ranges
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({', '.join(self.ranges)})"
@@ -91,7 +162,98 @@ class InRange(Constraint):
             set(self.ranges) == set(other.ranges)
         )
 
-    def _parse_eq(self, eq: str) -> Callable:
+    def compile_statements(self, var: str, namespace: Dict[str, Any]) -> List[str]:
+        namespace.setdefault("_real", (int, float))
+        check = [f"assert isinstance({var}, _real)"]
+
+        if len(self._lowers) > self._max_inlined_intervals:
+            name = _bind(namespace, self.assertion)
+            return check + [f"if not {name}({var}):", "    return False"]
+
+        namespace.setdefault("_inf", float("inf"))
+
+        def _literal(bound: float) -> str:
+            if bound == float("inf"):
+                return "_inf"
+            if bound == -float("inf"):
+                return "-_inf"
+            return repr(bound)
+
+        tests = []
+        for lower, lower_closed, upper, upper_closed in self.intervals:
+            left = "<=" if lower_closed else "<"
+            right = "<=" if upper_closed else "<"
+            tests.append(f"{_literal(lower)} {left} {var} {right} {_literal(upper)}")
+
+        return check + [
+            f"if not ({' or '.join(tests) or 'False'}):",
+            "    return False",
+        ]
+
+    def batch_assertion(self, column: Any) -> Any:
+        import numpy as np
+
+        if column.dtype.kind not in "biuf":
+            return _elementwise(self, column)
+
+        if not self._lowers:
+            return np.zeros(len(column), dtype=bool)
+
+        lowers = np.frombuffer(self._lowers, dtype=float)
+        uppers = np.frombuffer(self._uppers, dtype=float)
+        lower_closed = np.frombuffer(self._lower_closed, dtype=bool)
+        upper_closed = np.frombuffer(self._upper_closed, dtype=bool)
+
+        i = np.searchsorted(lowers, column, side="right") - 1
+        j = np.maximum(i, 0)
+        inside = np.where(
+            column == lowers[j],
+            lower_closed[j],
+            (column < uppers[j]) | ((column == uppers[j]) & upper_closed[j]),
+        )
+        return (i >= 0) & inside
+
+    @staticmethod
+    def _merge(
+        intervals: List[Tuple[float, bool, float, bool]],
+    ) -> List[Tuple[float, bool, float, bool]]:
+
+        # drop empty intervals; closed lower bounds sort first
+        intervals = sorted(
+            (
+                (lower, lower_closed, upper, upper_closed)
+                for lower, lower_closed, upper, upper_closed in intervals
+                if lower < upper or (lower == upper and lower_closed and upper_closed)
+            ),
+            key=lambda i: (i[0], not i[1]),
+        )
+
+        merged = []
+        for lower, lower_closed, upper, upper_closed in intervals:
+            if merged:
+                last_lower, last_lower_closed, last_upper, last_upper_closed = merged[
+                    -1
+                ]
+                if lower < last_upper or (
+                    lower == last_upper and (last_upper_closed or lower_closed)
+                ):
+                    if upper > last_upper:
+                        last_upper, last_upper_closed = upper, upper_closed
+                    elif upper == last_upper:
+                        last_upper_closed = last_upper_closed or upper_closed
+                    merged[-1] = (
+                        last_lower,
+                        last_lower_closed,
+                        last_upper,
+                        last_upper_closed,
+                    )
+                    continue
+            merged.append((lower, lower_closed, upper, upper_closed))
+
+        return merged
+
+    @classmethod
+    def _parse_bounds(cls, eq: str) -> Tuple[float, bool, float, bool]:
 
         assert isinstance(eq, str)
         eq_ = eq.split(" ")
@@ -104,57 +266,55 @@ class InRange(Constraint):
         assert eq_[4] in ("]", ")")
         assert eq_[2] == ","
 
-        if eq_[1] in self._map_infs:
-            lower_bound = self._map_infs[eq_[1]]
+        if eq_[1] in cls._map_infs:
+            lower_bound = cls._map_infs[eq_[1]]
         else:
             lower_bound = float(eq_[1])
 
-        if eq_[3] in self._map_infs:
-            upper_bound = self._map_infs[eq_[3]]
+        if eq_[3] in cls._map_infs:
+            upper_bound = cls._map_infs[eq_[3]]
         else:
             upper_bound = float(eq_[3])
 
-        if eq_[0] == "[":
-
-            def left_rule(x):
-                return x >= lower_bound
-
-        else:  # '('
-
-            def left_rule(x):
-                return x > lower_bound
-
-        if eq_[4] == "]":
+        return lower_bound, eq_[0] == "[", upper_bound, eq_[4] == "]"
 
-            def right_rule(x):
-                return x <= upper_bound
 
-        else:  # ')'
+@lru_cache(maxsize=4096)
+def _flat_intervals(ranges: Tuple[str, ...]) -> Tuple[array, bytes, array, bytes]:
+    """Merged intervals of `ranges` as flat arrays of the lower bounds, lower
+    closedness, upper bounds and upper closedness."""
+    intervals = InRange._merge([InRange._parse_bounds(r) for r in ranges])
+    return (
+        array("d", [i[0] for i in intervals]),
+        bytes(i[1] for i in intervals),
+        array("d", [i[2] for i in intervals]),
+        bytes(i[3] for i in intervals),
+    )
 
-            def right_rule(x):
-                return x < upper_bound
 
-        def rule(x):
-            return left_rule(x) and right_rule(x)
+class Positive(InRange, shared=True):
+    __slots__ = ()
 
-        return rule
-
-
-class Positive(InRange):
     def __init__(self):
         super().__init__("( 0 , oo )")
 
 
-class Negative(InRange):
+class Negative(InRange, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("( -oo , 0 )")
 
 
-class NonNegative(InRange):
+class NonNegative(InRange, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("[ 0 , oo )")
 
 
-class NonPositive(InRange):
+class NonPositive(InRange, shared=True):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("( -oo , 0 ]")
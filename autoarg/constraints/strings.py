@@ -1,43 +1,73 @@
-import json
+from typing import *
 
-import yaml
-from pathvalidate import is_valid_filepath
-
-from .base import Constraint, IsInstance
+from .base import Decoder, IsInstance
+from .memo import MemoizedConstraint
 
 __all__ = ["IsString", "ValidPath", "ValidJson", "ValidYaml"]
 
 
-class IsString(IsInstance):
+class IsString(IsInstance, shared=True):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(str)
 
 
-class ValidPath(Constraint):
+class ValidPath(MemoizedConstraint):
+    cost = 20.0
+
+    __slots__ = ("platform",)
+
     def __init__(self, platform="linux") -> None:
         assert platform in ("windows", "linux", "macos", "posix", "universal")
         self.platform = platform
 
-    def assertion(self, x: str) -> bool:
+    def evaluate(self, x: str) -> bool:
+        from pathvalidate import is_valid_filepath
+
         return is_valid_filepath(x, platform=self.platform)
 
+    def memo_key(self) -> Hashable:
+        return self.__class__, self.platform
+
+    def arguments(self) -> Tuple[str]:
+        return (self.platform,)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(platform={self.platform})"
 
 
-class ValidJson(Constraint):
-    def assertion(self, x: str) -> bool:
+class ValidJson(MemoizedConstraint, Decoder, shared=True):
+    cost = 50.0
+
+    __slots__ = ()
+
+    def evaluate(self, x: str) -> bool:
+        return self.decode(x)[0]
+
+    def decode(self, x: str) -> Tuple[bool, Any]:
+        import json
+
         try:
-            json.loads(x)
-            return True
+            return True, json.loads(x)
         except json.JSONDecodeError:
-            return False
+            return False, None
+
+
+class ValidYaml(MemoizedConstraint, Decoder, shared=True):
+    cost = 100.0
+
+    __slots__ = ()
+
+    def evaluate(self, x: str) -> bool:
+        return self.decode(x)[0]
+
+    def decode(self, x: str) -> Tuple[bool, Any]:
+        import yaml
 
+        from ..loaders import load_yaml
 
-class ValidYaml(Constraint):
-    def assertion(self, x: str) -> bool:
         try:
-            yaml.safe_load(x)
-            return True
+            return True, load_yaml(x)
         except yaml.scanner.ScannerError:
-            return False
+            return False, None
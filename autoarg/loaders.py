@@ -0,0 +1,187 @@
+import os
+from typing import *
+
+__all__ = [
+    "yaml_loader",
+    "yaml_dumper",
+    "load_yaml",
+    "dump_yaml",
+    "load_json",
+    "load_stream",
+    "load_file",
+    "register_loader",
+    "manifest_formats",
+]
+
+_yaml_backends = ("auto", "c", "python")
+
+
+def _yaml_class(backend: str, c_name: str, python_name: str) -> type:
+    import yaml
+
+    assert backend in _yaml_backends, f"`backend` must be in {_yaml_backends}."
+    if backend == "python":
+        return getattr(yaml, python_name)
+    cls = getattr(yaml, c_name, None)
+    if cls is None:
+        assert backend == "auto", "PyYAML is built without libyaml."
+        return getattr(yaml, python_name)
+    return cls
+
+
+def yaml_loader(backend: str = "auto") -> type:
+    """
+    Safe YAML loader class: `yaml.CSafeLoader` if PyYAML is built with
+    libyaml, otherwise the pure python `yaml.SafeLoader`.
+
+    Parameters
+    ----------
+    backend : str
+        `"auto"` for the fastest available loader, `"c"` or `"python"`.
+    """
+    return _yaml_class(backend, "CSafeLoader", "SafeLoader")
+
+
+def yaml_dumper(backend: str = "auto") -> type:
+    """Safe YAML dumper class, `yaml.CSafeDumper` if available; see
+    `yaml_loader`."""
+    return _yaml_class(backend, "CSafeDumper", "SafeDumper")
+
+
+def load_yaml(stream: Union[str, bytes, IO], backend: str = "auto") -> Any:
+    """
+    Parse a YAML document like `yaml.safe_load`, with the libyaml loader if
+    available. File objects are read incrementally.
+
+    Parameters
+    ----------
+    stream : Union[str, bytes, IO]
+        Text of the document or a file object.
+    backend : str
+        YAML backend, see `yaml_loader`.
+    """
+    import yaml
+
+    return yaml.load(stream, Loader=yaml_loader(backend))
+
+
+def dump_yaml(
+    data: Any, stream: Optional[IO] = None, backend: str = "auto", **kwargs: Any
+) -> Optional[str]:
+    """
+    Serialize `data` like `yaml.safe_dump`, with the libyaml dumper if
+    available.
+
+    Parameters
+    ----------
+    data : Any
+        Data to serialize.
+    stream : Optional[IO]
+        File object to write to; the text is returned if `None`.
+    backend : str
+        YAML backend, see `yaml_loader`.
+    **kwargs : Any
+        Options of `yaml.dump`, e.g. `sort_keys`.
+    """
+    import yaml
+
+    return yaml.dump(data, stream, Dumper=yaml_dumper(backend), **kwargs)
+
+
+def load_json(stream: Union[str, bytes, IO], backend: str = "auto") -> Any:
+    """Parse a JSON document. The `json` module reads file objects whole;
+    `backend` is ignored."""
+    import json
+
+    if isinstance(stream, (str, bytes)):
+        return json.loads(stream)
+    return json.load(stream)
+
+
+# map from manifest formats to their loaders, and from file suffixes to
+# formats
+_loaders: Dict[str, Callable[..., Any]] = {"yaml": load_yaml, "json": load_json}
+_suffixes: Dict[str, str] = {".yaml": "yaml", ".yml": "yaml", ".json": "json"}
+
+
+def register_loader(
+    format: str,
+    load: Callable[..., Any],
+    suffixes: Iterable[str] = (),
+) -> None:
+    """
+    Register a manifest format, e.g. `register_loader("toml", load_toml,
+    [".toml"])`.
+
+    Parameters
+    ----------
+    format : str
+        Name of the format.
+    load : Callable[..., Any]
+        Function of a text, bytes or file object (files are opened in binary
+        mode) and a `backend` keyword, returning the manifest as python
+        objects.
+    suffixes : Iterable[str]
+        File suffixes of the format.
+    """
+    _loaders[format] = load
+    for suffix in suffixes:
+        _suffixes[suffix.lower()] = format
+
+
+def manifest_formats() -> List[str]:
+    """Names of the registered manifest formats."""
+    return list(_loaders)
+
+
+def load_stream(
+    stream: Union[str, bytes, IO], format: str = "yaml", backend: str = "auto"
+) -> Any:
+    """
+    Load a manifest from its text or a file object.
+
+    Parameters
+    ----------
+    stream : Union[str, bytes, IO]
+        Text of the manifest or a file object, read incrementally by the YAML
+        loaders.
+    format : str
+        Registered format, e.g. `"yaml"` or `"json"`.
+    backend : str
+        Backend of the loader, see `yaml_loader`.
+
+    Returns
+    -------
+    Any
+        The manifest as python objects.
+    """
+    assert format in _loaders, f"Unknown manifest format `{format}`."
+    return _loaders[format](stream, backend=backend)
+
+
+def load_file(
+    path: Union[str, os.PathLike], format: Optional[str] = None, backend: str = "auto"
+) -> Any:
+    """
+    Load a manifest file, see `load_stream`.
+
+    Parameters
+    ----------
+    path : Union[str, os.PathLike]
+        Path of the manifest.
+    format : Optional[str]
+        Registered format; guessed from the suffix of `path` if `None`, YAML
+        for unknown suffixes.
+    backend : str
+        Backend of the loader, see `yaml_loader`.
+
+    Returns
+    -------
+    Any
+        The manifest as python objects.
+    """
+    path = os.fspath(path)
+    if format is None:
+        format = _suffixes.get(os.path.splitext(path)[1].lower(), "yaml")
+    with open(path, "rb") as f:
+        return load_stream(f, format, backend)
@@ -0,0 +1,48 @@
+"""
+Compare the cold (YAML parsing and constraint construction) and warm
+(`ManifestCache` hit) start of `Validator.from_yaml`.
+
+Usage: python benchmarks/bench_cache.py [--arguments N] [--number N]
+"""
+
+import argparse
+import tempfile
+import timeit
+
+import autoarg
+from manifests import make_manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arguments", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    manifest = make_manifest(args.arguments)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = autoarg.ManifestCache(directory)
+        autoarg.Validator.from_yaml(manifest, cache=cache)
+
+        cold = min(
+            timeit.repeat(
+                lambda: autoarg.Validator.from_yaml(manifest),
+                number=args.number,
+                repeat=3,
+            )
+        )
+        warm = min(
+            timeit.repeat(
+                lambda: autoarg.Validator.from_yaml(manifest, cache=cache),
+                number=args.number,
+                repeat=3,
+            )
+        )
+
+    print(f"arguments: {args.arguments}")
+    print(f"     cold: {cold / args.number * 1e3:8.2f} ms")
+    print(f"     warm: {warm / args.number * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
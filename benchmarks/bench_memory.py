@@ -0,0 +1,59 @@
+"""
+Measure the resident memory of validators with `tracemalloc`: bytes per
+argument of `Validator`s and `CompiledValidator`s built from the synthetic
+manifests, as kept by a service holding many validators.
+
+Usage: python benchmarks/bench_memory.py [--arguments N] [--validators N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+import autoarg
+from manifests import make_constraints
+
+
+def measure(build, n: int) -> float:
+    """Bytes allocated by `build` and still alive, per argument."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del kept
+    return size / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arguments", type=int, default=100)
+    parser.add_argument("--validators", type=int, default=100)
+    args = parser.parse_args()
+
+    d = make_constraints(args.arguments)
+    # warm the parser and the constraint caches, which are shared
+    autoarg.Validator.from_dict(d).compile()
+
+    n = args.arguments * args.validators
+    for name, build in [
+        (
+            "Validator",
+            lambda: [autoarg.Validator.from_dict(d) for _ in range(args.validators)],
+        ),
+        (
+            "CompiledValidator",
+            lambda: [
+                autoarg.Validator.from_dict(d).compile()
+                for _ in range(args.validators)
+            ],
+        ),
+    ]:
+        print(f"{name:>18}: {measure(build, n):8.1f} bytes/argument")
+
+
+if __name__ == "__main__":
+    main()
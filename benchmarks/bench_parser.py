@@ -0,0 +1,50 @@
+"""
+Compare building the arguments of a validation manifest with the constraint
+parser (cold and memoized) and with the former `eval` of every string.
+
+Usage: python benchmarks/bench_parser.py [--arguments N]
+"""
+
+import argparse
+import time
+
+import autoarg
+import autoarg.constraints
+from manifests import make_constraints
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arguments", type=int, default=10000)
+    args = parser.parse_args()
+
+    d = make_constraints(args.arguments)
+    # unique strings, so that the memoization does not apply
+    unique = {
+        name: [c.replace("Default(1)", f"Default({i})") for c in constraints]
+        for i, (name, constraints) in enumerate(d.items())
+    }
+    namespace = vars(autoarg.constraints)
+
+    def _eval(d):
+        return {
+            name: autoarg.Argument(name, [eval(c, namespace) for c in constraints])
+            for name, constraints in d.items()
+        }
+
+    def _parse(d):
+        autoarg.constraints.parse_constraint.cache_clear()
+        return autoarg.get_arguments_from_dict(d)
+
+    for label, func, x in [
+        ("eval", _eval, d),
+        ("parser (cold)", _parse, unique),
+        ("parser (memoized)", autoarg.get_arguments_from_dict, d),
+    ]:
+        start = time.perf_counter()
+        func(x)
+        print(f"{label:>18}: {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Synthetic manifests shared by the benchmarks."""
+
+from typing import *
+
+CONSTRAINTS = [
+    ["IsInteger()", "Positive()", "Default(1)"],
+    ["IsFloat()", "InRange('[ 0 , 0.1 ]', '[ 1 , oo )')"],
+    ["IsString()", "ValidJson()"],
+    ["IsBool()", "Default(True)"],
+    ["ANY(IsInteger(), IsFloat())", "NonNegative()", "Required()"],
+    ["IsReal()", "InRange('( -oo , -1 ]', '[ 0 , 1 ]', '[ 10 , 100 )')"],
+    [
+        "ALL(IsInteger(), ANY(InRange('[ 0 , 10 ]'), InRange('[ 100 , 1000 ]')))",
+        "Default(0)",
+    ],
+]
+
+# a valid value of every entry of `CONSTRAINTS`
+VALUES = [3, 0.05, '{"layers": [64, 64]}', True, 2.5, -5.0, 150]
+
+# entries of `CONSTRAINTS` whose values are numbers
+NUMERIC = {0, 1, 4, 5, 6}
+
+
+def make_constraints(n: int) -> Dict[str, List[str]]:
+    """Dictionary of `n` arguments cycling through `CONSTRAINTS`."""
+    return {f"arg_{i}": CONSTRAINTS[i % len(CONSTRAINTS)] for i in range(n)}
+
+
+def make_manifest(n: int) -> str:
+    """YAML validation manifest of `n` arguments."""
+    lines = ["---"]
+    for name, constraints in make_constraints(n).items():
+        lines.append(f"{name}:")
+        lines.extend(f"  - {c}" for c in constraints)
+    return "\n".join(lines) + "\n"
+
+
+def make_values(n: int) -> Dict[str, Any]:
+    """Valid values of the arguments of `make_constraints(n)`."""
+    return {f"arg_{i}": VALUES[i % len(VALUES)] for i in range(n)}
+
+
+def make_expressions(n: int) -> Dict[str, str]:
+    """Converter templates over the arguments of `make_constraints(n)`."""
+    expressions = {}
+    for i in range(n):
+        if i % len(CONSTRAINTS) not in NUMERIC:
+            expressions[f"out_{i}"] = f"${{arg_{i}}}"
+        elif i % 2:
+            expressions[f"out_{i}"] = f"max(${{arg_{i}}}, 1)"
+        else:
+            expressions[f"out_{i}"] = f"2 * ${{arg_{i}}} + ${{arg_0}}"
+    return expressions
+
+
+def make_filter_specs(n: int, seed: int = 0) -> List[List[str]]:
+    """Two random halves and a random quarter of the converter outputs."""
+    import random
+
+    rng = random.Random(seed)
+    names = [f"out_{i}" for i in range(n)]
+    return [
+        rng.sample(names, n // 2),
+        rng.sample(names, n // 2),
+        rng.sample(names, n // 4),
+    ]
@@ -0,0 +1,207 @@
+"""
+Benchmark suite of the operators over synthetic manifests of increasing size.
+
+Measures the import time, the parsing of manifests by every loader backend,
+the construction from YAML, the per-call latency of
+every operator, the batch throughput and the `Filter` algebra, writes the
+results as JSON and compares them with a stored baseline. Every result is in
+seconds per operation (per record for the batch benchmarks), so lower is
+better; a result slower than the baseline by more than the threshold is a
+regression and makes the script exit with status 1.
+
+Usage: python benchmarks/run.py [--sizes 10 100 1000 10000] [--output FILE]
+                                [--baseline FILE] [--threshold 0.25]
+                                [--save-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from typing import *
+
+import yaml
+
+import autoarg
+from autoarg.loaders import dump_yaml, load_json, load_yaml
+from manifests import make_expressions, make_filter_specs, make_manifest, make_values
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(func: Callable[[], Any], repeat: int, records: int = 1) -> float:
+    """Best time of `func` in seconds, divided by the number of `records` it
+    processes."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number / records
+
+
+def import_time(repeat: int) -> float:
+    code = (
+        "import time; t = time.perf_counter(); import autoarg; "
+        "print(time.perf_counter() - t)"
+    )
+    return min(
+        float(subprocess.check_output([sys.executable, "-c", code]))
+        for _ in range(repeat)
+    )
+
+
+def run_size(n: int, repeat: int) -> Dict[str, float]:
+    manifest = make_manifest(n)
+    values = make_values(n)
+
+    validator = autoarg.Validator.from_yaml(manifest)
+    compiled = validator.compile()
+    converter = autoarg.Converter(make_expressions(n))
+    converted = converter.operate(values)
+    white, other, black = make_filter_specs(n)
+    white_list = autoarg.WhiteList(*white)
+    black_list = autoarg.BlackList(*black)
+    other_list = autoarg.WhiteList(*other)
+    bitsets = [f.to_bitset() for f in (white_list, black_list, other_list)]
+    fused = (compiled >> converter >> white_list).fuse()
+    binary = validator.to_binary()
+
+    results = {
+        "from_yaml/validator": measure(
+            lambda: autoarg.Validator.from_yaml(manifest), repeat
+        ),
+        "from_binary/validator": measure(
+            lambda: autoarg.Validator.from_binary(binary).args.materialize(), repeat
+        ),
+        "call/validator": measure(lambda: validator.operate(values), repeat),
+        "call/compiled_validator": measure(lambda: compiled.operate(values), repeat),
+        "call/converter": measure(lambda: converter.operate(values), repeat),
+        "call/converter_one_output": measure(
+            lambda: converter.view(values)[f"out_{n - 1}"], repeat
+        ),
+        "call/filter": measure(lambda: white_list.operate(converted), repeat),
+        "call/filter_view": measure(lambda: white_list.view(converted), repeat),
+        "call/validator_view": measure(lambda: compiled.view(values), repeat),
+        "call/bitset_filter": measure(lambda: bitsets[0].operate(converted), repeat),
+        "call/fused_pipeline": measure(lambda: fused.operate(values), repeat),
+    }
+
+    # parsing of the manifest alone, by every loader backend
+    data = validator.to_dict()
+    json_manifest = json.dumps(data)
+    results["load/yaml_python"] = measure(
+        lambda: load_yaml(manifest, backend="python"), repeat
+    )
+    if yaml.__with_libyaml__:
+        results["load/yaml_c"] = measure(lambda: load_yaml(manifest, backend="c"), repeat)
+        results["dump/yaml_c"] = measure(lambda: dump_yaml(data, backend="c"), repeat)
+    results["load/json"] = measure(lambda: load_json(json_manifest), repeat)
+    results["dump/yaml_python"] = measure(
+        lambda: dump_yaml(data, backend="python"), repeat
+    )
+
+    for kind, (a, b, c) in [
+        ("filter", (white_list, black_list, other_list)),
+        ("bitset_filter", bitsets),
+    ]:
+        results[f"algebra/{kind}/and"] = measure(lambda: a & b, repeat)
+        results[f"algebra/{kind}/or"] = measure(lambda: a | c, repeat)
+        results[f"algebra/{kind}/invert"] = measure(lambda: ~a, repeat)
+
+    # records per batch, bounded to keep the batches of large manifests small
+    m = max(10, min(1000, 100000 // n))
+    records = [values] * m
+    results["batch/stream"] = measure(
+        lambda: sum(1 for _ in fused.stream(records, chunk_size=256)), repeat, m
+    )
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        results["batch/validate_batch"] = measure(
+            lambda: validator.validate_batch(records), repeat, m
+        )
+        columns = validator.validate_batch(records).values
+        results["batch/convert_columns"] = measure(
+            lambda: converter.convert_columns(columns), repeat, m
+        )
+
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Print the ratio of every result to the baseline and return the keys of
+    the regressions."""
+    regressions = []
+    for key, seconds in results.items():
+        if key not in baseline:
+            print(f"{key:<45} {seconds * 1e6:14.3f} us        (new)")
+            continue
+        ratio = seconds / baseline[key]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(key)
+        print(f"{key:<45} {seconds * 1e6:14.3f} us {ratio:7.2f}x {flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="JSON file of the results.")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Tolerated slowdown relative to the baseline, e.g. 0.25 for 25%%.",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store the results as baseline."
+    )
+    args = parser.parse_args()
+
+    results = {"import/autoarg": import_time(args.repeat)}
+    for n in args.sizes:
+        for key, seconds in run_size(n, args.repeat).items():
+            results[f"{key}[n={n}]"] = seconds
+
+    report = {
+        "meta": {
+            "autoarg": autoarg.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved the baseline to {args.baseline}.")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regressions above {args.threshold:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     install_requires=requirements,
+    extras_require={"numpy": ["numpy"]},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
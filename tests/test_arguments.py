@@ -1,3 +1,10 @@
+import json
+import os
+import pickle
+import random
+
+import pytest
+
 import autoarg.arguments as aa
 import autoarg.constraints as ac
 
@@ -77,6 +84,166 @@ def test_validator():
         assert error
 
 
+def test_compiled_validator():
+
+    v = aa.Validator.from_yaml(
+        """---
+    path:
+      - IsString()
+      - ValidPath()
+      - Required()
+    epoch:
+      - Default(1)
+      - IsInteger()
+      - Positive()
+    lr:
+      - IsReal()
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+    do_train:
+      - ANY(IsBool(), IsInteger())
+    """
+    )
+    c = v.compile()
+
+    assert isinstance(c, aa.CompiledValidator)
+    assert c == v
+    assert c.compile() is c
+
+    valid = [
+        dict(path="abc", epoch=2, lr=0.1, do_train=True),
+        dict(path="abc", lr=0, do_train=1),
+        dict(path="abc", epoch=1, lr=5, do_train=False),
+    ]
+    for kwargs in valid:
+        assert c(**kwargs) == v(**kwargs)
+
+    invalid = [
+        dict(path="abc", epoch=0, lr=0.1, do_train=True),
+        dict(path="abc", epoch=1.0, lr=0.1, do_train=True),
+        dict(path="abc", epoch=1, lr=1, do_train=True),
+        dict(path="abc", epoch=1, lr=float("inf"), do_train=True),
+        dict(path="abc", epoch=1, lr=0.5, do_train=True),
+        dict(path="abc", epoch=1, lr=0.1, do_train="yes"),
+        dict(path=None, epoch=1, lr=0.1, do_train=True),
+        dict(epoch=1, lr=0.1, do_train=True),
+    ]
+    for kwargs in invalid:
+        for x in [v, c]:
+            try:
+                _ = x(**kwargs)
+                error = False
+            except AssertionError:
+                error = True
+            assert error
+
+
+def test_validate_batch():
+    np = pytest.importorskip("numpy")
+
+    v = aa.Validator.from_yaml(
+        """---
+    path:
+      - IsString()
+      - Required()
+    epoch:
+      - Default(1)
+      - IsInteger()
+      - Positive()
+    lr:
+      - Default(0.1)
+      - IsFloat()
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+    """
+    )
+
+    records = [
+        dict(path="a", epoch=2, lr=0.05),
+        dict(path="b", lr=2.0),
+        dict(path="c", epoch=0, lr=0.5),
+        dict(epoch=3),
+        dict(path=1, epoch=1.5),
+    ]
+    result = v.validate_batch(records)
+
+    assert result.mask.tolist() == [True, True, False, False, False]
+    for record, ok, reasons in zip(records, result.mask, result.reasons):
+        try:
+            v(**record)
+            error = False
+        except AssertionError:
+            error = True
+        assert error != ok
+        assert bool(reasons) == error
+    assert len(result.reasons[2]) == 2
+    assert result.values["epoch"].tolist() == [2, 1, 0, 3, 1.5]
+    assert result.values["lr"].tolist() == [0.05, 2.0, 0.5, 0.1, 0.1]
+
+    result = v.validate_columns(
+        {"path": ["a", "b", "c"], "epoch": np.array([1, 0, 5])}
+    )
+    assert result.mask.tolist() == [True, False, True]
+    assert result.values["lr"].tolist() == [0.1, 0.1, 0.1]
+
+    result = v.validate_columns({"epoch": np.array([1.0, 2.0])})
+    assert not result.mask.any()
+    assert len(result.reasons[0]) == 2
+
+    # sequence defaults are not broadcast over the rows
+    w = aa.Validator.from_dict({"x": ["IsInteger()"], "dims": ["Default([1, 2])"]})
+    for n in [2, 3]:
+        result = w.validate_columns({"x": np.arange(n)})
+        assert result.values["dims"].tolist() == [[1, 2]] * n
+
+
+def test_decoded_payloads():
+
+    manifest = """---
+    config:
+      - IsString()
+      - ValidJson()
+    options:
+      - "Default('a: 1')"
+      - ValidYaml()
+    epoch:
+      - IsInteger()
+    """
+    values = dict(config='{"model": "bert"}', epoch=1)
+
+    v = aa.Validator.from_yaml(manifest)
+    assert v.payloads == "ignore"
+    assert not v.args["config"].required
+    assert v.args["config"].decoder == ac.ValidJson()
+    assert v.args["epoch"].decoder is None
+    assert v.args["config"].decode(values["config"]) == (True, {"model": "bert"})
+    assert v.args["config"].decode("{") == (False, None)
+    assert v.args["epoch"].decode(2) == (True, 2)
+
+    for x in [aa.Validator.from_yaml(manifest, payloads="attach"), v]:
+        for y in [x, x.compile()]:
+            out = y(**values)
+            assert out == dict(values, options="a: 1")
+            if x.payloads == "attach":
+                assert isinstance(out, aa.ValidatedValues)
+                assert out.payloads == {"config": {"model": "bert"}}
+
+    v = aa.Validator.from_yaml(manifest, payloads="replace")
+    for y in [v, v.compile(), pickle.loads(pickle.dumps(v.compile()))]:
+        out = y(config='{"model": "bert"}', options="b: [1, 2]", epoch=1)
+        assert out == {"config": {"model": "bert"}, "options": {"b": [1, 2]}, "epoch": 1}
+
+        try:
+            y(config="{", epoch=1)
+            error = False
+        except AssertionError:
+            error = True
+        assert error
+
+    # decoded payloads flow into the converter
+    c = aa.Converter.from_dict({"model": "${config}['model']"})
+    p = (v >> c).fuse()
+    assert p(config='{"model": "bert"}', epoch=1) == {"model": "bert"}
+
+
 def test_converter():
 
     arg_d = {
@@ -100,6 +267,153 @@ def test_converter():
         assert out["path"] == "home/src" and out["epoch"] == 3
 
 
+def test_expressions():
+
+    e = aa.Expression("max(${epoch}, 2)")
+    assert e.kind == aa.ExpressionKind.EXPRESSION
+    assert e.names == ("epoch",)
+    assert e(dict(epoch=1)) == 2 and e(dict(epoch=5)) == 5
+
+    e = aa.Expression("${config}")
+    assert e.kind == aa.ExpressionKind.PASSTHROUGH
+    assert e(dict(config={"a": 1})) == {"a": 1}
+
+    e = aa.Expression("max(1e-3, ${lr}) if ${do_train} else 0.0")
+    assert e.names == ("lr", "do_train")
+    assert e(dict(lr=0.1, do_train=True)) == 0.1
+    assert e(dict(lr=0.1, do_train=False)) == 0.0
+
+    e = aa.Expression("s3://${bucket}/$$${key}")
+    assert e.kind == aa.ExpressionKind.LITERAL
+    assert e(dict(bucket="b", key="k")) == "s3://b/$k"
+
+    # the substituted text of literal templates is still `eval`ed
+    e = aa.Expression("${x} ${op} ${y}")
+    assert e.kind == aa.ExpressionKind.LITERAL
+    assert e(dict(x=1, op="+", y=2)) == 3 and e(dict(x=1, op="?", y=2)) == "1 ? 2"
+
+    e = aa.Expression("[1, 2]")
+    assert e.kind == aa.ExpressionKind.CONSTANT
+    assert e({}) == [1, 2] and e({}) is not e({})
+
+    # falls back to the text substitution when evaluation fails
+    e = aa.Expression("${a}/${b}")
+    assert e.kind == aa.ExpressionKind.EXPRESSION
+    assert e(dict(a="home", b="src")) == "home/src"
+    assert e(dict(a=1, b=2)) == 0.5
+
+    # the compiled function is not retried for the failing input types
+    calls = []
+    function = e._function
+    e._function = lambda *values: calls.append(1) or function(*values)
+    for _ in range(3):
+        assert e(dict(a="usr", b="lib")) == "usr/lib"
+    assert e(dict(a=4, b=2)) == 2.0 and e(dict(a=1, b=0)) == "1/0"
+    assert e(dict(a=4, b=2)) == 2.0 and len(calls) == 3
+    e = aa.Expression("${x}_suffix")
+    assert e(dict(x="a")) == "a_suffix" and e(dict(x="b")) == "b_suffix"
+    assert e._fallback_types == {(str,)}
+
+    try:
+        e(dict(a="home"))
+        error = False
+    except KeyError:
+        error = True
+    assert error
+
+    assert aa.Expression("$a + 1") == aa.Expression("$a + 1")
+    assert pickle.loads(pickle.dumps(e)) == e
+
+
+def test_pipeline():
+
+    v = aa.Validator.from_dict(
+        {"epoch": ["IsInteger()", "Positive()", "Default(1)"], "lr": ["IsFloat()"]}
+    )
+    c = aa.Converter.from_dict({"epoch": "max(${epoch}, 2)", "lr2": "2 * ${lr}"})
+    f = aa.BlackList("lr2")
+    p = aa.Pipeline([v, c, f])
+
+    assert len(p) == 3
+    assert p(lr=0.5) == f(**c(**v(lr=0.5))) == {"epoch": 2}
+
+    def records():
+        for i in range(10):
+            if i % 3 == 0:
+                yield {"epoch": -i, "lr": 0.1}
+            else:
+                yield {"epoch": i, "lr": 0.1}
+
+    for chunk_size in [1, 4, 100]:
+        results = list(p.stream(records(), chunk_size=chunk_size))
+        assert [r.index for r in results] == list(range(10))
+        for i, r in enumerate(results):
+            if i % 3 == 0:
+                assert not r.ok and r.value is None
+                assert isinstance(r.error, AssertionError)
+            else:
+                assert r.ok and r.value == {"epoch": max(i, 2)}
+
+    # records are consumed lazily
+    stream = p.stream(iter([{"lr": 0.1}, {"lr": "a"}, None]))
+    assert next(stream).ok
+    assert not next(stream).ok
+
+
+def test_fused_pipeline():
+
+    v = aa.Validator.from_dict(
+        {
+            "epoch": ["IsInteger()", "Positive()", "Default(1)"],
+            "lr": ["IsFloat()", "Required()"],
+            "tag": ["IsString()", "Required()"],
+        }
+    )
+    c = aa.Converter.from_dict(
+        {"epoch": "max(${epoch}, 2)", "lr": "${lr}", "lr2": "2 * ${lr}"}
+    )
+    f = aa.BlackList("lr2")
+    p = v >> c >> f
+
+    assert isinstance(p, aa.Pipeline) and len(p) == 3
+    assert p == aa.Pipeline([v, aa.Pipeline([c, f])])
+
+    fused = p.fuse()
+    assert len(fused) == 1
+    (stage,) = fused.args
+    assert isinstance(stage, aa.FusedStage)
+    validator, converter = stage.args
+    assert set(validator.args) == {"epoch", "lr"}
+    assert set(converter.args) == {"epoch", "lr"}
+
+    for kwargs in [dict(lr=0.5, tag="a"), dict(epoch=5, lr=0.1, tag="b")]:
+        assert fused(**kwargs) == p(**kwargs)
+    # `tag` is not used downstream, hence neither validated nor required
+    assert fused(lr=0.5) == {"epoch": 2, "lr": 0.5}
+    assert fused.fuse() == fused
+
+    # a filter in front has unknown input names and is kept
+    p = aa.WhiteList("epoch") >> v.compile() >> aa.WhiteList("epoch")
+    fused = p.fuse()
+    assert len(fused) == 2
+    assert set(fused.args[1].args) == {"epoch"}
+    assert fused(epoch=3, lr="x") == {"epoch": 3}
+
+    # fused and unfused pipelines agree when inputs and outputs share names
+    v = aa.Validator.from_dict({"x": [], "a": ["IsInteger()", "Default(7)"]})
+    p = v >> aa.Converter({"a": "${x} * 2", "b": "${a}"}) >> aa.WhiteList("b")
+    fused = p.fuse()
+    assert isinstance(fused.args[0], aa.FusedStage)
+    assert p(x=1) == fused(x=1) == {"b": 7}
+    for pipeline in [p, fused]:
+        with pytest.raises(AssertionError):
+            pipeline(x=1, a="s")
+    p = aa.Validator.from_dict({"x": []}) >> aa.Converter(
+        {"y": "${x} + 1", "z": "${out.y} * 10"}
+    )
+    assert p(x=1, y=100) == p.fuse()(x=1, y=100) == {"y": 2, "z": 20}
+
+
 def test_filters():
     f = aa.Filter.from_yaml(
         """---
@@ -134,6 +448,9 @@ def test_filters():
     assert "var3" not in d
     assert "var4" in d and d["var4"] == 4
     assert "var5" in d and d["var5"] == 5
+    # the mode defaults to normal_white
+    assert aa.Filter.from_yaml("specs:\n  var3: false\n") == aa.BlackList("var3")
+    assert aa.BlackList.from_yaml("specs:\n  var3: false\n") == aa.BlackList("var3")
 
     f1 = aa.Filter.from_yaml(
         """
@@ -193,5 +510,710 @@ def test_filters():
     assert aa.BlackList("c") | aa.WhiteList("a", "b") == aa.BlackList("c")
 
 
+def test_bitset_filters():
+
+    universe = aa.KeyUniverse()
+    names = [f"var{i}" for i in range(8)]
+    rng = random.Random(0)
+
+    def _random_filter():
+        specs = {n: rng.random() < 0.5 for n in rng.sample(names, rng.randint(0, 5))}
+        return aa.Filter(specs, rng.choice(["normal_white", "normal_black"]))
+
+    values = {n: i for i, n in enumerate(names + ["grey"])}
+    for _ in range(200):
+        f, g = _random_filter(), _random_filter()
+        fb, gb = f.to_bitset(universe), g.to_bitset(universe)
+        assert isinstance(fb, aa.BitsetFilter)
+        assert fb == f and fb.args == f.args and len(fb) == len(f)
+
+        for expected, actual in [
+            (f, fb),
+            (f & g, fb & gb),
+            (f | g, fb | gb),
+            (~f, ~fb),
+            (~(f & ~g) | g, ~(fb & ~gb) | gb),
+            (f & g, fb & g),
+        ]:
+            assert isinstance(actual, aa.BitsetFilter)
+            assert actual == expected
+            assert actual(**values) == expected(**values)
+            assert all(actual.keeps(n) == expected.keeps(n) for n in values)
+
+    assert aa.WhiteList("a").to_bitset() == aa.WhiteList("a")
+    assert aa.WhiteList("a").to_bitset().universe is aa.default_universe
+    assert universe.names_of(universe.mask(["var3", "var1"])) == ["var1", "var3"]
+
+
+def test_manifest_cache(tmp_path):
+
+    manifest = """---
+    path:
+      - IsString()
+      - Required()
+    lr:
+      - IsFloat()
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+    """
+    cache = aa.ManifestCache(str(tmp_path))
+
+    cold = aa.Validator.from_yaml(manifest, cache=cache)
+    assert len(os.listdir(tmp_path)) == 1
+    warm = aa.Validator.from_yaml(manifest, cache=str(tmp_path))
+    assert warm == cold == aa.Validator.from_yaml(manifest)
+    assert warm is not cold
+    assert warm(path="a", lr=2.0) == {"path": "a", "lr": 2.0}
+
+    # keyed by operator class and content
+    c = aa.Converter.from_yaml("lr: 2 * ${lr}", cache=cache)
+    assert c(lr=1.0) == {"lr": 2.0}
+    assert aa.Converter.from_yaml("lr: 2 * ${lr}", cache=cache) == c
+    assert len(os.listdir(tmp_path)) == 2
+
+    # corrupted entries are rebuilt
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name, "wb") as f:
+            f.write(b"garbage")
+    assert aa.Validator.from_yaml(manifest, cache=cache) == cold
+    assert aa.Converter.from_yaml("lr: 2 * ${lr}", cache=cache) == c
+
+    compiled = pickle.loads(pickle.dumps(cold.compile()))
+    assert isinstance(compiled, aa.CompiledValidator) and compiled == cold
+
+    # entries which others could have written are not unpickled
+    if hasattr(os, "getuid"):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return cold
+
+        path = cache.path(cache.key(aa.Validator, manifest))
+        assert cache.load(aa.Validator, manifest, build) == cold and builds == []
+        os.chmod(path, 0o666)
+        assert cache.load(aa.Validator, manifest, build) == cold and builds == [1]
+        os.chmod(tmp_path, 0o777)
+        assert cache.load(aa.Validator, manifest, build) == cold and builds == [1, 1]
+        os.chmod(tmp_path, 0o700)
+        assert cache.load(aa.Validator, manifest, build) == cold and builds == [1, 1]
+
+        private = aa.ManifestCache(str(tmp_path / "new"))
+        aa.Validator.from_yaml(manifest, cache=private)
+        assert os.stat(private.directory).st_mode & 0o777 == 0o700
+        private.clear()
+        os.rmdir(private.directory)
+
+    cache.clear()
+    assert os.listdir(tmp_path) == []
+
+
+def test_constraint_ordering():
+    class Spy(ac.Constraint):
+        # impure: must stay in place
+        def __init__(self):
+            self.seen = []
+
+        def assertion(self, x):
+            self.seen.append(x)
+            return True
+
+    constraints = [ac.InRange("[ 0 , 10 ]"), ac.ValidYaml(), ac.IsInteger()]
+    assert ac.IsString().guard and not ac.InRange("[ 0 , 1 ]").guard
+    assert ac.IsString().cost < ac.InRange("[ 0 , 1 ]").cost < ac.ValidYaml().cost
+    assert not Spy().pure and ac.NOT(ac.IsString()).pure
+
+    manifest = aa.Argument("a", constraints)
+    cost = aa.Argument("a", constraints, order="cost")
+    assert manifest == cost
+    assert [type(c) for c in cost._checks] == [ac.IsInteger, ac.InRange, ac.ValidYaml]
+    # the guard protects `InRange` from non-real values
+    with pytest.raises(AssertionError):
+        manifest("a: 1")
+    assert not cost("a: 1") and cost.compile()("a: 1") is False
+
+    spy = Spy()
+    arg = aa.Argument(
+        "a", [ac.ValidJson(), ac.IsString(), spy, ac.Positive(), ac.IsInteger()], "cost"
+    )
+    c = arg.constraints
+    assert arg._checks == [c[1], c[0], spy, c[4], c[3]]
+    assert arg("x") is False and spy.seen == []
+    assert arg("1") is False and spy.seen == ["1"]
+
+    # adaptive: the selective check moves first
+    checks = [ac.IsInteger(), ac.InRange("[ -100 , 100 ]"), ac.Positive()]
+    arg = aa.Argument("a", checks, "adaptive", adapt_every=100)
+    for x in range(-100, 100):
+        assert arg(x) == (x > 0)
+    stats = arg.stats()
+    assert [s["position"] for s in stats] == [0, 2, 1]
+    assert sum(s["calls"] for s in stats) > 0
+    assert stats[2]["passes"] <= stats[2]["calls"]
+
+    v = aa.Validator.from_yaml(
+        """---
+    doc:
+      - ValidYaml()
+      - IsString()
+    """,
+        order="cost",
+    )
+    assert isinstance(v.args["doc"]._checks[0], ac.IsString)
+    assert v(doc="a: 1") == {"doc": "a: 1"}
+
+
+def test_async_validation(tmp_path):
+    import asyncio
+
+    class SlowLookup(ac.AsyncConstraint):
+        running = 0
+        peak = 0
+
+        def __init__(self, delay, timeout=None):
+            self.delay = delay
+            self.timeout = timeout
+
+        async def aassertion(self, x):
+            cls = SlowLookup
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+            await asyncio.sleep(self.delay)
+            cls.running -= 1
+            return x != "unknown"
+
+    existing = tmp_path / "a.txt"
+    existing.write_text("a")
+    v = aa.Validator(
+        {
+            "file": aa.Argument("file", [ac.IsString(), ac.IsReadable()]),
+            "dir": aa.Argument("dir", [ac.PathExists(), ac.Required()]),
+            **{
+                f"key{i}": aa.Argument(f"key{i}", [ac.IsString(), SlowLookup(0.05)])
+                for i in range(8)
+            },
+            "lr": aa.Argument("lr", [ac.IsFloat(), ac.Default(0.1)]),
+        }
+    )
+    values = {"file": str(existing), "dir": str(tmp_path)}
+    values.update({f"key{i}": "k" for i in range(8)})
+
+    out = asyncio.run(v.aoperate(values, concurrency=4))
+    assert out == {**values, "lr": 0.1}
+    assert SlowLookup.peak == 4
+
+    # sync path: the async constraints run in their own event loop
+    assert v(**values) == out
+
+    async def sync_call_in_loop():
+        return v(**values)
+
+    with pytest.raises(RuntimeError, match="aoperate"):
+        asyncio.run(sync_call_in_loop())
+
+    with pytest.raises(AssertionError):
+        asyncio.run(v.aoperate({**values, "key3": "unknown"}))
+    with pytest.raises(AssertionError):
+        asyncio.run(v.acall(**{**values, "file": str(tmp_path / "missing")}))
+    with pytest.raises(AssertionError):
+        # the synchronous guard fails first
+        asyncio.run(v.aoperate({**values, "key0": 1}))
+
+    # timeouts fail the check, the constraint timeout takes precedence
+    slow = aa.Validator({"key": aa.Argument("key", [SlowLookup(1.0)])})
+    with pytest.raises(AssertionError):
+        asyncio.run(slow.aoperate({"key": "k"}, timeout=0.01))
+    slow = aa.Validator({"key": aa.Argument("key", [SlowLookup(0.05, timeout=1.0)])})
+    assert asyncio.run(slow.aoperate({"key": "k"}, timeout=0.01)) == {"key": "k"}
+
+    # no async constraint: plain `operate`
+    v = aa.Validator.from_dict({"lr": ["IsFloat()"], "path": ["PathExists()"]})
+    assert asyncio.run(v.aoperate({"lr": 0.1})) == {"lr": 0.1, "path": None}
+    assert not ac.PathExists()(0) and not ac.IsReadable()(str(tmp_path))
+
+
+def test_pickle_and_map_parallel():
+    v = aa.Validator.from_yaml(
+        """---
+    lr:
+      - IsFloat()
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+    epoch:
+      - IsInteger()
+      - Positive()
+      - Default(1)
+    """,
+        order="adaptive",
+    )
+    c = aa.Converter({"lr": "2 * ${lr}", "epochs": "${epoch}"})
+    universe = aa.KeyUniverse(["b", "a"])
+    operators = [
+        v,
+        v.compile(),
+        c,
+        v >> c >> aa.WhiteList("lr"),
+        (v >> c >> aa.WhiteList("lr")).fuse(),
+        aa.BlackList("lr").to_bitset(),
+        aa.WhiteList("a").to_bitset(universe),
+    ]
+    for op in operators:
+        loaded = pickle.loads(pickle.dumps(op))
+        values = dict(lr=0.05, epoch=2, a=1, b=2)
+        assert loaded == op and loaded(**values) == op(**values)
+
+    r = ac.InRange("[ 0 , 1 ]", "( 2 , 3 )")
+    assert pickle.loads(pickle.dumps(r)).intervals == r.intervals
+    assert pickle.loads(pickle.dumps(ac.Positive())) == ac.Positive()
+    assert pickle.loads(pickle.dumps(aa.default_universe)) is aa.default_universe
+    loaded = pickle.loads(pickle.dumps(universe))
+    assert loaded.names == ["b", "a"] and loaded is not universe
+
+    records = [{"lr": random.choice([0.05, 0.5, 2.0]), "epoch": i + 1} for i in range(50)]
+    results = list(v.map_parallel(iter(records), workers=2, chunksize=8))
+    assert [r.index for r in results] == list(range(50))
+    for result, record in zip(results, records):
+        if record["lr"] == 0.5:
+            assert isinstance(result.error, AssertionError) and result.value is None
+        else:
+            assert result.ok and result.value == v(**record)
+
+
+def test_incremental():
+    calls = []
+
+    class Counted(ac.Constraint):
+        def assertion(self, x):
+            calls.append(x)
+            return True
+
+    v = aa.Validator(
+        {
+            "lr": aa.Argument("lr", [ac.IsFloat(), Counted()]),
+            "epoch": aa.Argument("epoch", [ac.IsInteger(), Counted(), ac.Default(1)]),
+            "config": aa.Argument("config", [ac.ValidJson()]),
+        },
+        payloads="attach",
+    )
+    c = aa.Converter(
+        {"lr": "2 * ${lr}", "steps": "${epoch} * 10", "both": "${lr} * ${epoch}"}
+    )
+    base = {"lr": 0.1, "config": "{}"}
+
+    state = v.incremental(base)
+    assert len(calls) == 1 and state.output == v(**base)
+    del calls[:]
+    out = state.evaluate({"lr": 0.2, "epoch": 3})
+    assert sorted(calls) == [0.2, 3] and out == v(lr=0.2, epoch=3, config="{}")
+    assert out.payloads == {"config": {}}
+    out = state.evaluate({"config": '{"a": 1}', "other": 1})
+    assert out.payloads == {"config": {"a": 1}} and "other" not in out
+    with pytest.raises(AssertionError):
+        state.evaluate({"lr": "high"})
+    assert state.values == base
+
+    pipeline = v >> c >> aa.BlackList("both")
+    for op in [pipeline, pipeline.fuse()]:
+        state = op.incremental(base)
+        del calls[:]
+        assert state.evaluate({"epoch": 2}) == {"lr": 0.2, "steps": 20}
+        assert calls == [2]
+
+    # only the expressions referencing the delta are evaluated
+    state = c.incremental({"lr": 0.1, "epoch": 1})
+    c.expressions["both"] = aa.Expression("'stale'")
+    assert state.update({"epoch": 2}) == {"lr": 0.2, "steps": 20, "both": "stale"}
+    assert state.values == {"lr": 0.1, "epoch": 2}
+    assert state.evaluate({"lr": 1.0}) == {"lr": 2.0, "steps": 20, "both": "stale"}
+
+
+def test_lazy_converter():
+    c = aa.Converter(
+        {
+            "steps": "${epochs} * ${steps_per_epoch}",
+            "warmup": "${out.steps} // 10",
+            "decay": "${out.steps} - ${out.warmup}",
+            "lr": "2 * ${lr}",
+            "name": "run-${lr}-${out.lr}",
+        }
+    )
+    assert c.input_names == {"epochs", "steps_per_epoch", "lr"}
+
+    calls = []
+    expression = c.expressions["steps"]
+    c.expressions["steps"] = lambda values: calls.append(1) or expression(values)
+
+    out = c.view(dict(epochs=2, steps_per_epoch=50, lr=0.1))
+    assert isinstance(out, aa.ConvertedValues) and calls == []
+    assert out["decay"] == 90 and out["warmup"] == 10 and calls == [1]
+    expected = {"steps": 100, "warmup": 10, "decay": 90, "lr": 0.2, "name": "run-0.1-0.2"}
+    assert out == expected
+    assert calls == [1] and list(out) == list(c.args)
+    assert pickle.loads(pickle.dumps(out)) == out.materialize()
+
+    # `operate` returns a `dict`, with or without a profiler
+    out = c(epochs=2, steps_per_epoch=50, lr=0.1)
+    assert type(out) is dict and json.loads(json.dumps(out)) == expected
+    with aa.Profiler():
+        assert type(c(epochs=2, steps_per_epoch=50, lr=0.1)) is dict
+
+    # `${name}` always reads the input
+    assert c(epochs=2, steps_per_epoch=50, lr=0.1, steps=7)["decay"] == 90
+    assert aa.Converter({"lr": "${lr} * 2", "lr2": "${lr} * 4"})(lr=1.0) == {
+        "lr": 2.0,
+        "lr2": 4.0,
+    }
+    swap = aa.Converter({"height": "${width}", "width": "${height}"})
+    assert swap(height=2, width=1) == {"height": 1, "width": 2}
+
+    with pytest.raises(KeyError):
+        c(epochs=2, lr=0.1)
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        aa.Converter({"a": "${out.b}", "b": "${out.c} + 1", "c": "${out.a}"})
+    with pytest.raises(ValueError, match="unknown output `y`"):
+        aa.Converter({"a": "${out.y}"})
+
+    # only the kept values are evaluated
+    c.expressions["steps"] = expression
+    c.expressions["name"] = lambda values: 1 / 0
+    assert (c >> aa.WhiteList("decay")).fuse()(epochs=2, steps_per_epoch=50, lr=0.1) == {
+        "decay": 90
+    }
+    pruned, inputs = c.prune({"decay"})
+    assert set(pruned.args) == {"steps", "warmup", "decay"}
+    assert inputs == {"epochs", "steps_per_epoch"}
+
+    # outputs depending on changed outputs are updated
+    c = aa.Converter(dict(c.args))
+    state = c.incremental({"epochs": 2, "steps_per_epoch": 50, "lr": 0.1})
+    assert state.evaluate({"epochs": 4}) == {
+        "steps": 200,
+        "warmup": 20,
+        "decay": 180,
+        "lr": 0.2,
+        "name": "run-0.1-0.2",
+    }
+
+    with aa.Profiler() as prof:
+        assert c.view(dict(epochs=2, steps_per_epoch=50, lr=0.1))["decay"] == 90
+    assert all(prof.expressions[name].calls == 1 for name in c.args)
+
+
+def test_grid_and_sample():
+    v = aa.Validator.from_yaml(
+        """---
+    lr:
+      - Required()
+      - IsFloat()
+      - InRange('( 0 , 0.1 ]')
+    depth:
+      - Required()
+      - IsInteger()
+      - InRange('[ 1 , 4 ]', '( 9 , 12 )')
+    steps:
+      - Default(10)
+      - IsInteger()
+      - Positive()
+    act:
+      - Required()
+      - IsString()
+    """
+    )
+
+    grid = v.grid({"lr": [0.01, 0.1], "depth": [1, 2, 3], "act": ["relu"]})
+    records = list(grid)
+    assert len(records) == 6
+    assert records[0] == {"lr": 0.01, "depth": 1, "steps": 10, "act": "relu"}
+    assert records[-1] == {"lr": 0.1, "depth": 3, "steps": 10, "act": "relu"}
+    with pytest.raises(AssertionError):
+        v.grid({"lr": [0.2], "depth": [1], "act": ["relu"]})
+    with pytest.raises(AssertionError):
+        v.grid({"lr": [0.1], "depth": [1]})
+
+    pytest.importorskip("numpy")
+
+    kwargs = dict(choices={"act": ["relu", "gelu"]}, bounds={"steps": (1, 100)})
+    records = list(v.sample(1000, seed=0, chunk_size=64, **kwargs))
+    assert len(records) == 1000
+    compiled = v.compile()
+    for d in records:
+        assert compiled(**d) == d
+    assert {d["depth"] for d in records} == {1, 2, 3, 4, 10, 11}
+    assert {type(d["lr"]) for d in records} == {float}
+    assert {d["act"] for d in records} == {"relu", "gelu"}
+    assert max(d["steps"] for d in records) <= 100
+
+    assert list(v.sample(5, seed=1, **kwargs)) == list(v.sample(5, seed=1, **kwargs))
+    with pytest.raises(AssertionError, match="choices"):
+        v.sample(1, bounds={"steps": (1, 100)})
+    with pytest.raises(AssertionError, match="bounds"):
+        v.sample(1, choices={"act": ["relu"]})
+
+
+def test_convert_columns():
+    np = pytest.importorskip("numpy")
+
+    c = aa.Converter(
+        {
+            "steps": "${epoch} * ${steps_per_epoch}",
+            "warmup": "max(${out.steps} // 10, 2)",
+            "lr": "${lr} if ${epoch} > 2 else 0.5 * ${lr}",
+            "short": "1 <= ${epoch} < 3 or ${lr} > 0.3",
+            "ratio": "1 / (${epoch} - 3)",
+            "name": "run-${lr}",
+            "seed": "0",
+        }
+    )
+    columns = {
+        "epoch": np.arange(5),
+        "steps_per_epoch": [10] * 5,
+        "lr": [0.1, 0.2, 0.3, 0.4, 0.5],
+    }
+    out = c.convert_columns(columns)
+    assert list(out) == list(c.args)
+    rows = {name: np.asarray(column).tolist() for name, column in columns.items()}
+    for i in range(5):
+        row = c(**{name: column[i] for name, column in rows.items()})
+        assert {name: column[i] for name, column in out.items()} == row
+
+    assert out["steps"].dtype == np.int64
+    assert out["warmup"].tolist() == [2, 2, 2, 3, 4]
+    assert out["ratio"][3] == "1 / (3 - 3)"  # falls back to the scalar path
+    assert c.expressions["lr"]._vectorized() is not None
+    assert c.expressions["name"]._vectorized() is None
+
+    # integer overflows fall back to the exact scalar path
+    squares = aa.Converter({"square": "${x} * ${x}", "positive": "${x} * ${x} > 0"})
+    out = squares.convert_columns({"x": np.array([10**10, 2**32, 3])})
+    assert out["square"].tolist() == [10**20, 2**64, 9]
+    assert out["positive"].tolist() == [True, True, True]
+    out = squares.convert_columns({"x": np.array([-3, 3])})
+    assert out["square"].dtype == np.int64 and out["square"].tolist() == [9, 9]
+
+    with pytest.raises(KeyError):
+        c.convert_columns({"epoch": [1]})
+    with pytest.raises(AssertionError):
+        c.convert_columns({"epoch": [1], "steps_per_epoch": [1, 2], "lr": [1]})
+
+
+def test_views():
+    v = aa.Validator.from_dict(
+        {"path": ["IsString()"], "epoch": ["Default(1)", "IsInteger()", "Positive()"]}
+    )
+    values = {"path": "/a", "other": object()}
+    for y in [v, v.compile()]:
+        view = y.view(values)
+        assert isinstance(view, aa.LazyMapping)
+        assert view == y(**values) == view.materialize()
+        assert list(view) == ["path", "epoch"] and "other" not in view
+        assert view["path"] is values["path"] and view["epoch"] == 1
+        with pytest.raises(TypeError):
+            view["epoch"] = 2
+        with pytest.raises(KeyError):
+            view["other"]
+        with pytest.raises(AssertionError):
+            y.view({"epoch": 0})
+    assert pickle.loads(pickle.dumps(v.view(values))) == {"path": "/a", "epoch": 1}
+    with pytest.raises(AssertionError):
+        aa.Validator(v.args, payloads="attach").view(values)
+
+    values = {"config": {"model": "bert"}, "epoch": 2, "lr": 0.1}
+    for f in [
+        aa.BlackList("lr"),
+        aa.WhiteList("config", "epoch"),
+        aa.BlackList("lr").to_bitset(),
+        aa.WhiteList("config", "epoch").to_bitset(),
+    ]:
+        view = f.view(values)
+        assert view == f(**values) == {"config": {"model": "bert"}, "epoch": 2}
+        assert view["config"] is values["config"]
+        assert len(view) == 2 and "lr" not in view
+        with pytest.raises(KeyError):
+            view["lr"]
+        assert type(view.materialize()) is dict
+
+    # views read the input mapping
+    values = {"a": 1}
+    view = aa.BlackList("b").view(values)
+    values["c"] = 3
+    assert view == {"a": 1, "c": 3}
+
+    # lazy outputs are read through views
+    c = aa.Converter({"steps": "${epoch} * 10", "name": "${path}"})
+    out = aa.WhiteList("steps").view(c(epoch=2, path="/a"))
+    assert out == {"steps": 20}
+
+
+def test_yaml_round_trip():
+    v = aa.Validator.from_yaml(
+        """---
+    path:
+      - IsString()
+      - ValidPath('windows')
+    epoch:
+      - Default(1)
+      - IsInteger()
+      - Positive()
+    lr:
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+      - ANY(IsFloat(), NOT(IsBool()))
+    """
+    )
+    assert aa.Validator.from_yaml(v.to_yaml()) == v
+    assert aa.Validator.from_yaml(v.compile().to_yaml()) == v
+
+    c = aa.Converter({"steps": "${epoch} * 10", "seed": 0})
+    assert aa.Converter.from_yaml(c.to_yaml()) == c
+
+    for f in [aa.WhiteList("a", "b"), aa.BlackList("a"), ~aa.WhiteList("a")]:
+        assert aa.Filter.from_yaml(f.to_yaml()) == f
+        assert aa.BitsetFilter.from_yaml(f.to_bitset().to_yaml()) == f
+
+    # the subclasses are rebuilt from the specs
+    for cls, f in [
+        (aa.WhiteList, aa.WhiteList("a", "b")),
+        (aa.BlackList, ~aa.WhiteList("a")),
+    ]:
+        g = cls.from_yaml(f.to_yaml())
+        assert type(g) is cls and g == f
+        for data in [f.to_binary(), f.to_bitset().to_binary()]:
+            g = cls.from_binary(data)
+            assert type(g) is cls and g == f
+    with pytest.raises(AssertionError, match="WhiteList"):
+        aa.WhiteList.from_yaml(aa.BlackList("a").to_yaml())
+    with pytest.raises(AssertionError, match="BlackList"):
+        aa.BlackList.from_binary(aa.WhiteList("a").to_binary())
+
+    # constraints which cannot be rebuilt from their `arguments()` are refused
+    class IsListValue(ac.IsInstance):
+        def __init__(self):
+            super().__init__(list)
+
+    v = aa.Validator({"a": aa.Argument("a", [IsListValue()])})
+    for write in [v.to_yaml, v.to_binary]:
+        with pytest.raises(ValueError, match="IsListValue"):
+            write()
+
+
+def test_binary_manifest(tmp_path):
+    v = aa.Validator.from_yaml(
+        """---
+    path:
+      - IsString()
+      - Required()
+    epoch:
+      - Default(1)
+      - IsInteger()
+      - Positive()
+    lr:
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+    momentum:
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+      - Default(None)
+    config:
+      - ValidJson()
+      - Default('{}')
+    nom:
+      - ALL(IsString(), ValidPath('windows'))
+    """,
+        order="cost",
+    )
+
+    data = v.to_binary()
+    w = aa.Validator.from_binary(data)
+    assert type(w) is aa.Validator and w == v
+    assert w == aa.Validator.from_yaml(v.to_yaml(), order="cost")
+    assert w.to_yaml() == v.to_yaml() and w.to_binary() == data
+    assert all(arg.order == "cost" for arg in w.args.values())
+    assert w(path="/a", lr=2.0) == v(path="/a", lr=2.0)
+
+    # the arguments are decoded on first access
+    path = tmp_path / "manifest.bin"
+    v.to_binary(path)
+    w = aa.Validator.from_binary(str(path))
+    assert isinstance(w.args, aa.BinaryArguments)
+    assert list(w.args) == list(v.args) and "lr" in w.args and "x" not in w.args
+    assert w.args._decoded.count(None) == len(v.args)
+    assert w.args["lr"] == v.args["lr"]
+    assert w.args._decoded.count(None) == len(v.args) - 1
+    # the bounds of equal ranges are stored once and decoded into one constraint
+    lr = w.args["lr"].constraints[0]
+    assert lr is w.args["momentum"].constraints[0]
+    assert lr.intervals == v.args["lr"].constraints[0].intervals
+    assert pickle.loads(pickle.dumps(w)) == v
+
+    compiled = aa.Validator.from_binary(v.compile().to_binary())
+    assert isinstance(compiled, aa.CompiledValidator) and compiled == v
+    assert isinstance(aa.CompiledValidator.from_binary(path), aa.CompiledValidator)
+
+    c = aa.Converter({"steps": "${epoch} * 10", "seed": 0, "name": "run-${lr}"})
+    assert aa.Converter.from_binary(c.to_binary()) == c
+    assert aa.Converter.from_binary(c.to_binary()).args["seed"] == 0
+
+    f = aa.WhiteList("a", "b") | aa.BlackList("c")
+    assert aa.Filter.from_binary(f.to_binary()) == f
+    b = aa.Filter.from_binary(f.to_bitset().to_binary())
+    assert isinstance(b, aa.BitsetFilter) and b == f
+
+    with pytest.raises(AssertionError):
+        aa.Converter.from_binary(data)
+    with pytest.raises(AssertionError):
+        aa.Validator.from_binary(b"not a manifest" * 10)
+
+
+def test_manifest_loaders(tmp_path):
+    import io
+    import json
+
+    import yaml
+
+    from autoarg import loaders
+
+    v = aa.Validator.from_yaml(
+        """---
+    epoch:
+      - Default(1)
+      - IsInteger()
+      - Positive()
+    lr:
+      - InRange('[ 0 , 0.1 ]', '( 1 , oo )')
+    """
+    )
+    text = v.to_yaml()
+    assert text == yaml.safe_dump(v.to_dict())
+    assert v.to_yaml(backend="python") == text
+    assert aa.Validator.from_yaml(text, backend="python") == v
+    if yaml.__with_libyaml__:
+        assert loaders.yaml_loader() is yaml.CSafeLoader
+        assert aa.Validator.from_yaml(text, backend="c") == v
+    else:
+        assert loaders.yaml_loader() is yaml.SafeLoader
+    with pytest.raises(AssertionError):
+        loaders.yaml_loader("rust")
+
+    (tmp_path / "manifest.yml").write_text(text)
+    (tmp_path / "manifest.json").write_text(json.dumps(v.to_dict()))
+    (tmp_path / "manifest.txt").write_text(text)
+    for name in ["manifest.yml", "manifest.json", "manifest.txt"]:
+        assert aa.Validator.from_file(tmp_path / name) == v
+        assert aa.Validator.from_file(str(tmp_path / name), order="cost") == v
+    with open(tmp_path / "manifest.json", "rb") as f:
+        assert aa.Validator.from_stream(f, format="json") == v
+    assert aa.Validator.from_stream(io.StringIO(text)) == v
+
+    c = aa.Converter({"steps": "${epoch} * 10", "seed": 0})
+    assert aa.Converter.from_stream(json.dumps(c.to_dict()), format="json") == c
+    f = aa.WhiteList("a") | aa.BlackList("b")
+    assert aa.Filter.from_stream(io.StringIO(f.to_yaml())) == f
+
+    loaders.register_loader("lines", lambda s, backend: {"x": ["IsInteger()"]})
+    try:
+        assert "lines" in loaders.manifest_formats()
+        v = aa.Validator.from_stream("", format="lines")
+        assert v == aa.Validator.from_dict({"x": ["IsInteger()"]})
+    finally:
+        del loaders._loaders["lines"]
+    with pytest.raises(AssertionError):
+        aa.Validator.from_stream(text, format="toml")
+
+
 if __name__ == "__main__":
     pass
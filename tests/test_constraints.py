@@ -1,3 +1,7 @@
+import random
+
+import pytest
+
 import autoarg.constraints as ac
 
 
@@ -55,6 +59,46 @@ def test_reals():
     assert c(2) and c(3.5)
 
 
+def test_range_unions():
+
+    c = ac.InRange("[ 0 , 1 )", "[ 1 , 2 ]", "( 3 , 4 )", "( 4 , 5 ]", "[ 6 , 6 ]")
+    assert c.intervals == [
+        (0.0, True, 2.0, True),
+        (3.0, False, 4.0, False),
+        (4.0, False, 5.0, True),
+        (6.0, True, 6.0, True),
+    ]
+    assert c(0) and c(1) and c(2) and c(6)
+    assert not c(3) and not c(4) and not c(5.5) and not c(7)
+
+    c = ac.InRange("( 0 , 0 )", "[ 1 , 0 ]")
+    assert c.intervals == []
+    assert not c(0)
+
+    # compare with a linear scan over many random overlapping intervals
+    rng = random.Random(0)
+    ranges = []
+    for _ in range(300):
+        lower = rng.randint(-500, 500)
+        upper = lower + rng.randint(0, 5)
+        ranges.append(f"{rng.choice('[(')} {lower} , {upper} {rng.choice('])')}")
+    ranges += ["( -oo , -900 )", "[ 900 , oo )"]
+    c = ac.InRange(*ranges)
+
+    def _linear(x):
+        for lower, lower_closed, upper, upper_closed in map(c._parse_bounds, ranges):
+            left = x >= lower if lower_closed else x > lower
+            right = x <= upper if upper_closed else x < upper
+            if left and right:
+                return True
+        return False
+
+    values = [x / 2 for x in range(-2000, 2000)] + [float("inf"), -float("inf")]
+    check = ac.compile_constraints([c])
+    for x in values:
+        assert c(x) == check(x) == _linear(x)
+
+
 def test_strings():
 
     c = ac.IsString()
@@ -83,6 +127,40 @@ def test_strings():
     )
 
 
+def test_memoization():
+
+    memo = ac.enable_memo(ac.MemoCache(max_entries=3, max_value_bytes=1000))
+    try:
+        c = ac.ValidJson()
+        payload = '{"a": [1, 2, 3]}'
+        assert c(payload) and c(payload) and ac.ValidJson()(payload)
+        assert memo.hits == 2 and memo.misses == 1 and len(memo) == 1
+
+        assert not c("abc") and not c("abc")
+        assert memo.hits == 3 and memo.misses == 2
+
+        # keyed on the parameters of the constraint
+        assert ac.ValidPath("linux")("a|b") and not ac.ValidPath("windows")("a|b")
+        assert memo.misses == 4 and len(memo) == 3 and memo.evictions == 1
+
+        # oversized values are not cached
+        assert c("[" + "1, " * 1000 + "1]")
+        assert memo.misses == 5 and len(memo) == 3
+
+        assert memo.stats()["entries"] == 3 and memo.nbytes > 0
+        memo.clear()
+        assert len(memo) == 0 and memo.nbytes == 0
+    finally:
+        ac.disable_memo()
+
+    assert ac.ValidJson.memo is None
+    assert ac.ValidJson()("{}") and memo.misses == 5
+
+    memo = ac.MemoCache(ttl=0.0)
+    assert memo.lookup("key", "x", bool) and memo.lookup("key", "x", bool)
+    assert memo.hits == 0 and memo.misses == 2
+
+
 def test_logicals():
 
     c = ac.IsBool()
@@ -103,6 +181,127 @@ def test_logicals():
     assert not c(1)
 
 
+def test_batch_assertion():
+    np = pytest.importorskip("numpy")
+
+    ints = np.array([-1, 0, 1, 2])
+    floats = np.array([0.5, 1.0, 1.5, float("nan")])
+    objects = np.array([1, 1.5, "a", None], dtype=object)
+
+    assert ac.IsInteger().batch_assertion(ints).all()
+    assert not ac.IsInteger().batch_assertion(floats).any()
+    assert ac.IsReal().batch_assertion(objects).tolist() == [True, True, False, False]
+    assert ac.Required().batch_assertion(objects).tolist() == [True, True, True, False]
+
+    c = ac.InRange("[ 0 , 1 )", "[ 2 , oo ]")
+    for column in [ints, floats, objects]:
+        expected = []
+        for x in column.tolist():
+            try:
+                expected.append(c(x))
+            except AssertionError:
+                expected.append(False)
+        assert c.batch_assertion(column).tolist() == expected
+
+    c = ac.ANY(ac.IsString(), ac.ALL(ac.IsReal(), ac.NOT(ac.Positive())))
+    assert c.batch_assertion(objects).tolist() == [False, False, True, False]
+    assert c.batch_assertion(ints).tolist() == [True, True, False, False]
+
+
+def test_parse_constraint():
+
+    for source, expected in [
+        ("IsInteger()", ac.IsInteger()),
+        ("InRange('[ 0 , 1 ]', '( 2 , oo )')", ac.InRange("[ 0 , 1 ]", "( 2 , oo )")),
+        ("  Default(-1e-6)", ac.Default(-1e-6)),
+        ("Default(default_value=[1, {'a': None}])", ac.Default([1, {"a": None}])),
+        ("IsInstance((int, float))", ac.IsInstance((int, float))),
+        ("ValidPath(platform='windows')", ac.ValidPath("windows")),
+        (
+            "ANY(NOT(IsBool()), ALL(IsFloat(), Positive()))",
+            ac.ANY(ac.NOT(ac.IsBool()), ac.ALL(ac.IsFloat(), ac.Positive())),
+        ),
+    ]:
+        c = ac.parse_constraint(source)
+        assert type(c) is type(expected) and repr(c) == repr(expected)
+        assert ac.parse_constraint(c.to_string()) == c
+
+    assert ac.parse_constraint("IsInteger()") is ac.parse_constraint("IsInteger()")
+
+    for source in [
+        "__import__('os').system('true')",
+        "IsInteger",
+        "Unknown()",
+        "Default(os)",
+        "Default(open('/etc/passwd'))",
+        "Default(1 + 1)",
+        "ANY(*[IsInteger()])",
+        "IsInteger() or IsFloat()",
+        "InRange('[ 0 , 1 ]'",
+        "IsInstance",
+    ]:
+        try:
+            ac.parse_constraint(source)
+            error = False
+        except ac.ConstraintSyntaxError:
+            error = True
+        assert error, source
+
+    class IsEven(ac.Constraint):
+        def assertion(self, x):
+            return x % 2 == 0
+
+    assert ac.constraint_registry["IsEven"] is IsEven
+    assert ac.parse_constraint("NOT(IsEven())")(3)
+    assert ac.format_constraint(ac.NOT(IsEven())) == "NOT(IsEven())"
+
+    # names are unique, no other class takes over the parsing of a name
+    with pytest.raises(ValueError, match="`InRange` is taken"):
+
+        class InRange(ac.Constraint):
+            pass
+
+    assert type(ac.parse_constraint("InRange('[ 0 , 1 ]')")) is ac.InRange
+
+    # the same class defined again replaces it, and the parsed ones
+    for flag in [True, False]:
+
+        class Flag(ac.Constraint, shared=True):
+            def assertion(self, x, flag=flag):
+                return flag
+
+        assert ac.parse_constraint("Flag()")(0) is flag
+
+    # the state of custom constraints is written by `arguments`
+    class MaxLen(ac.Constraint):
+        def __init__(self, n=10):
+            self.n = n
+
+        def assertion(self, x):
+            return len(x) <= self.n
+
+    with pytest.raises(ValueError, match="MaxLen"):
+        MaxLen(3).to_string()
+    with pytest.raises(ValueError, match="MaxLen"):
+        ac.format_constraint(ac.ANY(MaxLen(3), ac.IsInteger()))
+
+    MaxLen.arguments = lambda self: (self.n,)
+    assert MaxLen(3).to_string() == "MaxLen(3)"
+    assert ac.parse_constraint(MaxLen(3).to_string()) == MaxLen(3)
+
+    # subclasses overriding the constructor must override `arguments`
+    class IsList(ac.IsInstance):
+        def __init__(self):
+            super().__init__(list)
+
+    with pytest.raises(ValueError, match="IsList"):
+        IsList().to_string()
+
+    MaxLen.arguments = lambda self: (self.n, 1)
+    with pytest.raises(ValueError, match="do not match"):
+        MaxLen(3).to_string()
+
+
 def test_equal():
 
     assert ac.IsInteger() == ac.IsInteger()
@@ -112,6 +311,38 @@ def test_equal():
     assert ac.InRange("[ 0 , 1 ]") != ac.InRange("[ 0 , 1 )")
 
 
+def test_compact_constraints():
+    # stateless constraints are shared instances
+    assert ac.IsInteger() is ac.IsInteger() and ac.Required() is ac.Required()
+    assert ac.Positive() is ac.Positive() and ac.IsFloat() is not ac.IsInteger()
+    assert ac.InRange("[ 0 , 1 ]") is not ac.InRange("[ 0 , 1 ]")
+    assert ac.Default(1) is not ac.Default(1) and ac.Default(1) == ac.Default(1)
+
+    class Bounded(ac.IsInteger):
+        # subclasses of shared constraints may hold state
+        def __init__(self, bound):
+            super().__init__()
+            self.bound = bound
+
+    assert Bounded(1) is not Bounded(1) and Bounded(1) == Bounded(1) != Bounded(2)
+
+    for c in [ac.IsString(), ac.InRange("[ 0 , 1 ]"), ac.Default(1), ac.NOT(ac.IsBool())]:
+        assert not hasattr(c, "__dict__")
+
+    # equality compares the attributes, from the slots and the `__dict__`
+    assert ac.Default(1) != ac.Default(2)
+    assert ac.ValidPath() == ac.ValidPath() != ac.ValidPath("windows")
+    assert ac.NOT(ac.IsBool()) == ac.NOT(ac.IsBool()) != ac.NOT(ac.IsString())
+    assert ac.ANY(ac.IsBool(), ac.Default(1)) != ac.ANY(ac.IsBool(), ac.Default(2))
+
+    # flat interval arrays, shared by equal ranges
+    r = ac.InRange("( 2 , 3 )", "[ 0 , 1 ]")
+    assert r.intervals == [(0.0, True, 1.0, True), (2.0, False, 3.0, False)]
+    assert r._lowers.typecode == "d" and r._lower_closed == b"\x01\x00"
+    assert ac.InRange("( 2 , 3 )", "[ 0 , 1 ]")._lowers is r._lowers
+    assert r(0) is True and r(2) is False and r(2.5) is True
+
+
 if __name__ == "__main__":
     c = ac.InRange("[ 0 , 1 ]", "[ 0 , 1 ]")
     print(c(0.5))
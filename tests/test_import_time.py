@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+# modules which are only needed by some constraints and methods; autoarg
+# imports them inside the functions using them, so that `import autoarg` stays
+# fast
+LAZY_MODULES = [
+    "yaml",
+    "pathvalidate",
+    "json",
+    "numpy",
+    "pickle",
+    "tempfile",
+    "string",
+    "asyncio",
+    "random",
+    "concurrent.futures",
+    "mmap",
+]
+# generous bound of the cumulative time of `import autoarg`, measured by
+# `python -X importtime`; the benchmarks track it precisely
+MAX_IMPORT_SECONDS = 0.5
+
+
+def _import_times(statement):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time():
+
+    # the best of a few runs, to not fail on a slow start of the interpreter
+    runs = [_import_times("import autoarg") for _ in range(3)]
+    seconds = min(times["autoarg"] for times in runs) / 1e6
+    assert seconds < MAX_IMPORT_SECONDS, f"`import autoarg` takes {seconds:.3f}s"
+    times = runs[0]
+
+    loaded = [name for name in LAZY_MODULES if name in times]
+    assert not loaded, f"`import autoarg` eagerly imports {loaded}"
+
+    times = _import_times(
+        "from autoarg import Validator, Converter, Filter;"
+        "from autoarg.constraints import ValidYaml, ValidJson, ValidPath"
+    )
+    assert "yaml" not in times
+
+
+def test_lazy_dependencies_load_on_use():
+
+    times = _import_times(
+        "import autoarg; autoarg.Validator.from_yaml('a: [ValidPath()]')(a='x')"
+    )
+    assert "yaml" in times and "pathvalidate" in times
@@ -0,0 +1,124 @@
+import pytest
+
+import autoarg as aa
+from autoarg.arguments import profiling
+
+
+def test_profiler():
+    v = aa.Validator.from_dict(
+        {
+            "lr": ["IsFloat()", "InRange('[ 0 , 1 ]')"],
+            "config": ["IsString()", "ValidJson()"],
+        }
+    )
+    p = v.compile() >> aa.Converter({"x": "2 * ${lr}", "config": "${config}"})
+    p = p >> aa.WhiteList("x")
+    expected = p(lr=0.5, config="{}")
+
+    with aa.Profiler(reservoir=16) as prof:
+        assert profiling.active.get() is prof
+        for _ in range(50):
+            assert p(lr=0.5, config="{}") == expected
+        with pytest.raises(AssertionError):
+            v(lr=3.0, config="{}")
+    assert profiling.active.get() is None
+
+    d = prof.to_dict()
+    assert d["operators"]["CompiledValidator"]["calls"] == 50
+    assert d["operators"]["Validator"]["failures"] == 1
+    assert d["operators"]["WhiteList"]["passes"] == 50
+    assert d["arguments"]["lr"] == {**d["arguments"]["lr"], "calls": 51, "failures": 1}
+    assert d["constraints"]["InRange"]["failures"] == 1
+    assert d["constraints"]["ValidJson"]["calls"] == 50
+    assert d["expressions"]["x"]["calls"] == 50
+    q = d["expressions"]["x"]["quantiles"]
+    assert 0 < q[0.5] <= q[0.9] <= q[0.99]
+    assert len(prof.expressions["x"].samples) == 16
+    assert set(d["memory"]) == {
+        "CompiledValidator#0",
+        "Converter#1",
+        "WhiteList#2",
+        "Validator#3",
+    }
+    assert d["memory"]["CompiledValidator#0"] > d["memory"]["Validator#3"] > 0
+
+    text = prof.to_prometheus()
+    assert "# TYPE autoarg_constraint_seconds summary" in text
+    assert 'autoarg_argument_seconds_count{argument="lr"} 51' in text
+    assert 'autoarg_operator_failures_total{operator="Validator"} 1' in text
+    assert 'autoarg_operator_bytes{operator="WhiteList#2"}' in text
+
+    # not recorded once the profiler exits
+    p(lr=0.5, config="{}")
+    assert prof.to_dict()["expressions"]["x"]["calls"] == 50
+    prof.clear()
+    assert prof.to_dict()["operators"] == {}
+
+
+def test_profiler_payloads():
+    v = aa.Validator.from_dict({"config": ["ValidJson()"]}, payloads="attach")
+    with aa.Profiler() as prof:
+        out = v(config='{"a": 1}')
+    assert out.payloads == {"config": {"a": 1}}
+    assert prof.constraints["ValidJson"].calls == 1
+
+
+def test_profiler_threads():
+    import threading
+
+    v = aa.Validator.from_dict({"lr": ["IsFloat()"]})
+    entered = threading.Barrier(2)
+    exited = threading.Barrier(2)
+    profilers = []
+
+    def work(calls):
+        with aa.Profiler() as prof:
+            entered.wait()
+            for _ in range(calls):
+                v(lr=0.5)
+            exited.wait()
+            assert profiling.active.get() is prof
+        assert profiling.active.get() is None
+        profilers.append((calls, prof))
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in (10, 20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # each profiler only records the calls of its own thread
+    assert sorted(n for n, _ in profilers) == [10, 20]
+    for calls, prof in profilers:
+        assert prof.operators["Validator"].calls == calls
+
+    # another thread does not see the profiler of this one
+    with aa.Profiler() as prof:
+        t = threading.Thread(target=lambda: v(lr=0.5))
+        t.start()
+        t.join()
+    assert prof.operators == {}
+
+
+def test_profiler_tasks():
+    import asyncio
+
+    v = aa.Validator.from_dict({"lr": ["IsFloat()"]})
+    prof = aa.Profiler()
+
+    async def work(delay):
+        with prof:
+            await asyncio.sleep(delay)
+            v(lr=0.5)
+            assert profiling.active.get() is prof
+        assert profiling.active.get() is None
+
+    async def main():
+        # the first task exits while the second one is still inside
+        await asyncio.gather(work(0.01), work(0.05))
+        # nested entries of one profiler
+        with prof, prof:
+            v(lr=0.5)
+        assert profiling.active.get() is None
+
+    asyncio.run(main())
+    assert prof.operators["Validator"].calls == 3